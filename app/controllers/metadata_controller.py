@@ -32,6 +32,9 @@ class MetadataController(QObject):
     def detect_new_fields(self) -> None:
         self._principal.ejecutar(svc.detect_new_fields())
 
+    def suggest_columns(self, excel: str, top: int) -> None:
+        self._principal.ejecutar(svc.suggest_columns(excel, top))
+
     # Tags
     def normalize_tags(self, usar_excel: bool, excel: str, blog: str, dry_run: bool) -> None:
         self._principal.ejecutar(svc.normalize_tags(usar_excel, excel, blog=blog, dry_run=dry_run))
@@ -51,8 +54,10 @@ class MetadataController(QObject):
         self._principal.ejecutar(
             svc.add_tags(usar_excel, excel, tags, blog=blog, dry_run=dry_run))
 
-    def tag_stats(self, usar_excel: bool, excel: str, blog: str, top: int) -> None:
-        self._principal.ejecutar(svc.tag_stats(usar_excel, excel, top=top, blog=blog))
+    def tag_stats(self, usar_excel: bool, excel: str, blog: str, top: int,
+                  formato: str = "text") -> None:
+        self._principal.ejecutar(
+            svc.tag_stats(usar_excel, excel, top=top, blog=blog, formato=formato))
 
     def audit_tags(self, usar_excel: bool, excel: str, blog: str, umbral: float) -> None:
         self._principal.ejecutar(svc.audit_tags(usar_excel, excel, umbral=umbral, blog=blog))
@@ -63,3 +68,6 @@ class MetadataController(QObject):
 
     def sync_pdf_urls(self, usar_excel: bool, excel: str, blog: str, dry_run: bool) -> None:
         self._principal.ejecutar(svc.sync_pdf_urls(usar_excel, excel, blog=blog, dry_run=dry_run))
+
+    def sync_derived(self, usar_excel: bool, excel: str, blog: str, dry_run: bool) -> None:
+        self._principal.ejecutar(svc.sync_derived(usar_excel, excel, blog=blog, dry_run=dry_run))
@@ -86,6 +86,11 @@ def add_columns(excel: str, campos: list[str], dry_run: bool = False) -> Command
     return _cmd(args, f"Agregar columnas al Excel: {', '.join(campos)}")
 
 
+def suggest_columns(excel: str, top: int = 10) -> Command:
+    return _cmd(["add-columns", str(settings().docs_dir()), excel, "--suggest", str(top),
+                 *_config_args()], "Sugerir columnas nuevas por cobertura")
+
+
 # --- Tags (destino: Excel .xlsx o directorio de blogs) ----------------------------
 
 def _destino(usar_excel: bool, excel: str) -> str:
@@ -119,8 +124,12 @@ def add_tags(usar_excel: bool, excel: str, tags: list[str], **kw) -> Command:
                     f"Agregar tags: {', '.join(tags)}", **kw)
 
 
-def tag_stats(usar_excel: bool, excel: str, top: int = 20, blog: str = "") -> Command:
-    return _tag_cmd("tag-stats", _destino(usar_excel, excel), ["--top", str(top)],
+def tag_stats(usar_excel: bool, excel: str, top: int = 20, blog: str = "",
+              formato: str = "text") -> Command:
+    extra = ["--top", str(top)]
+    if formato != "text":
+        extra += ["--format", formato]
+    return _tag_cmd("tag-stats", _destino(usar_excel, excel), extra,
                     "Estadísticas de tags", blog=blog)
 
 
@@ -139,3 +148,9 @@ def sync_dates(usar_excel: bool, excel: str, **kw) -> Command:
 def sync_pdf_urls(usar_excel: bool, excel: str, **kw) -> Command:
     return _tag_cmd("sync-pdf-urls", _destino(usar_excel, excel), [],
                     "Sincronizar citation.pdf-url", **kw)
+
+
+def sync_derived(usar_excel: bool, excel: str, reglas: list[str] | None = None, **kw) -> Command:
+    extra = ["--rules", *reglas] if reglas else []
+    return _tag_cmd("sync-derived", _destino(usar_excel, excel), extra,
+                    "Sincronizar campos derivados de la ruta", **kw)
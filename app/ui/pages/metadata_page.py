@@ -76,6 +76,7 @@ class MetadataPage(QWidget):
             ("🔍 Ver diferencias", self._diferencias),
             ("⬇ Aplicar Excel → .qmd", self._update),
             ("🆕 Detectar campos nuevos", self._ctl.detect_new_fields),
+            ("💡 Sugerir columnas", self._sugerir_columnas),
             ("⚙ Crear configuración", self._ctl.create_config),
         ]:
             boton = QPushButton(texto)
@@ -108,8 +109,12 @@ class MetadataPage(QWidget):
         boton_pdf = QPushButton("🔗 Sincronizar citation.pdf-url")
         boton_pdf.clicked.connect(
             lambda: self._ctl.sync_pdf_urls(*self._destino(), self._blog_sel(), self._es_dry()))
+        boton_todo = QPushButton("🧮 Todo en una pasada")
+        boton_todo.clicked.connect(
+            lambda: self._ctl.sync_derived(*self._destino(), self._blog_sel(), self._es_dry()))
         fila_ruta.addWidget(boton_fechas)
         fila_ruta.addWidget(boton_pdf)
+        fila_ruta.addWidget(boton_todo)
         fila_ruta.addStretch(1)
         layout.addWidget(caja_ruta)
         layout.addStretch(1)
@@ -163,6 +168,12 @@ class MetadataPage(QWidget):
         except ValueError:
             pass
 
+    def _sugerir_columnas(self) -> None:
+        try:
+            self._ctl.suggest_columns(self._excel_path(), 10)
+        except ValueError:
+            pass
+
     def _update(self) -> None:
         try:
             excel = self._excel_path()
@@ -211,8 +222,13 @@ class MetadataPage(QWidget):
                 pass
 
     def _stats_tags(self) -> None:
+        formato, ok = QInputDialog.getItem(
+            self, "Estadísticas de tags", "Formato de salida:",
+            ["text", "json", "csv"], 0, False)
+        if not ok:
+            return
         try:
-            self._ctl.tag_stats(*self._destino(), self._blog_sel(), 30)
+            self._ctl.tag_stats(*self._destino(), self._blog_sel(), 30, formato)
         except ValueError:
             pass
 
@@ -15,10 +15,146 @@ El script es idempotente: ejecutarlo múltiples veces produce el mismo resultado
 
 import os
 import re
+import shutil
+import tempfile
 from pathlib import Path
 import argparse
 
 
+# Primer bloque que se lee de cada archivo; se duplica hasta encontrar el
+# --- de cierre del YAML (el cuerpo del documento no se carga en memoria)
+HEAD_CHUNK_SIZE = 4096
+
+# Posible --- de cierre: al inicio de línea o pegado a la línea anterior
+CLOSING_RE = re.compile(rb'\n---|---[ \t\r\f\v]*\n')
+BLANK_RE = re.compile(rb'\s*')
+
+
+def read_head(filepath: Path):
+    """
+    Lee solo la cabecera del archivo: desde el primer --- hasta el ---
+    de cierre y los espacios en blanco que lo siguen.
+
+    Devuelve (cabecera_en_texto, offset_del_cuerpo_en_bytes). Si no hay
+    cierre, la cabecera es el archivo completo.
+    """
+    with open(filepath, 'rb') as f:
+        chunk_size = HEAD_CHUNK_SIZE
+        head = b''
+        while True:
+            chunk = f.read(chunk_size)
+            head += chunk
+            at_eof = len(chunk) < chunk_size
+            closing = CLOSING_RE.search(head, 3)
+            if closing is not None:
+                dashes = head.index(b'---', closing.start())
+                end = BLANK_RE.match(head, dashes + 3).end()
+                if end < len(head) or at_eof:
+                    break
+            elif at_eof:
+                end = len(head)
+                break
+            chunk_size *= 2
+
+    # Mismos saltos de línea que una lectura en modo texto
+    text = head[:end].decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+    return text, end
+
+
+def build_correct_format(content: str, body: str = ''):
+    """
+    Aplica el formato correcto al texto `content` (seguido de `body`, que
+    se deja tal cual). Devuelve (formato_correcto, contenido_tras_yaml) o
+    None si no hay bloque YAML válido.
+    """
+    # Primero, normalizar el caso donde --- está pegado a la línea anterior
+    # Buscar patrones como: "draft: false---" o "text---"
+    content_normalized = re.sub(
+        r'([^\n])---\s*\n',
+        r'\1\n---\n',
+        content
+    )
+
+    # Ahora buscar el bloque YAML completo
+    # Patrón más flexible que captura el YAML y todo lo que sigue
+    match = re.match(r'^---\s*\n(.*?)\n---\s*(.*)$', content_normalized, re.DOTALL)
+
+    if not match:
+        return None
+
+    yaml_content = match.group(1)  # Contenido entre los ---
+    after_yaml = match.group(2) + body  # Todo después del segundo ---
+
+    # Limpiar espacios en blanco al inicio del contenido después de ---
+    after_yaml = after_yaml.lstrip('\n\r\t ')
+
+    # Construir el formato correcto
+    if after_yaml:
+        # Si hay contenido, debe haber exactamente una línea en blanco después de ---
+        return f"---\n{yaml_content}\n---\n\n{after_yaml}", after_yaml
+    # Si no hay contenido después del YAML
+    return f"---\n{yaml_content}\n---\n", after_yaml
+
+
+def detect_newline(filepath: Path) -> str:
+    """
+    Salto de línea del archivo, según su primera línea (el --- de
+    apertura): el encabezado corregido se escribe con el mismo que el
+    cuerpo, que se copia tal cual.
+    """
+    with open(filepath, 'rb') as f:
+        first = f.readline()
+    return '\r\n' if first.endswith(b'\r\n') else '\n'
+
+
+def write_fixed(filepath: Path, header: str, body_offset: int):
+    """
+    Escribe `header` seguido del cuerpo original, copiado por bloques desde
+    `body_offset`, a través de un temporal que reemplaza al original
+    (mismos permisos, dueño y grupo si se puede).
+    `header` viene con saltos \n y se escribe con los del archivo.
+
+    Un enlace simbólico se resuelve y se reescribe su destino; un archivo
+    con varios enlaces duros se reescribe en el sitio (no atómico) para
+    no separarlo de los demás enlaces.
+    """
+    newline = detect_newline(filepath)
+    if newline != '\n':
+        header = header.replace('\n', newline)
+    target = filepath.resolve()
+    stat = target.stat()
+
+    if stat.st_nlink > 1:
+        with open(target, 'r+b') as f:
+            f.seek(body_offset)
+            body = f.read()
+            f.seek(0)
+            f.write(header.encode('utf-8'))
+            f.write(body)
+            f.truncate()
+        return
+
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f".{target.name}.", suffix=".tmp", dir=target.parent
+    )
+    try:
+        with os.fdopen(fd, 'wb') as out, open(target, 'rb') as src:
+            out.write(header.encode('utf-8'))
+            src.seek(body_offset)
+            shutil.copyfileobj(src, out)
+        shutil.copymode(target, tmp_path)
+        if hasattr(os, 'chown'):
+            try:
+                os.chown(tmp_path, stat.st_uid, stat.st_gid)
+            except PermissionError:
+                pass
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
 def fix_yaml_separator(filepath: Path, dry_run: bool = False) -> bool:
     """
     Repara el formato del bloque YAML frontmatter.
@@ -31,40 +167,35 @@ def fix_yaml_separator(filepath: Path, dry_run: bool = False) -> bool:
     ## Contenido
     
     Donde hay EXACTAMENTE una línea en blanco entre --- y el contenido.
+
+    Solo se lee y se corrige la cabecera; el cuerpo del documento se
+    copia byte a byte desde el disco.
     """
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Primero, normalizar el caso donde --- está pegado a la línea anterior
-        # Buscar patrones como: "draft: false---" o "text---"
-        content_normalized = re.sub(
-            r'([^\n])---\s*\n',
-            r'\1\n---\n',
-            content
-        )
-        
-        # Ahora buscar el bloque YAML completo
-        # Patrón más flexible que captura el YAML y todo lo que sigue
-        match = re.match(r'^---\s*\n(.*?)\n---\s*(.*)$', content_normalized, re.DOTALL)
-        
-        if not match:
+        head, body_offset = read_head(filepath)
+
+        # Inicio del cuerpo: basta para decidir si hay contenido y para
+        # la vista previa (siempre es un sufijo común de ambos textos)
+        with open(filepath, 'rb') as f:
+            f.seek(body_offset)
+            body_start = f.read(256).decode('utf-8', errors='ignore')
+
+        content = head + body_start
+        result = build_correct_format(head, body_start)
+        header_only = True
+
+        if result is None and head.startswith('---'):
+            # Caso raro (YAML vacío, cierre ambiguo…): analizar el archivo completo
+            with open(filepath, 'r', encoding='utf-8') as f:
+                content = f.read()
+            result = build_correct_format(content)
+            header_only = False
+
+        if result is None:
             print(f"⚠️  No se encontró bloque YAML válido en: {filepath}")
             return False
-        
-        yaml_content = match.group(1)  # Contenido entre los ---
-        after_yaml = match.group(2)     # Todo después del segundo ---
-        
-        # Limpiar espacios en blanco al inicio del contenido después de ---
-        after_yaml = after_yaml.lstrip('\n\r\t ')
-        
-        # Construir el formato correcto
-        if after_yaml:
-            # Si hay contenido, debe haber exactamente una línea en blanco después de ---
-            correct_format = f"---\n{yaml_content}\n---\n\n{after_yaml}"
-        else:
-            # Si no hay contenido después del YAML
-            correct_format = f"---\n{yaml_content}\n---\n"
+
+        correct_format, after_yaml = result
         
         # Comparar con el contenido original
         if content != correct_format:
@@ -76,8 +207,13 @@ def fix_yaml_separator(filepath: Path, dry_run: bool = False) -> bool:
                 print(f"   Contenido después de ---: '{preview}...'")
             
             if not dry_run:
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(correct_format)
+                if header_only:
+                    header = correct_format[:len(correct_format) - len(body_start)]
+                    write_fixed(filepath, header, body_offset)
+                else:
+                    newline = detect_newline(filepath)
+                    with open(filepath, 'w', encoding='utf-8', newline=newline) as f:
+                        f.write(correct_format)
                 print(f"   ✅ Archivo corregido")
             else:
                 print(f"   🔍 [DRY RUN] Se corregiría este archivo")
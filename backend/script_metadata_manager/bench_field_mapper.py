@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+bench_field_mapper.py — Micro-benchmark de lib/field_mapper.py
+==============================================================
+Mide, por fila, las dos rutas calientes de create-template / update:
+
+  extracción  [get(yaml) for get in compile_getters(ALL_FIELDS)]
+  aplicación  apply_row_to_yaml(yaml, row, changes)
+
+con las funciones compiladas (una vez por juego de columnas, como en los
+comandos) y con la versión anterior, que resolvía cada columna en cada
+llamada (copia congelada en bench_field_mapper_baseline.py). Antes de
+medir se comprueba que ambas den los mismos valores y el mismo YAML.
+
+Los artículos son sintéticos (semilla fija) o, con --base, los index.qmd
+reales de una colección.
+
+Uso:
+    python bench_field_mapper.py [--rows 2000] [--repeat 5] [--base DIR]
+"""
+
+import argparse
+import copy
+import datetime
+import random
+import sys
+import timeit
+from pathlib import Path
+
+import pandas as pd
+
+import bench_field_mapper_baseline as baseline
+from lib.config import ALL_FIELDS
+from lib.field_mapper import apply_row_to_yaml, compile_getters
+from lib.yaml_parser import parse_frontmatter, read_frontmatter
+
+
+def synthetic_yaml(rnd: random.Random, i: int) -> dict:
+    """Un frontmatter con la forma habitual de un artículo de la colección."""
+    return {
+        "title": f"Artículo {i}",
+        "subtitle": "Un subtítulo",
+        "date": datetime.date(2024, 1, 1) + datetime.timedelta(days=i % 365),
+        "draft": rnd.random() < 0.1,
+        "abstract": "Resumen del artículo. " * rnd.randint(1, 6),
+        "tags": rnd.sample(["economia", "finanzas", "python", "r", "datos",
+                            "estadistica", "mercados"], 3),
+        "categories": ["blog"],
+        "citation": {"type": "article-journal",
+                     "pdf-url": f"https://example.org/{i}.pdf"},
+        "author": [
+            {"name": f"Autor {a}", "email": f"a{a}@example.org",
+             "corresponding": a == 1,
+             "affiliations": [{"name": "Universidad", "city": "Lima"}]}
+            for a in range(1, rnd.randint(1, 3) + 1)
+        ],
+    }
+
+
+def collection_yamls(base: Path, limit: int) -> list:
+    yamls = []
+    for path in sorted(base.rglob("index.qmd")):
+        found = read_frontmatter(path)
+        data = parse_frontmatter(found[0]) if found else None
+        if isinstance(data, dict):
+            yamls.append(data)
+            if len(yamls) == limit:
+                break
+    return yamls
+
+
+def best_per_row(fn, rows: int, repeat: int) -> float:
+    """Mejor tiempo de `repeat` corridas, en microsegundos por fila."""
+    return min(timeit.repeat(fn, number=1, repeat=repeat)) / rows * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--base", type=Path, help="Colección de index.qmd reales")
+    args = parser.parse_args()
+
+    if args.base:
+        yamls = collection_yamls(args.base, args.rows)
+        if not yamls:
+            sys.exit(f"❌ No hay index.qmd con YAML en {args.base}")
+    else:
+        rnd = random.Random(1)
+        yamls = [synthetic_yaml(rnd, i) for i in range(args.rows)]
+
+    getters = compile_getters(ALL_FIELDS)
+    df = pd.DataFrame([[get(y) for get in getters] for y in yamls],
+                      columns=ALL_FIELDS)
+    rows = [row for _, row in df.iterrows()]
+    n = len(yamls)
+
+    def extract_compiled():
+        for y in yamls:
+            [get(y) for get in getters]
+
+    def extract_baseline():
+        for y in yamls:
+            [baseline.extract_value(y, field) for field in ALL_FIELDS]
+
+    # apply_row_to_yaml puede modificar el dict: una copia por corrida
+    copies = iter([copy.deepcopy(yamls) for _ in range(2 * args.repeat)])
+
+    def apply_compiled():
+        for y, row in zip(next(copies), rows):
+            apply_row_to_yaml(y, row, [])
+
+    def apply_baseline():
+        for y, row in zip(next(copies), rows):
+            baseline.apply_row_to_yaml(y, row, [])
+
+    for y, row in zip(yamls, rows):
+        assert [get(y) for get in getters] == [
+            baseline.extract_value(y, field) for field in ALL_FIELDS
+        ]
+        new_changes, old_changes = [], []
+        assert apply_row_to_yaml(copy.deepcopy(y), row, new_changes) == \
+            baseline.apply_row_to_yaml(copy.deepcopy(y), row, old_changes)
+        assert new_changes == old_changes
+
+    print(f"\n📊 {n} artículos, {len(ALL_FIELDS)} columnas, "
+          f"mejor de {args.repeat} corridas\n")
+    for label, compiled, before in (
+        ("Extracción", extract_compiled, extract_baseline),
+        ("Aplicación", apply_compiled, apply_baseline),
+    ):
+        slow = best_per_row(before, n, args.repeat)
+        fast = best_per_row(compiled, n, args.repeat)
+        print(f"   {label}: {slow:7.1f} µs/fila antes → "
+              f"{fast:7.1f} µs/fila compilado (x{slow / fast:.1f})")
+    print()
+
+
+if __name__ == "__main__":
+    main()
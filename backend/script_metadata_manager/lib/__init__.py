@@ -10,27 +10,33 @@ from .config import (
     AUTHOR,
     EMAIL,
 )
-from .collector import collect_index_files
+from .collector import collect_index_files, load_article_record, ArticleRecord
 from .yaml_parser import (
     extract_yaml_only_index,
     extract_yaml_merged,
     detect_document_mode,
     is_article_index,
     flatten_yaml_keys,
+    flatten_yaml_types,
 )
+from .yaml_emitter import serialize_frontmatter
 from .field_mapper import extract_value, apply_row_to_yaml, reorder_yaml
 from .excel_writer import (
     build_metadata_sheet,
     build_instructions_sheet,
     append_new_articles,
+    update_template_incremental,
     add_columns_to_excel,
 )
+from .excel_store import read_metadata_sheet
+from .metadata_table import MetadataTable
 from .qmd_updater import update_from_excel
 from .sync import (
     find_differences,
     sync_single_interactive,
     sync_batch_interactive,
     detect_new_fields,
+    suggest_columns,
 )
 from .tag_utils import (
     normalize_tag,
@@ -38,6 +44,11 @@ from .tag_utils import (
     transform_tags,
     parse_replacement_args,
     find_similar_pairs,
+    TagPairScores,
+    cluster_tags,
+    TagVocabulary,
+    TagTransform,
+    TagPlan,
 )
 from .tag_operations import apply_tag_ops_to_files, apply_tag_ops_to_excel
 from .path_sync import (
@@ -46,10 +57,16 @@ from .path_sync import (
     sync_pdf_urls_files,
     sync_pdf_urls_excel,
     resolve_blog_base_urls,
+    sync_derived_files,
+    sync_derived_excel,
+    DerivedRule,
+    load_derived_rules,
 )
 from .tag_reports import (
     collect_tag_data_from_files,
     collect_tag_data_from_excel,
     print_tag_stats,
+    compute_tag_stats,
+    write_tag_stats,
     print_tag_audit,
 )
@@ -0,0 +1,193 @@
+"""
+lib/article_index.py
+====================
+Base común de los índices persistentes de la colección (tag_index,
+schema_index): un SQLite junto a la caché de frontmatter con una fila
+por artículo (ruta, blog, tipo de documento, ctime y stat) y el listado
+de cada carpeta, igual que en el manifiesto de create-template.
+
+refresh() pone el índice al día de forma incremental: solo lista las
+carpetas cuyo mtime cambió, solo relee los index.qmd cuyo stat cambió y
+borra los artículos que desaparecieron. Cada subclase declara sus tablas
+y guarda en ellas lo que necesita de cada artículo (_store_data).
+
+Un artículo solo cuenta si tiene YAML propio o heredado de _metadata.yml
+(mismo criterio que collect_index_files); ese dato se calcula al indexar
+el archivo, así que crear o vaciar un _metadata.yml no reindexa los
+artículos que no cambiaron.
+
+Los índices son desechables como la caché: borrarlos solo hace que la
+siguiente ejecución vuelva a indexar la colección. Con --no-cache no se
+usan.
+
+Depende de: collector, frontmatter_cache.
+"""
+
+import abc
+import json
+import sqlite3
+from pathlib import Path
+from typing import Iterable, List, Optional, Set, Tuple
+
+from .collector import load_article_records, scan_article_files, select_blog_dirs
+from .frontmatter_cache import get_active_cache
+
+
+class ArticleIndex(abc.ABC):
+    """Artículos de la colección sobre SQLite; las subclases agregan sus datos."""
+
+    FILENAME = ""
+    LABEL = ""
+    # Subir este número invalida los índices existentes (cambio de formato)
+    SCHEMA_VERSION = 1
+    # Tablas propias (se borran al cambiar de versión) y, de ellas, las que
+    # tienen filas por artículo (columna path; se borran al reindexarlo)
+    TABLES: Tuple[str, ...] = ()
+    ARTICLE_TABLES: Tuple[str, ...] = ()
+    DDL = ""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.reindexed = 0
+        self._conn = sqlite3.connect(str(self.db_path))
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != self.SCHEMA_VERSION:
+            for table in ("articles", "dirs", *self.TABLES):
+                self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self._conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS articles ("
+            " path TEXT PRIMARY KEY, base TEXT, ruta TEXT, blog TEXT,"
+            " mode TEXT, ctime_ns INTEGER, mtime_ns INTEGER, size INTEGER,"
+            " valid INTEGER);"
+            "CREATE INDEX IF NOT EXISTS articles_blog ON articles (base, blog);"
+            "CREATE TABLE IF NOT EXISTS dirs ("
+            " base TEXT, blog TEXT, rel TEXT, mtime_ns INTEGER, subdirs TEXT,"
+            " has_index INTEGER, PRIMARY KEY (base, rel));"
+            + self.DDL
+        )
+
+    @classmethod
+    def open(
+        cls,
+        base_path: Path,
+        allowed_blogs: Set[str],
+        user_excluded_folders: Set[str],
+        blog_filter: Optional[str] = None,
+    ):
+        """
+        Abre el índice junto a la caché de frontmatter activa y lo pone al
+        día para los blogs a recorrer. Devuelve (índice, nombres de blog),
+        o None si no hay índice (--no-cache, o no se pudo abrir): en ese
+        caso el llamador recorre la colección como siempre. El llamador
+        cierra el índice.
+        """
+        cache = get_active_cache()
+        if cache is None:
+            return None
+        blog_dirs = select_blog_dirs(base_path, allowed_blogs, blog_filter) or []
+        try:
+            index = cls(cache.db_path.parent / cls.FILENAME)
+            index.refresh(base_path, blog_dirs, user_excluded_folders)
+        except sqlite3.Error as e:
+            print(f"⚠️  {cls.LABEL} deshabilitado: {e}")
+            return None
+        return index, [d.name for d in blog_dirs]
+
+    # -------------------------------------------------------------------------
+    # Actualización incremental
+    # -------------------------------------------------------------------------
+
+    def refresh(
+        self,
+        base_path: Path,
+        blog_dirs: List[Path],
+        user_excluded_folders: Set[str],
+    ):
+        """
+        Pone al día los artículos de `blog_dirs`: reindexa los index.qmd
+        nuevos o cuyo stat cambió y borra los que ya no existen.
+        """
+        base = str(Path(base_path).resolve())
+        blogs = [d.name for d in blog_dirs]
+        marks = ",".join("?" * len(blogs))
+
+        listings = {
+            rel: (mtime_ns, json.loads(subdirs), bool(has_index))
+            for rel, mtime_ns, subdirs, has_index in self._conn.execute(
+                "SELECT rel, mtime_ns, subdirs, has_index FROM dirs"
+                f" WHERE base = ? AND blog IN ({marks})", (base, *blogs),
+            )
+        }
+        found, listings = scan_article_files(
+            base_path, blog_dirs, user_excluded_folders, listings
+        )
+
+        stored = {
+            path: (mtime_ns, size, ctime_ns)
+            for path, mtime_ns, size, ctime_ns in self._conn.execute(
+                "SELECT path, mtime_ns, size, ctime_ns FROM articles"
+                f" WHERE base = ? AND blog IN ({marks})", (base, *blogs),
+            )
+        }
+        stale = []
+        for file_path, blog_dir in found:
+            try:
+                st = file_path.stat()
+            except OSError:
+                stale.append((file_path, blog_dir))
+                continue
+            known = stored.pop(str(file_path), None)
+            if known is None or known[:2] != (st.st_mtime_ns, st.st_size):
+                stale.append((file_path, blog_dir))
+            elif known[2] != st.st_ctime_ns:
+                self._conn.execute(
+                    "UPDATE articles SET ctime_ns = ? WHERE path = ?",
+                    (st.st_ctime_ns, str(file_path)),
+                )
+
+        self._forget(stored)
+        records = load_article_records(stale, base_path)
+        self._forget(str(file_path) for file_path, _ in stale)
+        for record in records:
+            if record is not None:
+                self._store(base, record)
+        self.reindexed = len(stale)
+
+        self._conn.execute(
+            f"DELETE FROM dirs WHERE base = ? AND blog IN ({marks})", (base, *blogs)
+        )
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (base, Path(rel).parts[0], rel, mtime_ns,
+                 json.dumps(subdirs), int(has_index))
+                for rel, (mtime_ns, subdirs, has_index) in listings.items()
+            ],
+        )
+        self._conn.commit()
+
+    def _forget(self, paths: Iterable[str]):
+        rows = [(p,) for p in paths]
+        for table in ("articles", *self.ARTICLE_TABLES):
+            self._conn.executemany(f"DELETE FROM {table} WHERE path = ?", rows)
+
+    def _store(self, base: str, record):
+        path = str(record.file_path)
+        self._conn.execute(
+            "INSERT INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                path, base, record.ruta_archivo, record.blog_nombre,
+                record.tipo_documento, record.file_path.stat().st_ctime_ns,
+                record.mtime_ns, record.size, int(bool(record.yaml_merged)),
+            ),
+        )
+        self._store_data(path, record)
+
+    @abc.abstractmethod
+    def _store_data(self, path: str, record):
+        """Guarda en las tablas propias lo que la subclase indexa del artículo."""
+
+    def close(self):
+        self._conn.commit()
+        self._conn.close()
@@ -5,23 +5,148 @@ Recorre el árbol de blogs buscando archivos index.qmd que sean artículos
 reales (carpeta con fecha), aplica los filtros de configuración (allowed_blogs,
 excluded_folders) y devuelve un DataFrame ordenado con metadatos básicos.
 
+Cada artículo se lee y parsea UNA sola vez: el resultado es un
+ArticleRecord (YAML crudo + offset del cuerpo, YAML solo-index, YAML
+fusionado con _metadata.yml y tipo de documento) que viaja en la columna
+`articulo` del DataFrame para que los comandos no vuelvan a abrir el
+archivo.
+
 Depende de: config, yaml_parser.
 """
 
 import os
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 
 import pandas as pd
 
 from .config import SYSTEM_EXCLUDED_FOLDERS, EXCLUDED_INDEX_FILES
+from .frontmatter_cache import FrontmatterEntry
 from .yaml_parser import (
     is_article_index,
-    extract_yaml_merged,
-    detect_document_mode,
+    load_frontmatter_entries,
+    load_frontmatter_entry,
+    merge_with_metadata_yml,
 )
 
+# Procesos para parsear frontmatter en paralelo (--jobs); main lo ajusta
+_default_jobs = 1
+
+
+def set_default_jobs(jobs: Optional[int]):
+    """Fija los procesos que usa collect_index_files si no se le indican."""
+    global _default_jobs
+    _default_jobs = max(1, jobs or os.cpu_count() or 1)
+
+
+def get_default_jobs() -> int:
+    """Procesos por defecto fijados con set_default_jobs (--jobs)."""
+    return _default_jobs
+
+
+# =============================================================================
+# REGISTRO DE ARTÍCULO
+# =============================================================================
+
+@dataclass
+class ArticleRecord:
+    """Un artículo recolectado: todo lo que los comandos necesitan leer."""
+
+    file_path: Path
+    ruta_archivo: str        # relativa a base_path
+    blog_nombre: str
+    tipo_documento: str
+    fecha_creacion: datetime
+    mtime_ns: int
+    size: int
+    raw_yaml: str            # texto entre los --- (sin los delimitadores)
+    body_offset: int         # dónde empieza el cuerpo (tras el --- de cierre)
+    yaml_index: Dict         # solo lo escrito en el index.qmd
+    yaml_merged: Dict        # index.qmd + _metadata.yml más cercano
+
+
+def load_article_record(
+    file_path: Path, base_path: Path, blog_nombre: Optional[str] = None
+) -> Optional[ArticleRecord]:
+    """
+    Construye el ArticleRecord de un index.qmd con una lectura y un parseo
+    (o ninguno, si la caché de frontmatter está vigente).
+    None si el archivo no se puede leer o no tiene YAML.
+    """
+    try:
+        st = file_path.stat()
+    except OSError as e:
+        print(f"⚠️  Error leyendo {file_path.name}: {e}")
+        return None
+    entry = load_frontmatter_entry(file_path, st)
+    return _build_record(file_path, base_path, blog_nombre, st, entry)
+
+
+def load_article_records(
+    files: List[Tuple[Path, Path]], base_path: Path, jobs: Optional[int] = None
+) -> List[Optional[ArticleRecord]]:
+    """
+    load_article_record en lote para [(index.qmd, carpeta_del_blog)]: el
+    YAML de los archivos fuera de caché se parsea en paralelo (--jobs).
+    Conserva el orden de `files`; None donde no se pudo leer.
+    """
+    results: List[Optional[ArticleRecord]] = [None] * len(files)
+    candidates, positions = [], []
+    for pos, (file_path, _) in enumerate(files):
+        try:
+            candidates.append((file_path, file_path.stat()))
+            positions.append(pos)
+        except OSError as e:
+            print(f"⚠️  Error leyendo {file_path.name}: {e}")
+
+    entries = load_frontmatter_entries(
+        candidates, jobs=jobs if jobs is not None else _default_jobs
+    )
+    for pos, (file_path, st), entry in zip(positions, candidates, entries):
+        results[pos] = _build_record(
+            file_path, base_path, files[pos][1].name, st, entry
+        )
+    return results
+
+
+def _build_record(
+    file_path: Path,
+    base_path: Path,
+    blog_nombre: Optional[str],
+    st: os.stat_result,
+    entry: Optional[FrontmatterEntry],
+) -> Optional[ArticleRecord]:
+    if entry is None:
+        return None
+    rel_path = file_path.relative_to(base_path)
+    return ArticleRecord(
+        file_path=file_path,
+        ruta_archivo=str(rel_path),
+        blog_nombre=blog_nombre or rel_path.parts[0],
+        tipo_documento=entry.mode or "jou",
+        fecha_creacion=datetime.fromtimestamp(st.st_ctime),
+        mtime_ns=st.st_mtime_ns,
+        size=st.st_size,
+        raw_yaml=entry.raw,
+        body_offset=entry.body_offset,
+        yaml_index=entry.data,
+        yaml_merged=merge_with_metadata_yml(entry.data, file_path, base_path),
+    )
+
+
+def article_yaml(row, base_path: Path) -> Optional[Dict]:
+    """
+    YAML solo-index de una fila del DataFrame de collect_index_files.
+    Usa el ArticleRecord ya cargado; si la fila no lo trae (DataFrame
+    construido por otra vía) lo carga desde el archivo.
+    """
+    record = row.get("articulo") if hasattr(row, "get") else None
+    if record is None:
+        record = load_article_record(base_path / row["ruta_archivo"], base_path)
+    return record.yaml_index if record is not None else None
+
 
 # =============================================================================
 # FILTROS DE CARPETAS Y ARCHIVOS
@@ -42,6 +167,99 @@ def should_exclude_file(file_path: Path) -> bool:
     return file_path.name in EXCLUDED_INDEX_FILES
 
 
+def select_blog_dirs(
+    base_path: Path,
+    allowed_blogs: Set[str],
+    blog_name: Optional[str] = None,
+) -> Optional[List[Path]]:
+    """
+    Carpetas de blog a recorrer: la de `blog_name` (probando también con
+    prefijo pub_) o todas las visibles, filtradas por allowed_blogs.
+    None si se pidió un blog que no existe.
+    """
+    if blog_name:
+        candidate = base_path / blog_name
+        if not candidate.exists():
+            # Intentar con prefijo pub_ si no se encuentra exacto
+            candidate = base_path / f"pub_{blog_name}"
+        if not candidate.is_dir():
+            print(f"⚠️  El blog '{blog_name}' no existe en {base_path}")
+            return None
+        return [candidate]
+
+    all_dirs = [
+        d for d in base_path.iterdir()
+        if d.is_dir() and not d.name.startswith(".")
+    ]
+    if allowed_blogs:
+        return [d for d in all_dirs if d.name in allowed_blogs]
+    return all_dirs
+
+
+def scan_article_files(
+    base_path: Path,
+    blog_dirs: List[Path],
+    user_excluded_folders: Set[str],
+    dir_listings: Dict[str, Tuple[int, List[str], bool]],
+) -> Tuple[List[Tuple[Path, Path]], Dict[str, Tuple[int, List[str], bool]]]:
+    """
+    Recorrido equivalente al de collect_index_files pero reutilizando el
+    listado de las carpetas cuyo mtime no cambió (`dir_listings`, del
+    manifiesto de create-template): de esas solo se hace stat, sin
+    listar su contenido. El mtime de una carpeta solo cambia cuando se
+    crea, borra o renombra algo DENTRO de ella, así que el listado
+    guardado sigue siendo exacto.
+
+    Devuelve ([(index.qmd, carpeta_del_blog)], listados_actualizados).
+    Los index.qmd devueltos ya pasaron los filtros de archivo y de
+    artículo con fecha; falta leer su YAML.
+    """
+    found: List[Tuple[Path, Path]] = []
+    listings: Dict[str, Tuple[int, List[str], bool]] = {}
+
+    for blog_dir in blog_dirs:
+        stack = [blog_dir]
+        while stack:
+            directory = stack.pop()
+            rel = str(directory.relative_to(base_path))
+            try:
+                mtime_ns = directory.stat().st_mtime_ns
+            except OSError:
+                continue
+
+            cached = dir_listings.get(rel)
+            if cached is not None and cached[0] == mtime_ns:
+                _, subdirs, has_index = cached
+            else:
+                subdirs, has_index = [], False
+                try:
+                    with os.scandir(directory) as it:
+                        for entry in it:
+                            if entry.is_dir():
+                                # os.walk no entra en enlaces a carpetas
+                                if not entry.is_symlink():
+                                    subdirs.append(entry.name)
+                            elif entry.name == "index.qmd":
+                                has_index = True
+                except OSError:
+                    continue
+                subdirs.sort()
+            listings[rel] = (mtime_ns, subdirs, has_index)
+
+            if has_index:
+                file_path = directory / "index.qmd"
+                if not should_exclude_file(file_path) and is_article_index(file_path):
+                    found.append((file_path, blog_dir))
+
+            for name in reversed(subdirs):
+                if not should_exclude_folder(
+                    directory / name, SYSTEM_EXCLUDED_FOLDERS, user_excluded_folders
+                ):
+                    stack.append(directory / name)
+
+    return found, listings
+
+
 # =============================================================================
 # RECOLECCIÓN PRINCIPAL
 # =============================================================================
@@ -52,6 +270,7 @@ def collect_index_files(
     user_excluded_folders: Set[str],
     blog_name: Optional[str] = None,
     verbose: bool = True,
+    jobs: Optional[int] = None,
 ) -> pd.DataFrame:
     """
     Recorre base_path buscando index.qmd de artículos válidos.
@@ -63,42 +282,30 @@ def collect_index_files(
     user_excluded_folders: Carpetas adicionales a ignorar (según config.yml).
     blog_name            : Si se indica, limita la búsqueda a ese blog.
     verbose              : Mostrar progreso detallado.
+    jobs                 : Procesos para leer/parsear el YAML (None → el
+                           valor de --jobs; 1 → en serie).
 
     Devuelve
     --------
     DataFrame con columnas:
         blog_nombre, ruta_archivo, tipo_documento, fecha_creacion,
-        titulo, draft
+        titulo, draft, articulo (ArticleRecord)
     Ordenado por (blog_nombre, tipo_documento, fecha_creacion desc).
     """
     index_files = []
 
-    # Determinar qué blogs procesar
-    if blog_name:
-        candidate = base_path / blog_name
-        if not candidate.exists():
-            # Intentar con prefijo pub_ si no se encuentra exacto
-            candidate = base_path / f"pub_{blog_name}"
-        if not candidate.is_dir():
-            print(f"⚠️  El blog '{blog_name}' no existe en {base_path}")
-            return pd.DataFrame()
-        blogs_to_process = [candidate]
-    else:
-        all_dirs = [
-            d for d in base_path.iterdir()
-            if d.is_dir() and not d.name.startswith(".")
-        ]
-        if allowed_blogs:
-            blogs_to_process = [d for d in all_dirs if d.name in allowed_blogs]
-        else:
-            blogs_to_process = all_dirs
+    blogs_to_process = select_blog_dirs(base_path, allowed_blogs, blog_name)
+    if blogs_to_process is None:
+        return pd.DataFrame()
 
     total_found = total_articles = total_skipped = 0
 
+    # 1) Recorrido (solo nombres de archivo): por blog, la lista ordenada
+    #    de eventos a reportar y los candidatos a artículo
+    walked = []
+    candidates = []
     for blog_dir in blogs_to_process:
-        print(f"\n📂 Procesando blog: {blog_dir.name}")
-        blog_articles = blog_skipped = 0
-
+        events = []
         for root, dirs, files in os.walk(blog_dir):
             root_path = Path(root)
             dirs[:] = [
@@ -113,60 +320,86 @@ def collect_index_files(
                     continue
 
                 file_path = root_path / fname
-                total_found += 1
 
                 # Excluir archivos especiales
                 if should_exclude_file(file_path):
-                    if verbose:
-                        print(f"  ⏭️  Omitido (config): {fname}")
-                    total_skipped += 1
-                    blog_skipped += 1
-                    continue
-
+                    events.append(("config", file_path))
                 # Solo artículos con fecha en carpeta
-                if not is_article_index(file_path):
-                    if verbose:
-                        rel = file_path.relative_to(base_path)
-                        print(f"  ⏭️  Omitido (no es artículo): {rel}")
-                    total_skipped += 1
-                    blog_skipped += 1
-                    continue
-
-                # Extraer YAML combinado (index + _metadata.yml)
-                yaml_data = extract_yaml_merged(file_path, base_path)
-                if not yaml_data:
-                    if verbose:
-                        print(f"  ⚠️  Sin YAML: {file_path.name}")
-                    total_skipped += 1
-                    blog_skipped += 1
-                    continue
-
-                doc_type = detect_document_mode(file_path)
-
-                try:
-                    ctime = datetime.fromtimestamp(file_path.stat().st_ctime)
-                except Exception:
-                    ctime = datetime.now()
+                elif not is_article_index(file_path):
+                    events.append(("no_article", file_path))
+                else:
+                    try:
+                        st = file_path.stat()
+                    except OSError as e:
+                        print(f"⚠️  Error leyendo {file_path.name}: {e}")
+                        events.append(("no_yaml", file_path))
+                        continue
+                    events.append(("candidate", len(candidates)))
+                    candidates.append((file_path, st))
+        walked.append((blog_dir, events))
+
+    # 2) Lectura + parseo de los candidatos (en paralelo con --jobs)
+    entries = load_frontmatter_entries(
+        candidates, jobs=jobs if jobs is not None else _default_jobs
+    )
+
+    # 3) Reporte y registros, en el mismo orden del recorrido
+    for blog_dir, events in walked:
+        print(f"\n📂 Procesando blog: {blog_dir.name}")
+        blog_articles = blog_skipped = 0
 
-                rel_path = file_path.relative_to(base_path)
+        for kind, payload in events:
+            total_found += 1
 
-                index_files.append({
-                    "blog_nombre":    blog_dir.name,
-                    "ruta_archivo":   str(rel_path),
-                    "tipo_documento": doc_type,
-                    "fecha_creacion": ctime,
-                    "titulo":         yaml_data.get("title", ""),
-                    "draft":          yaml_data.get("draft", True),
-                })
+            if kind == "candidate":
+                file_path, st = candidates[payload]
+                record = _build_record(
+                    file_path, base_path, blog_dir.name, st, entries[payload]
+                )
+            else:
+                file_path, record = payload, None
 
-                total_articles += 1
-                blog_articles += 1
+            if kind == "config":
+                if verbose:
+                    print(f"  ⏭️  Omitido (config): {file_path.name}")
+                total_skipped += 1
+                blog_skipped += 1
+                continue
 
+            if kind == "no_article":
                 if verbose:
-                    print(
-                        f"  ✅ Artículo: "
-                        f"{file_path.parent.name}/{file_path.name}"
-                    )
+                    rel = file_path.relative_to(base_path)
+                    print(f"  ⏭️  Omitido (no es artículo): {rel}")
+                total_skipped += 1
+                blog_skipped += 1
+                continue
+
+            # Sin YAML propio ni heredado de _metadata.yml
+            if record is None or not record.yaml_merged:
+                if verbose:
+                    print(f"  ⚠️  Sin YAML: {file_path.name}")
+                total_skipped += 1
+                blog_skipped += 1
+                continue
+
+            index_files.append({
+                "blog_nombre":    record.blog_nombre,
+                "ruta_archivo":   record.ruta_archivo,
+                "tipo_documento": record.tipo_documento,
+                "fecha_creacion": record.fecha_creacion,
+                "titulo":         record.yaml_merged.get("title", ""),
+                "draft":          record.yaml_merged.get("draft", True),
+                "articulo":       record,
+            })
+
+            total_articles += 1
+            blog_articles += 1
+
+            if verbose:
+                print(
+                    f"  ✅ Artículo: "
+                    f"{file_path.parent.name}/{file_path.name}"
+                )
 
         print(
             f"  📊 Blog '{blog_dir.name}': "
@@ -5,12 +5,13 @@ Constantes globales, lista de campos, carpetas/archivos excluidos
 y carga del archivo metadata_config.yml.
 
 Todos los demás módulos importan sus constantes desde aquí.
-Nada en este archivo depende de otros módulos del proyecto.
+No depende de otros módulos del proyecto salvo yaml_codec.
 """
 
 from pathlib import Path
 from typing import Dict, Optional
-import yaml
+
+from .yaml_codec import dump_yaml, load_yaml
 
 
 # =============================================================================
@@ -114,7 +115,7 @@ def load_config(config_file: Optional[str]) -> Dict:
     if config_file and Path(config_file).exists():
         try:
             with open(config_file, "r", encoding="utf-8") as f:
-                return yaml.safe_load(f) or {}
+                return load_yaml(f) or {}
         except Exception as e:
             print(f"⚠️  Error leyendo configuración {config_file}: {e}")
     return {}
@@ -155,7 +156,7 @@ def create_default_config(base_path: str, output_path: str = "metadata_config.ym
     }
 
     with open(output_path, "w", encoding="utf-8") as f:
-        yaml.dump(config, f, allow_unicode=True, default_flow_style=False)
+        dump_yaml(config, f, allow_unicode=True, default_flow_style=False)
 
     print(f"✅ Configuración creada: {output_path}")
     print("   Edita allowed_blogs y excluded_folders según tu entorno")
@@ -0,0 +1,197 @@
+"""
+lib/excel_store.py
+==================
+Copia de trabajo de la hoja METADATOS en un SQLite junto al Excel
+(.quarto_metadata.xlsx.store.sqlite), una fila por artículo.
+
+El Excel sigue siendo la superficie de edición y la fuente de verdad;
+el store solo evita volver a parsear el XLSX cuando no cambió. Se valida
+con el stat del Excel (mtime_ns, size) y, si el stat cambió, con el hash
+de su contenido (guardar sin cambios en Excel/LibreOffice mueve el mtime
+pero no el contenido). Si el Excel cambió de verdad, se vuelve a
+importar con pd.read_excel y se reemplaza el store completo.
+
+read_metadata_sheet(excel_path) devuelve exactamente el DataFrame que
+devolvería pd.read_excel(excel_path, sheet_name="METADATOS"): mismas
+columnas, mismo orden de filas y mismos dtypes.
+
+Las filas y los metadatos se guardan como JSON con etiquetas (ver
+tagged_json), nunca con pickle: un store manipulado no puede ejecutar
+código al leerse. Una hoja con celdas de un tipo que tagged_json no
+admite simplemente no se guarda (se lee siempre del Excel).
+
+Como la caché de frontmatter, es desechable: borrarlo solo hace que la
+siguiente lectura importe el Excel de nuevo. --no-cache lo desactiva.
+
+Depende de: tagged_json.
+"""
+
+import hashlib
+import io
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from . import tagged_json
+
+STORE_SUFFIX = ".store.sqlite"
+
+# Subir este número invalida todos los stores existentes (cambio de formato)
+_SCHEMA_VERSION = 2
+
+# main lo apaga con --no-cache
+_enabled = True
+
+
+def set_store_enabled(enabled: bool):
+    """Activa o desactiva el store para todo el proceso."""
+    global _enabled
+    _enabled = enabled
+
+
+def store_path(excel_path: Path) -> Path:
+    """Ruta del store de un Excel: oculto y en la misma carpeta."""
+    excel_path = Path(excel_path)
+    return excel_path.parent / f".{excel_path.name}{STORE_SUFFIX}"
+
+
+# =============================================================================
+# LECTURA
+# =============================================================================
+
+def read_metadata_sheet(excel_path) -> pd.DataFrame:
+    """
+    Hoja METADATOS como DataFrame, desde el store si sigue vigente.
+    Los errores de lectura del Excel se propagan igual que los de
+    pd.read_excel; los del store solo hacen que se lea el Excel.
+    """
+    excel_path = Path(excel_path)
+    if not _enabled:
+        return pd.read_excel(excel_path, sheet_name="METADATOS")
+
+    st = excel_path.stat()
+    signature = (st.st_mtime_ns, st.st_size)
+    try:
+        conn = _connect(store_path(excel_path))
+    except sqlite3.Error:
+        return pd.read_excel(excel_path, sheet_name="METADATOS")
+
+    with closing(conn):
+        stored = _stored_source(conn)
+        if stored is not None and stored[:2] == signature:
+            df = _load_frame(conn)
+            if df is not None:
+                return df
+
+        data = excel_path.read_bytes()
+        digest = hashlib.sha1(data).hexdigest()
+        if stored is not None and stored[2] == digest:
+            df = _load_frame(conn)
+            if df is not None:
+                _set_meta(conn, "source", (*signature, digest))
+                conn.commit()
+                return df
+
+        df = pd.read_excel(io.BytesIO(data), sheet_name="METADATOS")
+        try:
+            _save_frame(conn, df, (*signature, digest))
+        except (sqlite3.Error, TypeError) as e:
+            print(f"⚠️  No se pudo actualizar la copia de trabajo del Excel: {e}")
+        return df
+
+
+# =============================================================================
+# SQLITE
+# =============================================================================
+
+def _connect(db_path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(db_path))
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version != _SCHEMA_VERSION:
+        conn.execute("DROP TABLE IF EXISTS meta")
+        conn.execute("DROP TABLE IF EXISTS articles")
+        conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS articles ("
+        " pos INTEGER PRIMARY KEY, ruta_archivo TEXT, blog_nombre TEXT, row TEXT)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS articles_ruta ON articles (ruta_archivo)"
+    )
+    return conn
+
+
+def _get_meta(conn: sqlite3.Connection, key: str):
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return tagged_json.loads(row[0]) if row else None
+
+
+def _set_meta(conn: sqlite3.Connection, key: str, value):
+    conn.execute(
+        "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+        (key, tagged_json.dumps(value)),
+    )
+
+
+def _stored_source(conn: sqlite3.Connection) -> Optional[tuple]:
+    """(mtime_ns, size, sha1) del Excel que se importó, o None."""
+    try:
+        return _get_meta(conn, "source")
+    except (ValueError, TypeError, KeyError):
+        return None
+
+
+def _text_or_none(value) -> Optional[str]:
+    return None if pd.isna(value) else str(value)
+
+
+def _save_frame(conn: sqlite3.Connection, df: pd.DataFrame, source: tuple):
+    """Reemplaza el contenido del store por `df` (una fila por artículo)."""
+    columns = list(df.columns)
+    ruta_idx = columns.index("ruta_archivo") if "ruta_archivo" in columns else None
+    blog_idx = columns.index("blog_nombre") if "blog_nombre" in columns else None
+
+    with conn:
+        conn.execute("DELETE FROM articles")
+        conn.executemany(
+            "INSERT INTO articles VALUES (?, ?, ?, ?)",
+            (
+                (
+                    pos,
+                    _text_or_none(row[ruta_idx]) if ruta_idx is not None else None,
+                    _text_or_none(row[blog_idx]) if blog_idx is not None else None,
+                    tagged_json.dumps(list(row)),
+                )
+                for pos, row in enumerate(df.itertuples(index=False, name=None))
+            ),
+        )
+        _set_meta(conn, "columns", columns)
+        _set_meta(conn, "dtypes", [str(dtype) for dtype in df.dtypes])
+        _set_meta(conn, "source", source)
+
+
+def _load_frame(conn: sqlite3.Connection) -> Optional[pd.DataFrame]:
+    """
+    Reconstruye el DataFrame con las columnas y dtypes originales.
+    None si el contenido del store no se puede decodificar (entonces se
+    vuelve a importar el Excel).
+    """
+    try:
+        columns = _get_meta(conn, "columns")
+        dtypes = _get_meta(conn, "dtypes")
+        rows = [
+            tagged_json.loads(text)
+            for (text,) in conn.execute("SELECT row FROM articles ORDER BY pos")
+        ]
+    except (ValueError, TypeError, KeyError):
+        return None
+    df = pd.DataFrame.from_records(rows, columns=range(len(columns)))
+    for idx, dtype in enumerate(dtypes):
+        if str(df[idx].dtype) != dtype:
+            df[idx] = df[idx].astype(dtype)
+    df.columns = columns
+    return df
@@ -6,22 +6,41 @@ Crea y actualiza el archivo Excel de metadatos.
 Responsabilidades:
   - Generar la hoja METADATOS con encabezados estilizados.
   - Rellenar filas a partir del YAML de cada artículo.
-  - Modo incremental: agregar sólo artículos nuevos preservando el resto.
+  - Modo incremental: agregar artículos nuevos y refrescar los que
+    cambiaron, guiado por el manifiesto (template_manifest) para no
+    recorrer ni releer lo que no se movió.
   - Agregar columnas nuevas a un Excel existente.
   - Generar la hoja INSTRUCCIONES.
 
-Depende de: config, yaml_parser, field_mapper, collector.
+Depende de: config, yaml_parser, field_mapper, collector, template_manifest,
+tagged_json.
 """
 
+import io
+import re
+import tempfile
+import xml.etree.ElementTree as ET
+import zipfile
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set
 
 import pandas as pd
 from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Alignment, Font, PatternFill
-
+from openpyxl.utils import get_column_letter
+
+from .collector import (
+    ArticleRecord,
+    article_yaml,
+    load_article_record,
+    scan_article_files,
+    select_blog_dirs,
+)
+from . import tagged_json
 from .config import ALL_FIELDS, VERSION
-from .field_mapper import extract_value
+from .field_mapper import compile_getters
+from .template_manifest import TemplateManifest, frontmatter_hash
 from .yaml_parser import extract_yaml_only_index
 
 
@@ -44,19 +63,86 @@ def _style_header_cell(cell):
 # APERTURA LECTURA/ESCRITURA
 # =============================================================================
 
+class SheetValues:
+    """
+    Valores CALCULADOS de una hoja (lo que muestra Excel en vez del texto
+    de la fórmula), consultados por (fila, columna) como ws.cell().
+
+    Si la hoja no tiene fórmulas, esos valores son los mismos que ya
+    cargó el workbook de escritura y se leen directamente de `ws`. Si las
+    tiene, se toman del caché de valores que guarda Excel, leído una vez
+    en modo streaming (read_only + data_only) a una matriz de filas.
+    """
+
+    def __init__(self, ws=None, rows: Optional[List[tuple]] = None):
+        self._ws = ws
+        self._rows = rows
+
+    def value(self, row: int, col: int):
+        if self._rows is None:
+            return self._ws.cell(row, col).value
+        if row <= len(self._rows):
+            values = self._rows[row - 1]
+            if col <= len(values):
+                return values[col - 1]
+        return None
+
+
+_NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_DOC_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_FORMULA_TAG_RE = re.compile(rb"<(?:\w+:)?f[\s/>]")
+
+
+def _sheet_has_formulas(archive: zipfile.ZipFile, sheet_name: str) -> bool:
+    """
+    True si la hoja tiene alguna celda con fórmula (<f> en su XML). Ante
+    cualquier duda sobre la estructura del archivo responde True, que
+    solo cuesta la lectura adicional de los valores calculados.
+    """
+    try:
+        workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+        rels = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+        rel_id = next(
+            sheet.get(f"{_NS_DOC_REL}id")
+            for sheet in workbook.iter(f"{_NS_MAIN}sheet")
+            if sheet.get("name") == sheet_name
+        )
+        target = next(
+            rel.get("Target")
+            for rel in rels.iter(f"{_NS_PKG_REL}Relationship")
+            if rel.get("Id") == rel_id
+        )
+        member = target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+        return _FORMULA_TAG_RE.search(archive.read(member)) is not None
+    except Exception:
+        return True
+
+
 def open_metadata_sheets(excel_path):
     """
-    Abre la hoja METADATOS en dos vistas del mismo archivo:
+    Abre la hoja METADATOS leyendo el archivo del disco UNA sola vez:
       ws        → para escribir (preserva las fórmulas del usuario)
-      ws_values → para leer valores CALCULADOS (data_only) en vez del
-                  texto de la fórmula (p.ej. blog_nombre derivado)
+      ws_values → SheetValues con los valores CALCULADOS (p.ej. un
+                  blog_nombre derivado con fórmula), vía .value(fila, col)
 
     Devuelve (wb, ws, ws_values). Lanza la excepción original si falla.
     """
-    wb = load_workbook(excel_path)
+    data = Path(excel_path).read_bytes()
+    wb = load_workbook(io.BytesIO(data))
     ws = wb["METADATOS"]
-    ws_values = load_workbook(excel_path, data_only=True)["METADATOS"]
-    return wb, ws, ws_values
+
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        has_formulas = _sheet_has_formulas(archive, "METADATOS")
+    if not has_formulas:
+        return wb, ws, SheetValues(ws=ws)
+
+    wb_values = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        rows = list(wb_values["METADATOS"].iter_rows(values_only=True))
+    finally:
+        wb_values.close()
+    return wb, ws, SheetValues(rows=rows)
 
 
 # =============================================================================
@@ -65,9 +151,9 @@ def open_metadata_sheets(excel_path):
 
 def _fill_row(ws, row_idx: int, yaml_data: Dict, columns: List[str]):
     """Rellena una fila del Excel a partir de un dict YAML."""
-    for col_idx, col_name in enumerate(columns, 1):
+    for col_idx, get in enumerate(compile_getters(columns), 1):
         try:
-            value = extract_value(yaml_data, col_name)
+            value = get(yaml_data)
             if value is not None:
                 ws.cell(row_idx, col_idx, value)
         except Exception:
@@ -85,13 +171,57 @@ def _adjust_column_widths(ws):
                     max_len = len(str(cell.value))
             except Exception:
                 pass
-        ws.column_dimensions[col_letter].width = min(max(max_len + 2, 15), 60)
+        ws.column_dimensions[col_letter].width = _column_width(max_len)
 
 
 # =============================================================================
 # CREACIÓN DE LA HOJA METADATOS
 # =============================================================================
 
+def _column_width(max_len: int) -> int:
+    return min(max(max_len + 2, 15), 60)
+
+
+def _metadata_rows(
+    df_files: pd.DataFrame,
+    base_path: Path,
+    columns: List[str],
+    probe: WriteOnlyCell,
+):
+    """
+    Genera la lista de valores de cada fila de METADATOS, en el orden de
+    `columns`. Un valor que openpyxl no acepta en una celda (dict, lista,
+    caracteres de control…) queda vacío, igual que con _fill_row.
+    `probe` es una celda suelta contra la que se valida cada valor.
+    """
+    print("\n📝 Extrayendo metadatos de cada artículo...\n")
+    total = len(df_files)
+    getters = compile_getters(columns)
+    for row_idx, (_, row_data) in enumerate(df_files.iterrows(), 2):
+        values = [None] * len(columns)
+        values[:3] = [
+            row_data["ruta_archivo"], row_data["blog_nombre"], row_data["tipo_documento"]
+        ][:len(columns)]
+
+        yaml_data = article_yaml(row_data, base_path)
+        if yaml_data:
+            for col_idx, get in enumerate(getters):
+                try:
+                    value = get(yaml_data)
+                    if value is not None:
+                        probe.value = value
+                        values[col_idx] = value
+                except Exception:
+                    pass
+
+        yield values
+
+        if (row_idx - 1) % 10 == 0 or row_idx - 1 == total:
+            print(f"  ✅ Procesados: {row_idx - 1}/{total} artículos")
+
+    print(f"  ✅ Procesados: {total}/{total} artículos (100%)\n")
+
+
 def build_metadata_sheet(
     wb: Workbook,
     df_files: pd.DataFrame,
@@ -100,7 +230,13 @@ def build_metadata_sheet(
 ) -> None:
     """
     Construye la hoja METADATOS desde cero en el workbook dado.
+    Con un Workbook(write_only=True) la hoja se escribe en streaming
+    (ver _build_metadata_sheet_streaming).
     """
+    if wb.write_only:
+        _build_metadata_sheet_streaming(wb, df_files, base_path, columns)
+        return
+
     ws = wb.create_sheet("METADATOS")
 
     # Encabezados
@@ -109,25 +245,61 @@ def build_metadata_sheet(
         _style_header_cell(cell)
 
     # Datos
-    print("\n📝 Extrayendo metadatos de cada artículo...\n")
-    total = len(df_files)
-    for row_idx, (_, row_data) in enumerate(df_files.iterrows(), 2):
-        ws.cell(row_idx, 1, row_data["ruta_archivo"])
-        ws.cell(row_idx, 2, row_data["blog_nombre"])
-        ws.cell(row_idx, 3, row_data["tipo_documento"])
+    probe = WriteOnlyCell(ws)
+    rows = _metadata_rows(df_files, base_path, columns, probe)
+    for row_idx, values in enumerate(rows, 2):
+        for col_idx, value in enumerate(values, 1):
+            if value is not None:
+                ws.cell(row_idx, col_idx, value)
 
-        file_path = base_path / row_data["ruta_archivo"]
-        yaml_data = extract_yaml_only_index(file_path)
-        if yaml_data:
-            _fill_row(ws, row_idx, yaml_data, columns)
+    _adjust_column_widths(ws)
+    ws.freeze_panes = "A2"
 
-        if (row_idx - 1) % 10 == 0 or row_idx - 1 == total:
-            print(f"  ✅ Procesados: {row_idx - 1}/{total} artículos")
 
-    print(f"  ✅ Procesados: {total}/{total} artículos (100%)\n")
+def _build_metadata_sheet_streaming(
+    wb: Workbook,
+    df_files: pd.DataFrame,
+    base_path: Path,
+    columns: List[str],
+) -> None:
+    """
+    METADATOS en una hoja write-only, en dos pasadas sin acumular filas
+    en memoria.
+
+    En el XLSX los anchos (<cols>) van ANTES de los datos, y openpyxl los
+    escribe al agregar la primera fila. La primera pasada extrae cada
+    fila, mide el ancho de sus valores y la vuelca a un temporal (una
+    línea tagged_json por fila); la segunda fija los anchos y agrega las
+    filas leyéndolas del temporal de a una.
+    """
+    ws = wb.create_sheet("METADATOS")
+    probe = WriteOnlyCell(ws)
+
+    max_len = [len(str(name)) if name else 0 for name in columns]
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as spool:
+        for values in _metadata_rows(df_files, base_path, columns, probe):
+            for col_idx, value in enumerate(values):
+                if value:
+                    length = len(str(value))
+                    if length > max_len[col_idx]:
+                        max_len[col_idx] = length
+            spool.write(tagged_json.dumps(values))
+            spool.write("\n")
+
+        for col_idx, length in enumerate(max_len, 1):
+            ws.column_dimensions[get_column_letter(col_idx)].width = _column_width(length)
+        ws.freeze_panes = "A2"
+
+        header = []
+        for col_name in columns:
+            cell = WriteOnlyCell(ws, value=col_name)
+            _style_header_cell(cell)
+            header.append(cell)
+        ws.append(header)
 
-    _adjust_column_widths(ws)
-    ws.freeze_panes = "A2"
+        spool.seek(0)
+        for line in spool:
+            ws.append(tagged_json.loads(line))
 
 
 # =============================================================================
@@ -173,8 +345,7 @@ def append_new_articles(
             ws.cell(idx, 2, row_data["blog_nombre"])
             ws.cell(idx, 3, row_data["tipo_documento"])
 
-            file_path = base_path / row_data["ruta_archivo"]
-            yaml_data = extract_yaml_only_index(file_path)
+            yaml_data = article_yaml(row_data, base_path)
             if yaml_data:
                 _fill_row(ws, idx, yaml_data, columns)
 
@@ -197,6 +368,231 @@ def append_new_articles(
         return False
 
 
+def _is_formula(value) -> bool:
+    return isinstance(value, str) and value.startswith("=")
+
+
+def _refresh_row(
+    ws, row_idx: int, record: ArticleRecord, headers: List,
+    getters: Dict[str, Callable[[Dict], Any]],
+):
+    """
+    Reescribe una fila existente con el YAML actual del artículo.
+    Solo toca las columnas de `getters` (columna → getter compilado, las
+    que salen del YAML) y nunca una celda con fórmula; un campo que ya no
+    está en el YAML se vacía.
+    """
+    fixed = {
+        "ruta_archivo":   record.ruta_archivo,
+        "blog_nombre":    record.blog_nombre,
+        "tipo_documento": record.tipo_documento,
+    }
+    for col_idx, col_name in enumerate(headers, 1):
+        get = getters.get(col_name)
+        if get is None:
+            continue
+        cell = ws.cell(row_idx, col_idx)
+        if _is_formula(cell.value):
+            continue
+        if col_name in fixed:
+            value = fixed[col_name]
+        else:
+            try:
+                value = get(record.yaml_index)
+            except Exception:
+                continue
+        cell.value = value
+
+
+def write_template_manifest(output_path: Path, base_path: Path, df_files: pd.DataFrame):
+    """
+    Guarda el manifiesto de un Excel recién generado desde cero, para que
+    la próxima ejecución con --incremental parta de este estado.
+    """
+    manifest = TemplateManifest(base_path)
+    for record in df_files["articulo"]:
+        manifest.articles[record.ruta_archivo] = (
+            record.mtime_ns, record.size, frontmatter_hash(record.raw_yaml)
+        )
+    manifest.save(output_path)
+
+
+def update_template_incremental(
+    output_path: Path,
+    base_path: Path,
+    allowed_blogs: Set[str],
+    user_excluded_folders: Set[str],
+    blog_name: Optional[str] = None,
+    columns: List[str] = ALL_FIELDS,
+) -> bool:
+    """
+    create-template --incremental guiado por el manifiesto del Excel:
+
+      - Solo se listan las carpetas cuyo mtime cambió y solo se leen los
+        index.qmd cuyo stat cambió; el resto se da por igual.
+      - Artículos nuevos → se agregan al final (como append_new_articles).
+      - Artículos cuyo frontmatter cambió (hash distinto) → se refresca
+        su fila, respetando fórmulas y columnas ajenas al YAML.
+      - Artículos que ya no existen → solo se informan; su fila se queda.
+      - Con menos blogs o más carpetas excluidas que antes, lo que queda
+        fuera no se toca: sus filas y su entrada del manifiesto siguen.
+      - Si no hay nada que agregar ni refrescar, el Excel ni se abre.
+
+    Sin manifiesto (primera vez, o el Excel se editó a mano desde la
+    última ejecución) las filas a agregar se deciden con las rutas que
+    tiene el Excel. Devuelve True si modificó el Excel.
+    """
+    try:
+        blog_dirs = select_blog_dirs(base_path, allowed_blogs, blog_name)
+        if blog_dirs is None:
+            return False
+
+        manifest = TemplateManifest.load(output_path, base_path)
+        if manifest is None:
+            print("📋 Sin manifiesto previo: se compara contra las rutas del Excel")
+            manifest = TemplateManifest(base_path)
+        known = manifest.articles
+
+        found, listings = scan_article_files(
+            base_path, blog_dirs, user_excluded_folders, manifest.dirs
+        )
+
+        # Artículos cuyo stat no cambió: se conserva su estado sin leerlos
+        articles = {}
+        records: Dict[str, ArticleRecord] = {}
+        new_rutas: List[str] = []
+        changed_rutas: List[str] = []
+        for file_path, blog_dir in found:
+            ruta = str(file_path.relative_to(base_path))
+            try:
+                st = file_path.stat()
+            except OSError:
+                continue
+            previous = known.get(ruta)
+            if previous is not None and tuple(previous[:2]) == (st.st_mtime_ns, st.st_size):
+                articles[ruta] = previous
+                continue
+
+            record = load_article_record(file_path, base_path, blog_dir.name)
+            if record is None or not record.yaml_merged:
+                continue
+            digest = frontmatter_hash(record.raw_yaml)
+            articles[ruta] = (record.mtime_ns, record.size, digest)
+            records[ruta] = record
+            if previous is None:
+                new_rutas.append(ruta)
+            elif previous[2] != digest:
+                changed_rutas.append(ruta)
+
+        # Solo cuenta como borrado lo que cae dentro de los blogs recorridos
+        # y ya no está en disco: un artículo fuera del alcance de esta
+        # ejecución (otros blogs, carpetas excluidas) sigue en el Excel
+        scanned = {d.name for d in blog_dirs}
+        removed = [
+            ruta for ruta in known
+            if ruta not in articles
+            and Path(ruta).parts[0] in scanned
+            and not (base_path / ruta).is_file()
+        ]
+
+        # Rutas presentes en el Excel: las del manifiesto si nadie lo tocó
+        wb = ws = None
+        if manifest.excel_unchanged(output_path):
+            existing: Set[str] = set(known)
+        else:
+            wb = load_workbook(output_path)
+            ws = wb["METADATOS"]
+            existing = set()
+            for row in ws.iter_rows(min_row=2, max_col=1, values_only=True):
+                if row[0]:
+                    existing.add(row[0])
+
+        to_append = [ruta for ruta in articles if ruta not in existing]
+        to_refresh = [ruta for ruta in changed_rutas if ruta in existing]
+
+        print(f"📊 Artículos en Excel existente: {len(existing)}")
+        print(f"📊 Artículos encontrados ahora:  {len(articles)}")
+        print(f"🔎 Archivos releídos (stat cambiado): {len(records)}")
+        if removed:
+            print(f"🗑️  Ya no existen (sus filas se conservan): {len(removed)}")
+            for ruta in removed[:10]:
+                print(f"   • {ruta}")
+
+        # El manifiesto describe las filas del Excel, no solo lo recorrido:
+        # se fusiona, y las filas que no se vieron esta vez se conservan
+        manifest.articles = {**known, **articles}
+        manifest.dirs = {
+            rel: listing for rel, listing in manifest.dirs.items()
+            if Path(rel).parts[0] not in scanned
+        }
+        manifest.dirs.update(listings)
+
+        if not to_append and not to_refresh:
+            manifest.save(output_path)
+            print("\n✅ No hay artículos nuevos ni modificados")
+            print("   El Excel está actualizado\n")
+            return False
+
+        if wb is None:
+            wb = load_workbook(output_path)
+            ws = wb["METADATOS"]
+
+        if to_refresh:
+            print(f"🔄 Artículos modificados a refrescar: {len(to_refresh)}\n")
+            headers = [cell.value for cell in ws[1]]
+            row_of = {}
+            for row_idx, row in enumerate(
+                ws.iter_rows(min_row=2, max_col=1, values_only=True), 2
+            ):
+                if row[0]:
+                    row_of.setdefault(row[0], row_idx)
+            getters = dict(zip(columns, compile_getters(columns)))
+            for ruta in to_refresh:
+                if ruta in row_of:
+                    _refresh_row(ws, row_of[ruta], records[ruta], headers, getters)
+                    print(f"  🔄 {ruta}")
+            print()
+
+        if to_append:
+            print(f"➕ Artículos nuevos a agregar: {len(to_append)}\n")
+            new_records = [
+                records.get(ruta)
+                or load_article_record(base_path / ruta, base_path, Path(ruta).parts[0])
+                for ruta in to_append
+            ]
+            new_records = [r for r in new_records if r is not None]
+            # Mismo orden que collect_index_files: blog, tipo, fecha desc
+            new_records.sort(key=lambda r: r.fecha_creacion, reverse=True)
+            new_records.sort(key=lambda r: (r.blog_nombre, r.tipo_documento))
+
+            last_row = ws.max_row
+            print("📝 Agregando artículos nuevos...\n")
+            for idx, record in enumerate(new_records, last_row + 1):
+                ws.cell(idx, 1, record.ruta_archivo)
+                ws.cell(idx, 2, record.blog_nombre)
+                ws.cell(idx, 3, record.tipo_documento)
+                if record.yaml_index:
+                    _fill_row(ws, idx, record.yaml_index, columns)
+
+                if (idx - last_row) % 10 == 0:
+                    print(f"  ✅ Procesados: {idx - last_row}/{len(new_records)}")
+
+            print(f"  ✅ Procesados: {len(new_records)}/{len(new_records)} artículos (100%)\n")
+
+        wb.save(output_path)
+        manifest.save(output_path)
+        print(f"✅ Excel actualizado (modo incremental): {output_path}")
+        print(f"📊 Total artículos ahora: {len(existing) + len(to_append)}")
+        print(f"➕ Artículos nuevos agregados: {len(to_append)}")
+        print(f"🔄 Filas refrescadas: {len(to_refresh)}")
+        print(f"\n💡 Las fórmulas y formatos existentes se preservaron\n")
+        return True
+
+    except Exception as e:
+        print(f"⚠️  Error en modo incremental: {e}")
+        return False
+
+
 # =============================================================================
 # AGREGAR COLUMNAS NUEVAS
 # =============================================================================
@@ -232,19 +628,23 @@ def add_columns_to_excel(
             _style_header_cell(cell)
             print(f"   {i}. {field} (columna {new_col})")
 
-            if not dry_run:
-                for row_idx in range(2, ws.max_row + 1):
-                    ruta = ws.cell(row_idx, 1).value
-                    if not ruta:
-                        continue
-                    file_path = base_path / ruta
-                    if not file_path.exists():
-                        continue
-                    yaml_data = extract_yaml_only_index(file_path)
-                    if yaml_data:
-                        value = extract_value(yaml_data, field)
-                        if value is not None:
-                            ws.cell(row_idx, new_col, value)
+        # Cada index.qmd se lee una vez y llena todas las columnas nuevas
+        if not dry_run:
+            getters = compile_getters(new_fields)
+            for row_idx in range(2, ws.max_row + 1):
+                ruta = ws.cell(row_idx, 1).value
+                if not ruta:
+                    continue
+                file_path = base_path / ruta
+                if not file_path.exists():
+                    continue
+                yaml_data = extract_yaml_only_index(file_path)
+                if not yaml_data:
+                    continue
+                for i, get in enumerate(getters, 1):
+                    value = get(yaml_data)
+                    if value is not None:
+                        ws.cell(row_idx, last_col + i, value)
 
         if not dry_run:
             wb.save(excel_path)
@@ -387,6 +787,7 @@ def build_instructions_sheet(wb: Workbook):
         [""],
         ["   python main.py sync-dates excel.xlsx --dry-run"],
         ["   python main.py sync-pdf-urls excel.xlsx --dry-run"],
+        ["   python main.py sync-derived excel.xlsx --dry-run   (ambas a la vez)"],
         ["   (date desde la carpeta YYYY-MM-DD; pdf-url desde la ruta real)"],
         [""],
         ["=" * 72],
@@ -401,14 +802,20 @@ def build_instructions_sheet(wb: Workbook):
         ["=" * 72],
     ]
 
+    # En una hoja write-only el ancho debe fijarse antes de escribir filas
+    ws.column_dimensions["A"].width = 90
+
     for row_idx, line in enumerate(lines, 1):
-        cell = ws.cell(row_idx, 1, line[0])
         text = line[0]
+        if wb.write_only:
+            cell = WriteOnlyCell(ws, value=text)
+        else:
+            cell = ws.cell(row_idx, 1, text)
         if text.startswith("🎯") or text.startswith("===") or text.startswith("="):
             cell.font = Font(bold=True, size=14, color="1F4E78")
         elif any(text.startswith(e) for e in ["📋", "📝", "👥", "⚠️", "🚀", "💡", "📞", "✅"]):
             cell.font = Font(bold=True, size=12, color="366092")
         elif text.startswith("   •") or text.startswith("   "):
             cell.font = Font(size=10)
-
-    ws.column_dimensions["A"].width = 90
+        if wb.write_only:
+            ws.append([cell])
@@ -9,16 +9,22 @@ Funciones principales:
   extract_value(yaml_data, field_name) → Any
       Lee un campo del dict YAML y lo convierte al formato Excel.
 
+  compile_getters(columns) → [getter]
+      Lo mismo, resuelto una vez por columna: para recorrer muchas filas
+      basta con llamar getter(yaml_data) en orden.
+
   apply_row_to_yaml(yaml_data, row, changes) → Dict
       Aplica los valores de una fila pandas al dict YAML,
       respetando tipos, eliminando vacíos y registrando cambios.
+      Sus reglas también se compilan una vez por juego de columnas.
 
 No abre archivos; trabaja únicamente con dicts y Series en memoria.
 """
 
 import json
 import re
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 import pandas as pd
 
@@ -53,93 +59,165 @@ def extract_value(yaml_data: Dict, field_name: str) -> Any:
     Extrae un valor del YAML para una columna del Excel.
     Maneja campos simples, listas, citation, links y autores.
     """
+    return compile_getter(field_name)(yaml_data)
+
+
+def compile_getters(columns: Sequence[str]) -> List[Callable[[Dict], Any]]:
+    """
+    Getters precompilados para una lista de columnas (ALL_FIELDS o las
+    del Excel, con las que haya agregado el usuario). Para leer muchas
+    filas: [get(yaml_data) for get in getters].
+    """
+    return [compile_getter(column) for column in columns]
+
+
+@lru_cache(maxsize=None)
+def compile_getter(field_name: str) -> Callable[[Dict], Any]:
+    """
+    Resuelve UNA vez qué hace extract_value con una columna y lo devuelve
+    como función de un solo argumento (el dict YAML). Columnas que no se
+    reconocen devuelven siempre None.
+    """
     # --- Campos simples ---
     if field_name in _SIMPLE_YAML_TO_EXCEL:
         yaml_key = _SIMPLE_YAML_TO_EXCEL[field_name]
-        value = yaml_data.get(yaml_key)
+        if field_name != "copyrightnotice":
+            return lambda yaml_data: yaml_data.get(yaml_key)
+
         # copyrightnotice siempre como int
-        if field_name == "copyrightnotice" and value is not None:
-            try:
-                return int(value)
-            except (ValueError, TypeError):
-                return value
-        return value
+        def get_copyrightnotice(yaml_data):
+            value = yaml_data.get(yaml_key)
+            if value is not None:
+                try:
+                    return int(value)
+                except (ValueError, TypeError):
+                    return value
+            return value
+        return get_copyrightnotice
 
     # --- Campos con guión ---
     if field_name in _DASHED_YAML_TO_EXCEL:
-        return yaml_data.get(_DASHED_YAML_TO_EXCEL[field_name])
+        yaml_key = _DASHED_YAML_TO_EXCEL[field_name]
+        return lambda yaml_data: yaml_data.get(yaml_key)
 
     # --- Listas (keywords, tags, categories) ---
     if field_name in ("keywords", "tags", "categories"):
-        v = yaml_data.get(field_name, [])
-        if isinstance(v, list):
-            return ", ".join(str(x) for x in v)
-        return v
+        def get_list(yaml_data):
+            v = yaml_data.get(field_name, [])
+            if isinstance(v, list):
+                return ", ".join(str(x) for x in v)
+            return v
+        return get_list
 
     # --- Citación ---
     if field_name.startswith("citation_"):
-        citation = yaml_data.get("citation")
-        if not isinstance(citation, dict):
-            return None
-        if field_name == "citation_type":
-            return citation.get("type")
         if field_name == "citation_author":
-            authors = citation.get("author", [])
-            if isinstance(authors, list):
-                return ", ".join(str(a) for a in authors)
-            return authors
-        if field_name == "citation_pdf_url":
-            return citation.get("pdf-url")
+            def get_citation_author(yaml_data):
+                citation = yaml_data.get("citation")
+                if not isinstance(citation, dict):
+                    return None
+                authors = citation.get("author", [])
+                if isinstance(authors, list):
+                    return ", ".join(str(a) for a in authors)
+                return authors
+            return get_citation_author
+
+        citation_key = {"citation_type": "type", "citation_pdf_url": "pdf-url"}.get(field_name)
+
+        def get_citation(yaml_data):
+            citation = yaml_data.get("citation")
+            if not isinstance(citation, dict) or citation_key is None:
+                return None
+            return citation.get(citation_key)
+        return get_citation
 
     # --- Links ---
     if field_name == "links_enabled":
-        links = yaml_data.get("links")
-        return links is not None and links is not False
+        def get_links_enabled(yaml_data):
+            links = yaml_data.get("links")
+            return links is not None and links is not False
+        return get_links_enabled
     if field_name == "links_data":
-        links = yaml_data.get("links")
-        if links and isinstance(links, (list, dict)):
-            return json.dumps(links, ensure_ascii=False)
+        def get_links_data(yaml_data):
+            links = yaml_data.get("links")
+            if links and isinstance(links, (list, dict)):
+                return json.dumps(links, ensure_ascii=False)
+            return None
+        return get_links_data
 
     # --- Autores (author_N_campo) ---
     if field_name.startswith("author_"):
-        match = re.match(r"author_(\d+)_(.*)", field_name)
-        if not match:
-            return None
-        idx = int(match.group(1)) - 1
-        suffix = match.group(2)
+        match = _AUTHOR_FIELD_RE.match(field_name)
+        if match:
+            return _compile_author_getter(int(match.group(1)) - 1, match.group(2))
 
+    return lambda yaml_data: None
+
+
+_AUTHOR_FIELD_RE = re.compile(r"author_(\d+)_(.*)")
+
+# Marca "no hay autor N" (un autor None en el YAML sí falla, como antes)
+_NO_AUTHOR = object()
+
+
+def _compile_author_getter(idx: int, suffix: str) -> Callable[[Dict], Any]:
+    """Getter de author_N_<suffix> (idx ya en base 0)."""
+    def author_at(yaml_data):
         authors = yaml_data.get("author", [])
         if not isinstance(authors, list) or idx >= len(authors):
-            return None
-        author = authors[idx]
-
-        if suffix == "name":
-            return author.get("name")
-        if suffix == "corresponding":
+            return _NO_AUTHOR
+        return authors[idx]
+
+    if suffix in ("name", "orcid", "email"):
+        def get_simple(yaml_data):
+            author = author_at(yaml_data)
+            return None if author is _NO_AUTHOR else author.get(suffix)
+        return get_simple
+
+    if suffix == "corresponding":
+        def get_corresponding(yaml_data):
+            author = author_at(yaml_data)
+            if author is _NO_AUTHOR:
+                return None
             corr = author.get("corresponding")
             if corr is True:
                 return "TRUE"
             if corr is False:
                 return "FALSE"
             return corr
-        if suffix == "orcid":
-            return author.get("orcid")
-        if suffix == "email":
-            return author.get("email")
-        if suffix == "roles":
+        return get_corresponding
+
+    if suffix == "roles":
+        def get_roles(yaml_data):
+            author = author_at(yaml_data)
+            if author is _NO_AUTHOR:
+                return None
             roles = author.get("role", [])
             if isinstance(roles, list):
                 return ", ".join(str(r) for r in roles)
             return roles
-        if suffix.startswith("affiliation_"):
-            aff_key = suffix.replace("affiliation_", "")
+        return get_roles
+
+    if suffix.startswith("affiliation_"):
+        aff_key = suffix.replace("affiliation_", "")
+
+        def get_affiliation(yaml_data):
+            author = author_at(yaml_data)
+            if author is _NO_AUTHOR:
+                return None
             affs = author.get("affiliations", [])
             if affs and isinstance(affs, list):
                 for aff in affs:
                     if isinstance(aff, dict):
                         return aff.get(aff_key)
+            return None
+        return get_affiliation
 
-    return None
+    # Sufijo desconocido: igual que antes, se accede al autor y se descarta
+    def get_unknown(yaml_data):
+        author_at(yaml_data)
+        return None
+    return get_unknown
 
 
 # =============================================================================
@@ -201,21 +279,65 @@ def apply_row_to_yaml(
     - El dict resultante sigue el orden definido en YAML_FIELD_ORDER.
     - Registra cada cambio real en la lista `changes`.
     """
+    steps = _compile_apply_plan(tuple(row.index))
+    values = row.to_numpy()
+
     # Reordenar antes de modificar
     yaml_data = reorder_yaml(yaml_data)
+    for step in steps:
+        yaml_data = step(yaml_data, values, changes)
+    return yaml_data
 
-    # --- Campos simples ---
+
+# Cada paso recibe (yaml_data, valores de la fila, changes) y devuelve el
+# dict (tipo_documento puede reemplazarlo para poner documentmode primero)
+ApplyStep = Callable[[Dict, Any, List[str]], Dict]
+
+
+@lru_cache(maxsize=None)
+def _compile_apply_plan(columns: Tuple) -> List[ApplyStep]:
+    """
+    Pasos de apply_row_to_yaml para un juego de columnas, con la posición
+    de cada celda ya resuelta. Las columnas que no están en la fila no
+    generan paso. El orden de los pasos es el orden de las reglas.
+    """
+    pos: Dict[str, int] = {}
+    for i, column in enumerate(columns):
+        pos.setdefault(column, i)
+
+    steps: List[ApplyStep] = []
     for excel_field, yaml_key in _SIMPLE_YAML_TO_EXCEL.items():
-        if excel_field not in row:
-            continue
-        new_val = row[excel_field]
+        if excel_field in pos:
+            steps.append(_simple_step(excel_field, yaml_key, pos[excel_field]))
+    for excel_field, yaml_key in _DASHED_YAML_TO_EXCEL.items():
+        if excel_field in pos:
+            steps.append(_dashed_step(yaml_key, pos[excel_field]))
+    if "tipo_documento" in pos:
+        steps.append(_tipo_documento_step(pos["tipo_documento"]))
+    for field in ("keywords", "tags", "categories"):
+        if field in pos:
+            steps.append(_list_step(field, pos[field]))
+    if "citation_type" in pos or "citation_pdf_url" in pos:
+        steps.append(_citation_step(pos.get("citation_type"), pos.get("citation_pdf_url")))
+    authors_step = _authors_step(pos)
+    if authors_step is not None:
+        steps.append(authors_step)
+    return steps
+
+
+def _simple_step(excel_field: str, yaml_key: str, i: int) -> ApplyStep:
+    as_int = excel_field == "copyrightnotice"
+    clean_text = excel_field in ("abstract", "description")
+
+    def step(yaml_data, values, changes):
+        new_val = values[i]
         old_val = yaml_data.get(yaml_key)
 
         if _is_empty(new_val):
             if yaml_key in yaml_data:
                 del yaml_data[yaml_key]
                 changes.append(f"{yaml_key}: ELIMINADO (vacío en Excel)")
-            continue
+            return yaml_data
 
         # Booleanos
         bool_val = _to_bool(new_val)
@@ -223,14 +345,14 @@ def apply_row_to_yaml(
             new_val = bool_val
 
         # copyrightnotice → int
-        if excel_field == "copyrightnotice":
+        if as_int:
             try:
                 new_val = int(float(new_val))
             except (ValueError, TypeError):
                 pass
 
         # Limpiar texto en abstract / description
-        if excel_field in ("abstract", "description") and isinstance(new_val, str):
+        if clean_text and isinstance(new_val, str):
             new_val = " ".join(new_val.split())
 
         if old_val != new_val:
@@ -238,61 +360,72 @@ def apply_row_to_yaml(
             changes.append(
                 f"{yaml_key}: {repr(old_val)[:50]} → {repr(new_val)[:50]}"
             )
+        return yaml_data
+    return step
 
-    # --- Campos con guión (numbered-lines, meta-analysis) ---
-    for excel_field, yaml_key in _DASHED_YAML_TO_EXCEL.items():
-        if excel_field not in row:
-            continue
-        new_val = row[excel_field]
+
+def _dashed_step(yaml_key: str, i: int) -> ApplyStep:
+    """numbered-lines, meta-analysis."""
+    def step(yaml_data, values, changes):
+        new_val = values[i]
         if _is_empty(new_val):
             if yaml_key in yaml_data:
                 del yaml_data[yaml_key]
                 changes.append(f"{yaml_key}: ELIMINADO")
-            continue
+            return yaml_data
         bool_val = _to_bool(new_val)
         new_val = bool_val if bool_val is not None else new_val
         old_val = yaml_data.get(yaml_key)
         if old_val != new_val:
             yaml_data[yaml_key] = new_val
             changes.append(f"{yaml_key}: {old_val} → {new_val}")
-
-    # --- tipo_documento (documentmode) ---
-    if "tipo_documento" in row and not _is_empty(row["tipo_documento"]):
-        new_type = str(row["tipo_documento"]).lower()
-        if new_type in ("stu", "man", "jou", "doc"):
-            old_type = (
-                yaml_data.get("documentmode")
-                or (
-                    yaml_data.get("format", {})
-                    .get("apaquarto-pdf", {})
-                    .get("documentmode")
-                )
-                or "jou"
+        return yaml_data
+    return step
+
+
+def _tipo_documento_step(i: int) -> ApplyStep:
+    """tipo_documento → documentmode."""
+    def step(yaml_data, values, changes):
+        if _is_empty(values[i]):
+            return yaml_data
+        new_type = str(values[i]).lower()
+        if new_type not in ("stu", "man", "jou", "doc"):
+            return yaml_data
+        old_type = (
+            yaml_data.get("documentmode")
+            or (
+                yaml_data.get("format", {})
+                .get("apaquarto-pdf", {})
+                .get("documentmode")
             )
-            if old_type != new_type:
-                if new_type != "jou":
-                    new_ordered = {"documentmode": new_type}
-                    new_ordered.update(
-                        {k: v for k, v in yaml_data.items() if k != "documentmode"}
-                    )
-                    yaml_data = new_ordered
-                    changes.append(
-                        f"documentmode: {old_type} → {new_type} (AGREGADO AL INICIO)"
-                    )
-                elif "documentmode" in yaml_data:
-                    yaml_data["documentmode"] = new_type
-                    changes.append(f"documentmode: {old_type} → {new_type}")
+            or "jou"
+        )
+        if old_type != new_type:
+            if new_type != "jou":
+                new_ordered = {"documentmode": new_type}
+                new_ordered.update(
+                    {k: v for k, v in yaml_data.items() if k != "documentmode"}
+                )
+                yaml_data = new_ordered
+                changes.append(
+                    f"documentmode: {old_type} → {new_type} (AGREGADO AL INICIO)"
+                )
+            elif "documentmode" in yaml_data:
+                yaml_data["documentmode"] = new_type
+                changes.append(f"documentmode: {old_type} → {new_type}")
+        return yaml_data
+    return step
 
-    # --- Listas (keywords, tags, categories) ---
-    for field in ("keywords", "tags", "categories"):
-        if field not in row:
-            continue
-        new_val = row[field]
+
+def _list_step(field: str, i: int) -> ApplyStep:
+    """keywords, tags, categories."""
+    def step(yaml_data, values, changes):
+        new_val = values[i]
         if _is_empty(new_val):
             if field in yaml_data:
                 del yaml_data[field]
                 changes.append(f"{field}: ELIMINADO")
-            continue
+            return yaml_data
         if isinstance(new_val, str):
             new_list = [x.strip() for x in new_val.split(",") if x.strip()]
         else:
@@ -301,55 +434,76 @@ def apply_row_to_yaml(
         if set(old_list) != set(new_list):
             yaml_data[field] = new_list
             changes.append(f"{field}: actualizado ({len(new_list)} items)")
+        return yaml_data
+    return step
 
-    # --- Citación ---
-    if any(f in row for f in ("citation_type", "citation_pdf_url")):
+
+def _citation_step(type_i: Optional[int], pdf_i: Optional[int]) -> ApplyStep:
+    def step(yaml_data, values, changes):
         if "citation" not in yaml_data or not isinstance(yaml_data["citation"], dict):
             yaml_data["citation"] = {}
-        if "citation_type" in row and not _is_empty(row["citation_type"]):
+        if type_i is not None and not _is_empty(values[type_i]):
             old = yaml_data["citation"].get("type")
-            new = row["citation_type"]
+            new = values[type_i]
             if old != new:
                 yaml_data["citation"]["type"] = new
                 changes.append(f"citation.type: {old} → {new}")
-        if "citation_pdf_url" in row and not _is_empty(row["citation_pdf_url"]):
+        if pdf_i is not None and not _is_empty(values[pdf_i]):
             old = yaml_data["citation"].get("pdf-url")
-            new = row["citation_pdf_url"]
+            new = values[pdf_i]
             if old != new:
                 yaml_data["citation"]["pdf-url"] = new
                 changes.append("citation.pdf-url actualizada")
+        return yaml_data
+    return step
+
 
-    # --- Autores (solo si ya existen en index.qmd) ---
-    if "author" in yaml_data:
+def _authors_step(pos: Dict[str, int]) -> Optional[ApplyStep]:
+    """Autores 1-3: solo se actualizan si ya existen en index.qmd."""
+    plans = []
+    for i in range(1, 4):
+        prefix = f"author_{i}_"
+        if f"{prefix}name" not in pos:
+            continue
+        plans.append((
+            pos[f"{prefix}name"],
+            pos.get(f"{prefix}corresponding"),
+            [(key, pos[f"{prefix}{key}"]) for key in ("orcid", "email")
+             if f"{prefix}{key}" in pos],
+            [(key, pos[f"{prefix}affiliation_{key}"])
+             for key in ("name", "department", "city", "region", "country")
+             if f"{prefix}affiliation_{key}" in pos],
+            pos.get(f"{prefix}roles"),
+        ))
+    if not plans:
+        return None
+
+    def step(yaml_data, values, changes):
+        if "author" not in yaml_data:
+            return yaml_data
         authors_data = []
-        for i in range(1, 4):
-            prefix = f"author_{i}_"
-            name_field = f"{prefix}name"
-            if name_field not in row or _is_empty(row[name_field]):
+        for name_i, corr_i, simple, aff_fields, roles_i in plans:
+            if _is_empty(values[name_i]):
                 continue
 
-            author: Dict = {"name": row[name_field]}
+            author: Dict = {"name": values[name_i]}
 
-            corr_field = f"{prefix}corresponding"
-            if corr_field in row and not _is_empty(row[corr_field]):
-                author["corresponding"] = _to_bool(row[corr_field]) or False
+            if corr_i is not None and not _is_empty(values[corr_i]):
+                author["corresponding"] = _to_bool(values[corr_i]) or False
 
-            for simple_field in ("orcid", "email"):
-                full = f"{prefix}{simple_field}"
-                if full in row and not _is_empty(row[full]):
-                    author[simple_field] = row[full]
+            for key, j in simple:
+                if not _is_empty(values[j]):
+                    author[key] = values[j]
 
             aff: Dict = {}
-            for aff_key in ("name", "department", "city", "region", "country"):
-                full = f"{prefix}affiliation_{aff_key}"
-                if full in row and not _is_empty(row[full]):
-                    aff[aff_key] = row[full]
+            for key, j in aff_fields:
+                if not _is_empty(values[j]):
+                    aff[key] = values[j]
             if aff:
                 author["affiliations"] = [aff]
 
-            roles_field = f"{prefix}roles"
-            if roles_field in row and not _is_empty(row[roles_field]):
-                roles_str = row[roles_field]
+            if roles_i is not None and not _is_empty(values[roles_i]):
+                roles_str = values[roles_i]
                 if isinstance(roles_str, str):
                     author["role"] = [r.strip() for r in roles_str.split(",")]
 
@@ -362,5 +516,5 @@ def apply_row_to_yaml(
                 changes.append(
                     f"author: actualizado ({len(authors_data)} autores)"
                 )
-
-    return yaml_data
+        return yaml_data
+    return step
@@ -0,0 +1,149 @@
+"""
+lib/frontmatter_cache.py
+========================
+Caché persistente del frontmatter de cada index.qmd, guardada en un
+SQLite junto a metadata_config.yml (.metadata_cache.sqlite).
+
+Por archivo se guarda el YAML crudo, su posición en el texto (dónde
+empieza el cuerpo), el dict ya parseado y el tipo de documento
+detectado. El dict va como JSON con etiquetas (tagged_json), nunca con
+pickle: un archivo de caché manipulado no puede ejecutar código, como
+mucho cuenta como fallo y el archivo se reparsea.
+
+Cada entrada se valida con los datos de stat (mtime_ns, size): si el
+archivo no cambió desde la última ejecución, se devuelve lo guardado
+sin leerlo ni parsearlo; si cambió, se reparsea y se reemplaza la
+entrada.
+
+La caché es local y desechable: borrar el archivo solo hace que la
+siguiente ejecución vuelva a parsear toda la colección.
+
+Depende de: tagged_json.
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+from . import tagged_json
+
+
+CACHE_FILENAME = ".metadata_cache.sqlite"
+
+# Subir este número invalida todas las cachés existentes (cambio de formato)
+_SCHEMA_VERSION = 5
+
+
+class FrontmatterEntry(NamedTuple):
+    """
+    Lo que se guarda por archivo: YAML crudo, offset del cuerpo en bytes
+    (justo después del --- de cierre), dict parseado y modo.
+    """
+    raw: str
+    body_offset: int
+    data: Dict
+    mode: Optional[str]
+
+
+# =============================================================================
+# CACHÉ
+# =============================================================================
+
+class FrontmatterCache:
+    """Caché (path, mtime_ns, size) → FrontmatterEntry sobre SQLite."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.hits = self.misses = 0
+        self._conn = sqlite3.connect(str(self.db_path))
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != _SCHEMA_VERSION:
+            self._conn.execute("DROP TABLE IF EXISTS frontmatter")
+            self._conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS frontmatter ("
+            " path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER,"
+            " raw TEXT, body_offset INTEGER, data TEXT, mode TEXT)"
+        )
+
+    def get(self, file_path: Path, st: os.stat_result) -> Optional[FrontmatterEntry]:
+        """
+        Devuelve la entrada guardada si sigue vigente para este stat.
+        El dict se deserializa en cada llamada: el llamador puede mutarlo.
+        """
+        row = self._conn.execute(
+            "SELECT mtime_ns, size, raw, body_offset, data, mode"
+            " FROM frontmatter WHERE path = ?",
+            (str(file_path),),
+        ).fetchone()
+        if row is None or row[0] != st.st_mtime_ns or row[1] != st.st_size:
+            self.misses += 1
+            return None
+        try:
+            data = tagged_json.loads(row[4])
+        except (ValueError, TypeError, KeyError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return FrontmatterEntry(row[2], row[3], data, row[5])
+
+    def put(self, file_path: Path, st: os.stat_result, entry: FrontmatterEntry):
+        """
+        Guarda (o reemplaza) la entrada de un archivo recién parseado. Un
+        YAML con tipos que tagged_json no admite no se guarda: ese archivo
+        se vuelve a parsear en cada ejecución.
+        """
+        try:
+            data = tagged_json.dumps(entry.data)
+        except TypeError:
+            return
+        self._conn.execute(
+            "INSERT OR REPLACE INTO frontmatter VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                str(file_path), st.st_mtime_ns, st.st_size, entry.raw,
+                entry.body_offset, data, entry.mode,
+            ),
+        )
+
+    def commit(self):
+        self._conn.commit()
+
+    def close(self):
+        self._conn.commit()
+        self._conn.close()
+
+
+# =============================================================================
+# CACHÉ ACTIVA DEL PROCESO
+# =============================================================================
+
+_active: Optional[FrontmatterCache] = None
+
+
+def activate_cache(directory: Path) -> Optional[FrontmatterCache]:
+    """
+    Abre (o crea) la caché en `directory` y la deja activa para todo el
+    proceso. Si no se puede abrir (disco de solo lectura, archivo
+    corrupto…) se avisa y se sigue sin caché.
+    """
+    global _active
+    deactivate_cache()
+    try:
+        _active = FrontmatterCache(Path(directory) / CACHE_FILENAME)
+    except sqlite3.Error as e:
+        print(f"⚠️  Caché de frontmatter deshabilitada: {e}")
+        _active = None
+    return _active
+
+
+def deactivate_cache():
+    """Cierra la caché activa (guardando lo pendiente), si la hay."""
+    global _active
+    if _active is not None:
+        _active.close()
+        _active = None
+
+
+def get_active_cache() -> Optional[FrontmatterCache]:
+    return _active
@@ -0,0 +1,110 @@
+"""
+lib/metadata_table.py
+=====================
+Índices en memoria sobre las filas de METADATOS:
+
+  ruta_archivo → fila      (la primera, si una ruta se repite)
+  blog_nombre  → filas     (en orden)
+
+Se construye una vez por comando, desde el DataFrame que devuelve
+excel_store (filas = posiciones para df.iloc) o desde la hoja abierta con
+openpyxl (filas = números de fila de Excel, desde la 2). Con eso buscar
+un artículo o quedarse con un blog deja de recorrer toda la hoja.
+
+select() aplica los filtros --blog/--path de los comandos con la misma
+semántica que tenían en cada lado:
+  - DataFrame (regex=True): como df["ruta_archivo"].str.contains(p, case=False)
+  - hoja:                   subcadena sin distinguir mayúsculas
+
+Nada en este archivo depende de otros módulos del proyecto.
+"""
+
+import re
+from typing import Dict, Hashable, List, Optional, Sequence
+
+
+def _is_missing(value) -> bool:
+    """None o NaN (lo que deja pandas en una celda vacía)."""
+    return value is None or value != value
+
+
+class MetadataTable:
+    """Índices ruta_archivo → fila y blog_nombre → filas de METADATOS."""
+
+    def __init__(self, rutas: Sequence, blogs: Sequence, first_row: int = 0):
+        self.first_row = first_row
+        self._rutas = list(rutas)
+        self._by_ruta: Dict[Hashable, int] = {}
+        self._by_blog: Dict[Hashable, List[int]] = {}
+        for offset, (ruta, blog) in enumerate(zip(self._rutas, blogs)):
+            row = first_row + offset
+            if not _is_missing(ruta):
+                self._by_ruta.setdefault(ruta, row)
+            if not _is_missing(blog):
+                self._by_blog.setdefault(blog, []).append(row)
+
+    @classmethod
+    def from_frame(cls, df) -> "MetadataTable":
+        """Índices de un DataFrame de METADATOS (filas = posiciones iloc)."""
+        n = len(df)
+        rutas = df["ruta_archivo"].tolist() if "ruta_archivo" in df else [None] * n
+        blogs = df["blog_nombre"].tolist() if "blog_nombre" in df else [None] * n
+        return cls(rutas, blogs, first_row=0)
+
+    @classmethod
+    def from_sheet(
+        cls, values, max_row: int, ruta_col: int, blog_col: int
+    ) -> "MetadataTable":
+        """
+        Índices de la hoja METADATOS. `values` es cualquier objeto con
+        .value(fila, col), p.ej. el SheetValues de open_metadata_sheets.
+        """
+        rows = range(2, max_row + 1)
+        return cls(
+            [values.value(r, ruta_col) for r in rows],
+            [values.value(r, blog_col) for r in rows],
+            first_row=2,
+        )
+
+    def __len__(self) -> int:
+        return len(self._rutas)
+
+    def row(self, ruta: str) -> Optional[int]:
+        """Fila del artículo, o None si no está en el Excel."""
+        return self._by_ruta.get(ruta)
+
+    def ruta(self, row: int):
+        """Valor de ruta_archivo en esa fila (tal cual, puede estar vacío)."""
+        return self._rutas[row - self.first_row]
+
+    def blog_rows(self, blog: str) -> List[int]:
+        """Filas de un blog, en el orden de la hoja."""
+        return list(self._by_blog.get(blog, ()))
+
+    def select(
+        self,
+        blog_filter: Optional[str] = None,
+        path_filter: Optional[str] = None,
+        regex: bool = False,
+    ) -> List[int]:
+        """Filas que pasan los filtros --blog y --path, en orden."""
+        if blog_filter:
+            rows = self.blog_rows(blog_filter)
+        else:
+            rows = list(range(self.first_row, self.first_row + len(self._rutas)))
+
+        if path_filter:
+            if regex:
+                pattern = re.compile(path_filter, re.IGNORECASE)
+                rows = [
+                    r for r in rows
+                    if isinstance(self.ruta(r), str) and pattern.search(self.ruta(r))
+                ]
+            else:
+                needle = path_filter.lower()
+                rows = [
+                    r for r in rows
+                    if not _is_missing(self.ruta(r))
+                    and needle in str(self.ruta(r)).lower()
+                ]
+        return rows
@@ -6,6 +6,7 @@ Sincroniza metadatos que se DERIVAN de la ruta del artículo:
   sync-dates     → campo date desde la carpeta YYYY-MM-DD-titulo
                    (formato canónico MM/DD/YYYY)
   sync-pdf-urls  → citation.pdf-url = <base_url_del_blog>/<ruta>/index.pdf
+  sync-derived   → varias reglas a la vez, en una sola pasada
 
 Absorbe los scripts legacy 1_sincronizar_fecha_carpeta_en_index_qmd.py y
 3_actualizar_enlace_pdf_en_qmd.py, adaptados a la estructura actual
@@ -13,28 +14,43 @@ Absorbe los scripts legacy 1_sincronizar_fecha_carpeta_en_index_qmd.py y
 resuelve por mayoría de los pdf-url ya existentes en ese blog, con
 override opcional vía blog_base_urls en metadata_config.yml.
 
+sync-derived es el motor genérico: un registro de reglas (campo +
+plantilla sobre la ruta) con dos incorporadas equivalentes a los comandos
+anteriores (date, pdf-url) más las que se declaren en derived_fields del
+metadata_config.yml:
+
+    derived_fields:
+      citation-url:
+        field: citation.url
+        template: "{base_url}/{inner}/"
+        # column: citation_url   (opcional; por defecto el campo con _)
+
+Todas las reglas elegidas se evalúan en UN recorrido (el censo de URLs
+base sale de los mismos registros) y cada archivo se escribe una sola vez
+con todos sus cambios. Una regla nunca crea bloques intermedios: si el
+artículo no tiene citation, citation.* se omite (en el Excel, si la fila
+no tiene ninguna columna citation_* con valor). sync-dates y
+sync-pdf-urls son sync-derived con una sola regla (date / pdf-url).
+
 Nota: la parte del script legacy que reescribía enlaces a PDF dentro del
 cuerpo del documento NO se migró: ningún artículo actual los usa (censo
 2026-07) y el regex original era peligroso sobre el archivo completo.
 
-Depende de: collector, yaml_parser, field_mapper, qmd_updater, excel_writer.
+Depende de: collector, metadata_table, qmd_updater, excel_writer.
 """
 
 import re
+import string
 from collections import Counter, defaultdict
 from datetime import date, datetime
 from pathlib import Path
-from typing import Dict, Iterable, Optional, Set, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
-import yaml
-
-from .collector import collect_index_files
+from .collector import collect_index_files, load_article_record
 from .excel_writer import open_metadata_sheets
-from .field_mapper import reorder_yaml
-from .qmd_updater import write_yaml_to_qmd
-from .yaml_parser import extract_yaml_only_index
+from .metadata_table import MetadataTable
+from .qmd_updater import patch_record_yaml
 
-_FRONTMATTER_RE = re.compile(r"^---\s*\n(.*?)\n---", re.DOTALL)
 _FOLDER_DATE_RE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})")
 _BASE_URL_RE    = re.compile(r"^(https?://[^/]+)")
 
@@ -132,117 +148,255 @@ def _current_pdf_url(yaml_data: dict) -> Optional[str]:
 # INFRAESTRUCTURA COMÚN DE RECORRIDO
 # =============================================================================
 
-def _iter_article_yaml(base_path: Path, df_files, path_filter: Optional[str]):
+def _iter_article_records(base_path: Path, df_files, path_filter: Optional[str]):
     """
-    Genera (ruta_relativa, file_path, content, match, yaml_data) por artículo
-    legible. Centraliza lectura + parseo para los dos comandos de sync.
+    Genera el ArticleRecord de cada artículo legible que pasa el filtro de
+    ruta. El YAML ya viene parseado por collector: aquí no se relee nada.
     """
     for _, row in df_files.iterrows():
         ruta = row["ruta_archivo"]
         if path_filter and path_filter.lower() not in str(ruta).lower():
             continue
-        file_path = base_path / ruta
-        if not file_path.exists():
-            continue
-        try:
-            content = file_path.read_text(encoding="utf-8")
-        except Exception as e:
-            print(f"❌ No se pudo leer {ruta}: {e}")
-            continue
-        match = _FRONTMATTER_RE.match(content)
-        if not match:
-            continue
-        try:
-            yaml_data = yaml.safe_load(match.group(1)) or {}
-        except yaml.YAMLError as e:
-            print(f"⚠️  YAML inválido en {ruta}: {e}")
-            continue
-        yield str(ruta), file_path, content, match, yaml_data
+        record = row.get("articulo")
+        if record is None:
+            record = load_article_record(base_path / ruta, base_path)
+        if record is not None:
+            yield record
 
 
-def _print_sync_summary(changed: int, unchanged: int, skipped: int,
-                        skipped_label: str, dry_run: bool):
-    print(f"\n{'=' * 70}")
-    print(f"{'🔍 RESUMEN DE SIMULACIÓN' if dry_run else '✅ RESUMEN'}")
-    print(f"   ✅ Actualizados:           {changed}")
-    print(f"   ⏭️  Ya sincronizados:       {unchanged}")
-    print(f"   ⚠️  Omitidos ({skipped_label}): {skipped}")
-    print(f"{'=' * 70}\n")
-    if dry_run and changed > 0:
-        print("💡 Para aplicar cambios, ejecuta sin --dry-run\n")
+def _iter_excel_rows(ws, ws_values, headers, blog_filter, path_filter):
+    """Genera (row_idx, ruta) de las filas que pasan los filtros."""
+    table = MetadataTable.from_sheet(
+        ws_values, ws.max_row, headers["ruta_archivo"], headers["blog_nombre"]
+    )
+    for row_idx in table.select(blog_filter, path_filter):
+        ruta = table.ruta(row_idx)
+        if ruta:
+            yield row_idx, str(ruta)
 
 
 # =============================================================================
-# SYNC-DATES SOBRE ARCHIVOS
+# SYNC-DERIVED: REGLAS DE CAMPOS DERIVADOS
 # =============================================================================
 
-def sync_dates_files(
-    base_path: Path,
-    allowed_blogs: Set[str],
-    user_excluded_folders: Set[str],
-    blog_filter: Optional[str] = None,
-    path_filter: Optional[str] = None,
-    dry_run: bool = False,
-):
-    """Sincroniza el campo date de cada index.qmd con su carpeta."""
-    print(f"\n{'🔍 SIMULACIÓN' if dry_run else '📅 SINCRONIZANDO'} FECHAS DESDE CARPETAS\n")
-    print("=" * 70)
+# Marcadores que puede usar una plantilla (ver _path_context)
+PLACEHOLDERS = (
+    "ruta", "dir", "blog", "inner", "folder", "slug",
+    "year", "month", "day", "base_url",
+)
 
-    df_files = collect_index_files(
-        base_path, allowed_blogs, user_excluded_folders,
-        blog_name=blog_filter, verbose=False,
-    )
-    if df_files.empty:
-        print("⚠️  No se encontraron artículos")
-        return
 
-    changed = unchanged = skipped = 0
-    for ruta, file_path, content, match, yaml_data in _iter_article_yaml(
-        base_path, df_files, path_filter
-    ):
-        expected = date_from_folder(file_path.parent.name)
-        if expected is None:
-            skipped += 1
-            continue
+def _plain_value(value) -> Optional[str]:
+    return None if value is None else str(value).strip()
 
-        current = normalize_date_value(yaml_data.get("date"))
-        if current == expected:
-            unchanged += 1
-            continue
 
-        changed += 1
-        icon = "🔍" if dry_run else "✅"
-        print(f"\n{icon} {ruta}")
-        print(f"   date: {current!r} → {expected!r}")
+class DerivedRule:
+    """
+    Un campo derivado: `field` es la ruta con puntos dentro del YAML
+    ('date', 'citation.pdf-url'), `column` la columna equivalente del
+    Excel y `template` una plantilla str.format con los PLACEHOLDERS.
+    """
 
-        if not dry_run:
-            yaml_data["date"] = expected
-            write_yaml_to_qmd(
-                file_path, reorder_yaml(yaml_data), content, match.end()
+    def __init__(self, name: str, field: str, template: str,
+                 column: Optional[str] = None, normalize=_plain_value):
+        self.name = name
+        self.field = field
+        self.keys = tuple(field.split("."))
+        self.column = column or field.replace(".", "_").replace("-", "_")
+        self.template = template
+        self.normalize = normalize
+
+        if not all(self.keys):
+            raise ValueError(f"Regla '{name}': campo inválido '{field}'")
+        try:
+            used = {
+                marker for _, marker, _, _ in string.Formatter().parse(template)
+                if marker is not None
+            }
+        except ValueError as e:
+            raise ValueError(f"Regla '{name}': plantilla inválida ({e})")
+        unknown = sorted(used - set(PLACEHOLDERS))
+        if not used or unknown:
+            markers = ", ".join("{" + p + "}" for p in PLACEHOLDERS)
+            raise ValueError(
+                f"Regla '{name}': la plantilla debe usar solo {markers}"
+                + (f" (desconocidos: {', '.join(unknown)})" if unknown else "")
             )
+        self.needs_base_url = "base_url" in used
+
+    @classmethod
+    def from_config(cls, name: str, spec) -> "DerivedRule":
+        """Regla desde una entrada de derived_fields; ValueError si es inválida."""
+        if not isinstance(spec, dict) or not spec.get("field") or not spec.get("template"):
+            raise ValueError(f"Regla '{name}': se esperan las claves field y template")
+        return cls(str(name), str(spec["field"]), str(spec["template"]),
+                   column=spec.get("column"))
+
+    def expected(self, context: Dict[str, str]) -> Optional[str]:
+        """Valor derivado, o None si falta algún dato (sin fecha, sin URL base)."""
+        try:
+            return self.template.format_map(context)
+        except KeyError:
+            return None
+
+    def parent(self, yaml_data: dict) -> Optional[dict]:
+        """Mapping que contiene el campo, o None si falta un bloque intermedio."""
+        node = yaml_data
+        for key in self.keys[:-1]:
+            node = node.get(key)
+            if not isinstance(node, dict):
+                return None
+        return node
+
+    def parent_columns(self, headers: Dict[str, int]) -> Optional[List[int]]:
+        """
+        Equivalente de parent() en el Excel: columnas del bloque intermedio
+        (citation.pdf-url → todas las citation_*), o None si el campo es de
+        primer nivel. Una fila sin ningún valor en ellas no tiene el bloque.
+        """
+        if len(self.keys) == 1:
+            return None
+        prefix = "_".join(self.keys[:-1]).replace("-", "_") + "_"
+        return [col for name, col in headers.items()
+                if isinstance(name, str) and name.startswith(prefix)]
+
+    def describe(self) -> str:
+        return f"{self.field} = {self.template}"
+
+
+BUILTIN_RULES: Dict[str, DerivedRule] = {
+    "date": DerivedRule(
+        "date", "date", "{month}/{day}/{year}", normalize=normalize_date_value,
+    ),
+    "pdf-url": DerivedRule(
+        "pdf-url", "citation.pdf-url", "{base_url}/{inner}/index.pdf",
+    ),
+}
+
+
+def load_derived_rules(config: Dict) -> Dict[str, DerivedRule]:
+    """
+    Registro completo: reglas incorporadas + derived_fields del
+    metadata_config.yml. ValueError si una regla propia es inválida o
+    usa el nombre de una incorporada.
+    """
+    rules = dict(BUILTIN_RULES)
+    custom = config.get("derived_fields") or {}
+    if not isinstance(custom, dict):
+        raise ValueError("derived_fields debe ser un mapping nombre → {field, template}")
+    for name, spec in custom.items():
+        if name in rules:
+            raise ValueError(f"Regla '{name}': el nombre está reservado")
+        rules[name] = DerivedRule.from_config(name, spec)
+    return rules
+
+
+def select_rules(registry: Dict[str, DerivedRule],
+                 names: Optional[List[str]] = None) -> List[DerivedRule]:
+    """
+    Reglas a aplicar, en el orden pedido (todas si `names` está vacío).
+    ValueError si un nombre no existe o dos reglas escriben el mismo campo.
+    """
+    unknown = [n for n in names or [] if n not in registry]
+    if unknown:
+        raise ValueError(
+            f"Regla(s) desconocida(s): {', '.join(unknown)} "
+            f"(disponibles: {', '.join(registry)})"
+        )
+    selected = [registry[n] for n in dict.fromkeys(names or registry)]
+    fields = [rule.field for rule in selected]
+    repeated = sorted({f for f in fields if fields.count(f) > 1})
+    if repeated:
+        raise ValueError(f"Varias reglas escriben el mismo campo: {', '.join(repeated)}")
+    return selected
+
 
-    _print_sync_summary(changed, unchanged, skipped, "sin fecha en carpeta", dry_run)
+def print_rules(registry: Dict[str, DerivedRule]):
+    print("\n🧮 REGLAS DE CAMPOS DERIVADOS\n")
+    for name, rule in registry.items():
+        origin = "incorporada" if name in BUILTIN_RULES else "config"
+        print(f"   {name:<16} {rule.describe()}  [{origin}; columna {rule.column}]")
+    print()
 
 
 # =============================================================================
-# SYNC-PDF-URLS SOBRE ARCHIVOS
+# SYNC-DERIVED: CONTEXTO DE UNA RUTA
 # =============================================================================
 
-def sync_pdf_urls_files(
+def _path_context(ruta: str, base_urls: Dict[str, str]) -> Dict[str, str]:
+    """
+    Marcadores de la ruta de un artículo. Para
+    'pub_chaska/posts/2017-03-01-mi-post/index.qmd':
+      ruta   → la ruta completa          blog   → pub_chaska
+      dir    → ruta sin index.qmd        inner  → posts/2017-03-01-mi-post
+      folder → 2017-03-01-mi-post        slug   → mi-post
+      year/month/day → 2017/03/01 (solo si la carpeta empieza con fecha)
+      base_url → URL base del blog (solo si se pudo resolver)
+    """
+    parts = Path(str(ruta)).parts
+    folder = parts[-2] if len(parts) > 1 else ""
+    context = {
+        "ruta": "/".join(parts),
+        "dir": "/".join(parts[:-1]),
+        "blog": parts[0],
+        "inner": "/".join(parts[1:-1]),
+        "folder": folder,
+        "slug": folder,
+    }
+    match = _FOLDER_DATE_RE.match(folder)
+    if match:
+        context["year"], context["month"], context["day"] = match.groups()
+        context["slug"] = folder[match.end():].lstrip("-") or folder
+    if parts[0] in base_urls:
+        context["base_url"] = base_urls[parts[0]]
+    return context
+
+
+# =============================================================================
+# SYNC-DERIVED: RESUMEN
+# =============================================================================
+
+def _print_derived_summary(counts: Dict[str, List[int]], touched: int,
+                           dry_run: bool, touched_label: str):
+    print(f"\n{'=' * 70}")
+    print(f"{'🔍 RESUMEN DE SIMULACIÓN' if dry_run else '✅ RESUMEN'}")
+    print(f"   {'Regla':<20} {'Actualizados':>12} {'Ya sincronizados':>17} {'Omitidos':>9}")
+    for name, (changed, unchanged, skipped) in counts.items():
+        print(f"   {name:<20} {changed:>12} {unchanged:>17} {skipped:>9}")
+    print(f"   {touched_label}: {touched}")
+    print(f"{'=' * 70}\n")
+    if dry_run and touched > 0:
+        print("💡 Para aplicar cambios, ejecuta sin --dry-run\n")
+
+
+def _print_header(rules: List[DerivedRule], target: str, dry_run: bool):
+    print(f"\n{'🔍 SIMULACIÓN' if dry_run else '🧮 SINCRONIZANDO'} "
+          f"CAMPOS DERIVADOS {target}\n")
+    print("=" * 70)
+    for rule in rules:
+        print(f"   {rule.name:<16} {rule.describe()}")
+
+
+# =============================================================================
+# SYNC-DERIVED SOBRE ARCHIVOS
+# =============================================================================
+
+def sync_derived_files(
     base_path: Path,
-    allowed_blogs: Set[str],
-    user_excluded_folders: Set[str],
+    allowed_blogs,
+    user_excluded_folders,
+    rules: List[DerivedRule],
     configured_urls: Optional[Dict[str, str]] = None,
     blog_filter: Optional[str] = None,
     path_filter: Optional[str] = None,
     dry_run: bool = False,
 ):
     """
-    Sincroniza citation.pdf-url de cada index.qmd con su ruta real.
-    Solo actualiza artículos que YA tienen bloque citation (no lo crea).
+    Aplica todas las `rules` a los index.qmd en una sola pasada: un
+    recorrido (que también sirve de censo de URLs base) y, por archivo,
+    una sola escritura con todos sus campos cambiados.
     """
-    print(f"\n{'🔍 SIMULACIÓN' if dry_run else '🔗 SINCRONIZANDO'} PDF-URLS DESDE RUTAS\n")
-    print("=" * 70)
+    _print_header(rules, "DESDE RUTAS", dry_run)
 
     df_files = collect_index_files(
         base_path, allowed_blogs, user_excluded_folders,
@@ -252,85 +406,84 @@ def sync_pdf_urls_files(
         print("⚠️  No se encontraron artículos")
         return
 
-    # Pre-pase: censo de pdf-urls existentes para el voto por mayoría
-    samples = []
-    for _, row in df_files.iterrows():
-        yaml_data = extract_yaml_only_index(base_path / row["ruta_archivo"]) or {}
-        samples.append(
-            (blog_dir_from_ruta(row["ruta_archivo"]), _current_pdf_url(yaml_data))
+    # El censo usa todos los artículos del recorrido (como sync-pdf-urls,
+    # sin --filter-path); los registros ya vienen parseados por collector
+    records = list(_iter_article_records(base_path, df_files, None))
+    base_urls: Dict[str, str] = {}
+    if any(rule.needs_base_url for rule in rules):
+        base_urls = resolve_blog_base_urls(
+            ((blog_dir_from_ruta(r.ruta_archivo), _current_pdf_url(r.yaml_index))
+             for r in records),
+            configured_urls,
         )
-    base_urls = resolve_blog_base_urls(samples, configured_urls)
-    _print_base_urls(base_urls)
+        _print_base_urls(base_urls)
 
-    changed = unchanged = skipped = 0
-    for ruta, file_path, content, match, yaml_data in _iter_article_yaml(
-        base_path, df_files, path_filter
-    ):
-        blog = blog_dir_from_ruta(ruta)
-        base_url = base_urls.get(blog)
-        citation = yaml_data.get("citation")
-
-        # Sin citation o sin URL base conocida no hay nada que sincronizar
-        if base_url is None or not isinstance(citation, dict):
-            skipped += 1
+    counts = {rule.name: [0, 0, 0] for rule in rules}
+    touched = 0
+    for record in records:
+        ruta, yaml_data = record.ruta_archivo, record.yaml_index
+        if path_filter and path_filter.lower() not in str(ruta).lower():
             continue
 
-        expected = expected_pdf_url(base_url, ruta)
-        current = citation.get("pdf-url")
-        if current == expected:
-            unchanged += 1
+        context = _path_context(ruta, base_urls)
+        changes: List[Tuple[DerivedRule, dict, object, str]] = []
+        for rule in rules:
+            expected = rule.expected(context)
+            parent = rule.parent(yaml_data)
+            if expected is None or parent is None:
+                counts[rule.name][2] += 1
+                continue
+            current = parent.get(rule.keys[-1])
+            if rule.normalize(current) == expected:
+                counts[rule.name][1] += 1
+                continue
+            counts[rule.name][0] += 1
+            changes.append((rule, parent, current, expected))
+
+        if not changes:
             continue
-
-        changed += 1
-        icon = "🔍" if dry_run else "✅"
-        print(f"\n{icon} {ruta}")
-        print(f"   pdf-url: {current}")
-        print(f"        →   {expected}")
+        touched += 1
+        print(f"\n{'🔍' if dry_run else '✅'} {ruta}")
+        for rule, _, current, expected in changes:
+            print(f"   {rule.field}: {rule.normalize(current)!r} → {expected!r}")
 
         if not dry_run:
-            citation["pdf-url"] = expected
-            write_yaml_to_qmd(
-                file_path, reorder_yaml(yaml_data), content, match.end()
+            for rule, parent, _, expected in changes:
+                parent[rule.keys[-1]] = expected
+            patch_record_yaml(
+                record, yaml_data,
+                tuple(dict.fromkeys(rule.keys[0] for rule, *_ in changes)),
             )
 
-    _print_sync_summary(
-        changed, unchanged, skipped, "sin citation o sin URL base", dry_run
+    _print_derived_summary(
+        counts, touched, dry_run,
+        "📝 Archivos a modificar" if dry_run else "📝 Archivos escritos",
     )
 
 
 # =============================================================================
-# SYNC SOBRE EXCEL (solo columnas date / citation_pdf_url)
+# SYNC-DERIVED SOBRE EXCEL
 # =============================================================================
 
-def _iter_excel_rows(ws, ws_values, headers, blog_filter, path_filter):
-    """Genera (row_idx, ruta) de las filas que pasan los filtros."""
-    ruta_col = headers["ruta_archivo"]
-    blog_col = headers["blog_nombre"]
-    for row_idx in range(2, ws.max_row + 1):
-        ruta = ws_values.cell(row_idx, ruta_col).value
-        if not ruta:
-            continue
-        if blog_filter and ws_values.cell(row_idx, blog_col).value != blog_filter:
-            continue
-        if path_filter and path_filter.lower() not in str(ruta).lower():
-            continue
-        yield row_idx, str(ruta)
-
-
-def _sync_excel_column(
+def sync_derived_excel(
     excel_path: str,
-    column: str,
-    expected_for_ruta,
-    blog_filter: Optional[str],
-    path_filter: Optional[str],
-    dry_run: bool,
-    normalize_current=lambda v: None if v is None else str(v).strip(),
+    rules: List[DerivedRule],
+    configured_urls: Optional[Dict[str, str]] = None,
+    blog_filter: Optional[str] = None,
+    path_filter: Optional[str] = None,
+    dry_run: bool = False,
 ):
     """
-    Motor común de sync sobre Excel: recorre filas, calcula el valor
-    esperado desde ruta_archivo (callback expected_for_ruta) y actualiza
-    la columna indicada. Los .qmd no se tocan (eso lo hace 'update').
+    Aplica todas las `rules` a sus columnas del Excel en una pasada por
+    las filas y guarda una sola vez. Las reglas cuya columna no existe en
+    METADATOS se omiten con aviso. Los .qmd no se tocan.
+
+    Igual que sobre archivos, una regla anidada no crea el bloque: la fila
+    se omite si todas las columnas del bloque están vacías (sin citation_*
+    no se rellena citation_pdf_url, que 'update' convertiría en citation).
     """
+    _print_header(rules, "EN EXCEL", dry_run)
+
     try:
         wb, ws, ws_values = open_metadata_sheets(excel_path)
     except Exception as e:
@@ -338,42 +491,116 @@ def _sync_excel_column(
         return
 
     headers = {ws.cell(1, c).value: c for c in range(1, ws.max_column + 1)}
-    for required in ("ruta_archivo", "blog_nombre", column):
+    for required in ("ruta_archivo", "blog_nombre"):
         if required not in headers:
             print(f"❌ El Excel no tiene columna '{required}' en METADATOS")
             return
+    missing = [rule for rule in rules if rule.column not in headers]
+    for rule in missing:
+        print(f"⚠️  Regla '{rule.name}' omitida: el Excel no tiene columna '{rule.column}'")
+    rules = [rule for rule in rules if rule.column in headers]
+    if not rules:
+        return
 
-    target_col = headers[column]
-    changed = unchanged = skipped = 0
+    rows = list(_iter_excel_rows(ws, ws_values, headers, None, None))
+    base_urls: Dict[str, str] = {}
+    if any(rule.needs_base_url for rule in rules):
+        pdf_col = headers.get("citation_pdf_url")
+        base_urls = resolve_blog_base_urls(
+            ((blog_dir_from_ruta(ruta),
+              ws_values.value(row_idx, pdf_col) if pdf_col else None)
+             for row_idx, ruta in rows),
+            configured_urls,
+        )
+        _print_base_urls(base_urls)
 
+    block_columns = {rule.name: rule.parent_columns(headers) for rule in rules}
+    counts = {rule.name: [0, 0, 0] for rule in rules}
+    touched = 0
     for row_idx, ruta in _iter_excel_rows(
         ws, ws_values, headers, blog_filter, path_filter
     ):
-        expected = expected_for_ruta(ruta)
-        if expected is None:
-            skipped += 1
-            continue
-        current = normalize_current(ws_values.cell(row_idx, target_col).value)
-        if current == expected:
-            unchanged += 1
+        context = _path_context(ruta, base_urls)
+        changes = []
+        for rule in rules:
+            expected = rule.expected(context)
+            block = block_columns[rule.name]
+            if block is not None and not any(
+                _plain_value(ws_values.value(row_idx, col)) for col in block
+            ):
+                expected = None
+            if expected is None:
+                counts[rule.name][2] += 1
+                continue
+            current = rule.normalize(ws_values.value(row_idx, headers[rule.column]))
+            if current == expected:
+                counts[rule.name][1] += 1
+                continue
+            counts[rule.name][0] += 1
+            changes.append((rule, current, expected))
+
+        if not changes:
             continue
+        touched += 1
+        print(f"\n{'🔍' if dry_run else '✅'} Fila {row_idx}: {ruta}")
+        for rule, current, expected in changes:
+            print(f"   {rule.column}: {current!r} → {expected!r}")
+            if not dry_run:
+                ws.cell(row_idx, headers[rule.column]).value = expected
+
+    _print_derived_summary(
+        counts, touched, dry_run,
+        "📝 Filas a modificar" if dry_run else "📝 Filas modificadas",
+    )
 
-        changed += 1
-        icon = "🔍" if dry_run else "✅"
-        print(f"\n{icon} Fila {row_idx}: {ruta}")
-        print(f"   {column}: {current!r} → {expected!r}")
-        if not dry_run:
-            ws.cell(row_idx, target_col, expected)
-
-    _print_sync_summary(changed, unchanged, skipped, "sin valor derivable", dry_run)
-
-    if not dry_run and changed > 0:
+    if not dry_run and touched > 0:
         wb.save(excel_path)
         print(f"✅ Excel guardado: {excel_path}")
         print("💡 Los archivos .qmd NO fueron modificados. Para aplicar:")
         print(f"   python main.py update ~/Documents {excel_path}\n")
 
 
+# =============================================================================
+# SYNC-DATES Y SYNC-PDF-URLS (una sola regla de sync-derived)
+# =============================================================================
+
+def sync_dates_files(
+    base_path: Path,
+    allowed_blogs: Set[str],
+    user_excluded_folders: Set[str],
+    blog_filter: Optional[str] = None,
+    path_filter: Optional[str] = None,
+    dry_run: bool = False,
+):
+    """Sincroniza el campo date de cada index.qmd con su carpeta."""
+    sync_derived_files(
+        base_path, allowed_blogs, user_excluded_folders,
+        select_rules(BUILTIN_RULES, ["date"]),
+        blog_filter=blog_filter, path_filter=path_filter, dry_run=dry_run,
+    )
+
+
+def sync_pdf_urls_files(
+    base_path: Path,
+    allowed_blogs: Set[str],
+    user_excluded_folders: Set[str],
+    configured_urls: Optional[Dict[str, str]] = None,
+    blog_filter: Optional[str] = None,
+    path_filter: Optional[str] = None,
+    dry_run: bool = False,
+):
+    """
+    Sincroniza citation.pdf-url de cada index.qmd con su ruta real.
+    Solo actualiza artículos que YA tienen bloque citation (no lo crea).
+    """
+    sync_derived_files(
+        base_path, allowed_blogs, user_excluded_folders,
+        select_rules(BUILTIN_RULES, ["pdf-url"]),
+        configured_urls=configured_urls,
+        blog_filter=blog_filter, path_filter=path_filter, dry_run=dry_run,
+    )
+
+
 def sync_dates_excel(
     excel_path: str,
     blog_filter: Optional[str] = None,
@@ -381,13 +608,9 @@ def sync_dates_excel(
     dry_run: bool = False,
 ):
     """Sincroniza la columna date del Excel con la carpeta de cada ruta."""
-    print(f"\n{'🔍 SIMULACIÓN' if dry_run else '📅 SINCRONIZANDO'} FECHAS EN EXCEL\n")
-    print("=" * 70)
-    _sync_excel_column(
-        excel_path, "date",
-        expected_for_ruta=lambda ruta: date_from_folder(Path(ruta).parts[-2]),
+    sync_derived_excel(
+        excel_path, select_rules(BUILTIN_RULES, ["date"]),
         blog_filter=blog_filter, path_filter=path_filter, dry_run=dry_run,
-        normalize_current=normalize_date_value,
     )
 
 
@@ -398,34 +621,12 @@ def sync_pdf_urls_excel(
     path_filter: Optional[str] = None,
     dry_run: bool = False,
 ):
-    """Sincroniza la columna citation_pdf_url del Excel con cada ruta."""
-    print(f"\n{'🔍 SIMULACIÓN' if dry_run else '🔗 SINCRONIZANDO'} PDF-URLS EN EXCEL\n")
-    print("=" * 70)
-
-    # Censo para voto por mayoría a partir de la propia columna del Excel
-    try:
-        wb, ws, ws_values = open_metadata_sheets(excel_path)
-    except Exception as e:
-        print(f"❌ Error abriendo Excel: {e}")
-        return
-    headers = {ws.cell(1, c).value: c for c in range(1, ws.max_column + 1)}
-    if "citation_pdf_url" not in headers:
-        print("❌ El Excel no tiene columna 'citation_pdf_url' en METADATOS")
-        return
-
-    samples = [
-        (blog_dir_from_ruta(ruta),
-         ws_values.cell(row_idx, headers["citation_pdf_url"]).value)
-        for row_idx, ruta in _iter_excel_rows(ws, ws_values, headers, None, None)
-    ]
-    base_urls = resolve_blog_base_urls(samples, configured_urls)
-    _print_base_urls(base_urls)
-
-    def expected(ruta: str) -> Optional[str]:
-        base = base_urls.get(blog_dir_from_ruta(ruta))
-        return expected_pdf_url(base, ruta) if base else None
-
-    _sync_excel_column(
-        excel_path, "citation_pdf_url", expected_for_ruta=expected,
+    """
+    Sincroniza la columna citation_pdf_url del Excel con cada ruta
+    (solo en filas con algún dato de citation, como sobre archivos).
+    """
+    sync_derived_excel(
+        excel_path, select_rules(BUILTIN_RULES, ["pdf-url"]),
+        configured_urls=configured_urls,
         blog_filter=blog_filter, path_filter=path_filter, dry_run=dry_run,
     )
@@ -9,60 +9,227 @@ Responsabilidades:
   - Escribir YAML actualizado preservando el contenido del documento.
   - Reportar cambios con detalle o en modo simulación (dry-run).
 
-Depende de: config, yaml_parser, field_mapper.
+Depende de: config, excel_store, metadata_table, yaml_emitter, yaml_patch,
+yaml_parser, field_mapper.
 """
 
-import re
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import pandas as pd
-import yaml
 
 from .config import ALL_FIELDS
-from .field_mapper import apply_row_to_yaml
+from .excel_store import read_metadata_sheet
+from .field_mapper import apply_row_to_yaml, reorder_yaml
+from .metadata_table import MetadataTable
+from .yaml_emitter import serialize_frontmatter
+from .yaml_patch import patch_frontmatter
+from .yaml_parser import parse_frontmatter, read_frontmatter
 
 
 # =============================================================================
 # ESCRITURA DE UN SOLO ARCHIVO
 # =============================================================================
 
-def write_yaml_to_qmd(file_path: Path, updated_yaml: dict, original_content: str, match_end: int):
+def write_yaml_to_qmd(file_path: Path, updated_yaml: dict, body_offset: int) -> bool:
     """
     Serializa el YAML actualizado y reconstruye el archivo .qmd,
-    preservando el contenido del documento (todo lo que viene después del ---).
-
-    Es EL único escritor de YAML del proyecto: qmd_updater, sync y
-    tag_operations escriben siempre a través de esta función.
-    """
-    new_yaml_str = yaml.dump(
-        updated_yaml,
-        allow_unicode=True,
-        default_flow_style=False,
-        sort_keys=False,
-        indent=2,
-        width=80,
-        default_style=(
-            '"'
-            if any(
-                isinstance(v, str) and "\n" in v
-                for v in updated_yaml.values()
-            )
-            else None
-        ),
+    preservando el contenido del documento (todo lo que viene después del
+    ---, a partir de `body_offset` en bytes, tal como lo da
+    yaml_parser.read_frontmatter).
+
+    Si el encabezado serializado es idéntico byte a byte al que ya tiene
+    el archivo, no se escribe nada: el mtime no se mueve y ni el freeze de
+    Quarto ni los backups lo ven como modificado. Devuelve True si el
+    archivo se reescribió.
+
+    Es EL único escritor de YAML del proyecto: qmd_updater, sync,
+    path_sync y tag_operations escriben siempre a través de esta función
+    (o de patch_record_yaml, que cae en ella).
+    """
+    return _write_frontmatter(
+        file_path, serialize_frontmatter(updated_yaml), body_offset
     )
 
-    # Limpiar saltos de línea extras en campos de texto largo
-    for field in ("abstract", "description"):
-        new_yaml_str = re.sub(
-            rf"{field}: '([^']+)'\s+",
-            lambda m, f=field: f"{f}: '{m.group(1).strip()}'\n",
-            new_yaml_str,
-        )
 
-    new_content = f"---\n{new_yaml_str}---{original_content[match_end:]}"
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(new_content)
+def _write_frontmatter(file_path: Path, yaml_text: str, body_offset: int) -> bool:
+    """
+    Escribe `yaml_text` entre --- y el cuerpo, salvo si ya es idéntico.
+    El encabezado usa los saltos de línea del archivo (CRLF si su primera
+    línea termina en \r\n), igual que el cuerpo que se copia tal cual.
+    """
+    header = f"---\n{yaml_text}---"
+    if _file_newline(file_path) == "\r\n":
+        header = header.replace("\n", "\r\n")
+    header = header.encode("utf-8")
+    if _header_unchanged(file_path, header, body_offset):
+        return False
+    _write_header_and_body(file_path, header, body_offset)
+    return True
+
+
+def _file_newline(file_path: Path) -> str:
+    """Salto de línea del archivo, según su primera línea (el --- de apertura)."""
+    with open(file_path, "rb") as f:
+        first = f.readline()
+    return "\r\n" if first.endswith(b"\r\n") else "\n"
+
+
+def _header_unchanged(file_path: Path, header: bytes, body_offset: int) -> bool:
+    """True si el archivo ya empieza exactamente por `header`."""
+    if len(header) != body_offset:
+        return False
+    with open(file_path, "rb") as f:
+        return f.read(body_offset) == header
+
+
+def _write_header_and_body(file_path: Path, header: bytes, body_offset: int):
+    """
+    Escribe `header` seguido del cuerpo original, copiado por bloques desde
+    `body_offset` sin cargarlo entero en memoria. Se escribe a un temporal
+    en la misma carpeta que luego reemplaza al original (mismos permisos,
+    dueño y grupo cuando el sistema lo permite).
+
+    Un enlace simbólico se resuelve antes: se reescribe el archivo real y
+    el enlace sigue siendo enlace. Un archivo con varios enlaces duros se
+    reescribe en el sitio para que todos vean el cambio; a cambio, esa
+    escritura no es atómica.
+    """
+    target = file_path.resolve()
+    stat = target.stat()
+    if stat.st_nlink > 1:
+        _write_in_place(target, header, body_offset)
+    else:
+        _replace_with_temp(target, stat, header, body_offset)
+    if _fsync_pending is not None:
+        _fsync_pending.append(target)
+        if len(_fsync_pending) >= _FSYNC_BATCH_SIZE:
+            _flush_fsync()
+
+
+def _replace_with_temp(target: Path, stat: os.stat_result,
+                       header: bytes, body_offset: int):
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f".{target.name}.", suffix=".tmp", dir=target.parent
+    )
+    try:
+        with os.fdopen(fd, "wb") as out, open(target, "rb") as src:
+            out.write(header)
+            src.seek(body_offset)
+            shutil.copyfileobj(src, out)
+        shutil.copymode(target, tmp_path)
+        _copy_owner(stat, tmp_path)
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _copy_owner(stat: os.stat_result, path: str):
+    """Dueño y grupo del original; sin privilegios se conserva lo que se pueda."""
+    if not hasattr(os, "chown"):
+        return
+    current = os.stat(path)
+    if (current.st_uid, current.st_gid) == (stat.st_uid, stat.st_gid):
+        return
+    try:
+        os.chown(path, stat.st_uid, stat.st_gid)
+    except PermissionError:
+        try:
+            os.chown(path, -1, stat.st_gid)
+        except PermissionError:
+            pass
+
+
+def _write_in_place(target: Path, header: bytes, body_offset: int):
+    with open(target, "r+b") as f:
+        f.seek(body_offset)
+        body = f.read()
+        f.seek(0)
+        f.write(header)
+        f.write(body)
+        f.truncate()
+
+
+def write_record_yaml(record, updated_yaml: dict) -> bool:
+    """
+    Reescribe el frontmatter de un ArticleRecord de collector. El YAML ya
+    viene parseado en el registro; del disco solo se copia el cuerpo.
+    Devuelve True si el archivo cambió (ver write_yaml_to_qmd).
+    """
+    return write_yaml_to_qmd(record.file_path, updated_yaml, record.body_offset)
+
+
+def patch_record_yaml(record, updated_yaml: dict, changed_keys) -> bool:
+    """
+    Como write_record_yaml, para comandos que solo cambian algunas claves
+    de primer nivel (`changed_keys`): reemplaza únicamente esas líneas del
+    frontmatter original y conserva el resto del texto tal cual. Si el
+    cambio es estructural (claves nuevas o eliminadas) o el parche no se
+    puede verificar, serializa todo el YAML como siempre (reordenado).
+    """
+    patched = patch_frontmatter(record.raw_yaml, updated_yaml, changed_keys)
+    if patched is None:
+        return write_record_yaml(record, reorder_yaml(updated_yaml))
+    return _write_frontmatter(record.file_path, patched + "\n", record.body_offset)
+
+
+# =============================================================================
+# FSYNC POR LOTES (--fsync)
+# =============================================================================
+
+_FSYNC_BATCH_SIZE = 64
+
+# Archivos reescritos pendientes de fsync; None = fsync desactivado
+_fsync_pending: Optional[List[Path]] = None
+
+
+@contextmanager
+def fsync_batches(enabled: bool = True):
+    """
+    Mientras está activo, los archivos reescritos se fuerzan a disco
+    (fsync del archivo y de su carpeta, por el rename) en lotes de
+    _FSYNC_BATCH_SIZE, y el último lote al salir. Sin esto el reemplazo
+    sigue siendo atómico, pero queda en la caché del sistema operativo.
+    """
+    global _fsync_pending
+    if not enabled:
+        yield
+        return
+    _fsync_pending = []
+    try:
+        yield
+    finally:
+        try:
+            _flush_fsync()
+        finally:
+            _fsync_pending = None
+
+
+def _flush_fsync():
+    files, _fsync_pending[:] = list(_fsync_pending), []
+    for path in files:
+        _fsync_path(path)
+    # Windows no deja abrir carpetas con os.open (ni hace falta: NTFS
+    # registra el rename en su journal); solo se sincronizan los archivos
+    if os.name == "nt":
+        return
+    for directory in dict.fromkeys(path.parent for path in files):
+        _fsync_path(directory)
+
+
+def _fsync_path(path: Path):
+    # En Windows fsync (_commit) necesita un descriptor con escritura
+    fd = os.open(path, os.O_RDWR if os.name == "nt" else os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
 
 
 # =============================================================================
@@ -82,18 +249,14 @@ def update_single_qmd(
     Devuelve True si se aplicaron (o simularían) cambios, False si ya
     estaba sincronizado.
     """
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-    except Exception as e:
-        print(f"❌ No se pudo leer {file_path}: {e}")
+    found = read_frontmatter(file_path)
+    if found is None:
         return False
+    raw, body_offset = found
 
-    match = re.match(r"^---\s*\n(.*?)\n---", content, re.DOTALL)
-    if not match:
+    yaml_data = parse_frontmatter(raw)
+    if yaml_data is None:
         return False
-
-    yaml_data = yaml.safe_load(match.group(1)) or {}
     changes = []
     updated_yaml = apply_row_to_yaml(yaml_data, row, changes)
 
@@ -119,7 +282,9 @@ def update_single_qmd(
     if dry_run:
         return True
 
-    write_yaml_to_qmd(file_path, updated_yaml, content, match.end())
+    if not write_yaml_to_qmd(file_path, updated_yaml, body_offset):
+        print("   ⏭️  El YAML serializado es idéntico: archivo sin tocar")
+        return False
     return True
 
 
@@ -141,7 +306,7 @@ def update_from_excel(
     print(f"\n📖 Leyendo Excel: {excel_path}\n")
 
     try:
-        df = pd.read_excel(excel_path, sheet_name="METADATOS")
+        df = read_metadata_sheet(excel_path)
     except Exception as e:
         print(f"❌ Error leyendo Excel: {e}")
         return
@@ -151,14 +316,18 @@ def update_from_excel(
         return
 
     original_count = len(df)
+    table = MetadataTable.from_frame(df)
 
     if blog_filter:
-        df = df[df["blog_nombre"] == blog_filter]
-        print(f"🔍 Filtro por blog '{blog_filter}': {len(df)}/{original_count} artículos")
+        rows = table.select(blog_filter)
+        print(f"🔍 Filtro por blog '{blog_filter}': {len(rows)}/{original_count} artículos")
 
     if path_filter:
-        df = df[df["ruta_archivo"].str.contains(path_filter, case=False, na=False)]
-        print(f"🔍 Filtro por ruta '{path_filter}': {len(df)}/{original_count} artículos")
+        rows = table.select(blog_filter, path_filter, regex=True)
+        print(f"🔍 Filtro por ruta '{path_filter}': {len(rows)}/{original_count} artículos")
+
+    if blog_filter or path_filter:
+        df = df.iloc[rows]
 
     if df.empty:
         print("⚠️  No hay artículos después de aplicar filtros")
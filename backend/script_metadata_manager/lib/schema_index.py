@@ -0,0 +1,205 @@
+"""
+lib/schema_index.py
+===================
+Índice persistente del esquema YAML de la colección
+(.schema_index.sqlite, junto a la caché de frontmatter).
+
+Sobre la tabla de artículos de article_index guarda, por artículo, cada
+clave aplanada de su YAML propio (flatten_yaml_types: 'author_1_name',
+'citation_pdf-url'…) con el tipo de su valor. Como el índice se pone al
+día de forma incremental (solo se releen los index.qmd cuyo stat cambió),
+detect-new-fields y add-columns --suggest son una consulta:
+
+  - por clave: artículos que la tienen (cobertura), tipos observados y
+    rutas de ejemplo
+  - por artículo: sus claves fuera de ALL_FIELDS
+
+Con --no-cache, collection_schema calcula lo mismo recorriendo y
+aplanando la colección como antes.
+
+Depende de: article_index, collector, yaml_parser.
+"""
+
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .article_index import ArticleIndex
+from .collector import article_yaml, collect_index_files
+from .yaml_parser import flatten_yaml_types
+
+
+INDEX_FILENAME = ".schema_index.sqlite"
+
+# Rutas de ejemplo que se guardan por clave
+_EXAMPLES = 3
+
+
+class FieldStats(NamedTuple):
+    """Lo observado de una clave aplanada en la colección."""
+    key: str
+    count: int                 # artículos que la tienen
+    types: Dict[str, int]      # tipo → artículos, de más a menos
+    examples: List[str]        # primeras rutas (orden alfabético)
+
+
+class CollectionSchema(NamedTuple):
+    total: int                              # artículos válidos
+    fields: Dict[str, FieldStats]
+    unknown_by_article: List[Tuple[str, List[str]]]   # (ruta, claves fuera de known)
+
+    def coverage(self, key: str) -> float:
+        stats = self.fields.get(key)
+        return stats.count / self.total if stats and self.total else 0.0
+
+    def ranked(self, keys: Iterable[str]) -> List[FieldStats]:
+        """FieldStats de esas claves, de mayor a menor cobertura."""
+        return sorted(
+            (self.fields[k] for k in set(keys) if k in self.fields),
+            key=lambda s: (-s.count, s.key),
+        )
+
+
+# =============================================================================
+# ÍNDICE
+# =============================================================================
+
+class SchemaIndex(ArticleIndex):
+    """Índice clave aplanada → artículos (con el tipo del valor) sobre SQLite."""
+
+    FILENAME = INDEX_FILENAME
+    LABEL = "Índice de esquema"
+    TABLES = ("article_keys",)
+    ARTICLE_TABLES = ("article_keys",)
+    DDL = (
+        "CREATE TABLE IF NOT EXISTS article_keys ("
+        " path TEXT, key TEXT, type TEXT);"
+        "CREATE INDEX IF NOT EXISTS article_keys_path ON article_keys (path);"
+        "CREATE INDEX IF NOT EXISTS article_keys_key ON article_keys (key);"
+    )
+
+    def _store_data(self, path: str, record):
+        self._conn.executemany(
+            "INSERT INTO article_keys VALUES (?, ?, ?)",
+            [
+                (path, str(key), type_name)
+                for key, type_name in flatten_yaml_types(record.yaml_index).items()
+            ],
+        )
+
+    # -------------------------------------------------------------------------
+    # Consultas
+    # -------------------------------------------------------------------------
+
+    def schema(self, base_path: Path, blogs: List[str],
+               known: Set[str]) -> CollectionSchema:
+        """Esquema de los artículos válidos de esos blogs (ver CollectionSchema)."""
+        scope = (
+            " FROM article_keys k JOIN articles a ON a.path = k.path"
+            f" WHERE a.base = ? AND a.blog IN ({','.join('?' * len(blogs))})"
+            " AND a.valid"
+        )
+        params = (str(Path(base_path).resolve()), *blogs)
+
+        (total,) = self._conn.execute(
+            "SELECT COUNT(*) FROM articles"
+            f" WHERE base = ? AND blog IN ({','.join('?' * len(blogs))}) AND valid",
+            params,
+        ).fetchone()
+
+        types: Dict[str, Counter] = defaultdict(Counter)
+        for key, type_name, count in self._conn.execute(
+            f"SELECT k.key, k.type, COUNT(*){scope} GROUP BY k.key, k.type", params
+        ):
+            types[key][type_name] = count
+
+        examples: Dict[str, List[str]] = defaultdict(list)
+        for key, ruta in self._conn.execute(
+            "SELECT key, ruta FROM ("
+            "SELECT k.key AS key, a.ruta AS ruta, ROW_NUMBER() OVER"
+            f" (PARTITION BY k.key ORDER BY a.ruta) AS n{scope})"
+            " WHERE n <= ? ORDER BY key, ruta", (*params, _EXAMPLES),
+        ):
+            examples[key].append(ruta)
+
+        unknown: Dict[str, List[str]] = {}
+        for ruta, key in self._conn.execute(
+            f"SELECT a.ruta, k.key{scope}"
+            " ORDER BY a.blog, a.mode, a.ctime_ns DESC, a.path", params,
+        ):
+            if key not in known:
+                unknown.setdefault(ruta, []).append(key)
+
+        return CollectionSchema(
+            total,
+            {key: _field_stats(key, counter, examples[key])
+             for key, counter in types.items()},
+            [(ruta, sorted(keys)) for ruta, keys in unknown.items()],
+        )
+
+
+def _field_stats(key: str, types: Counter, examples: List[str]) -> FieldStats:
+    return FieldStats(
+        key, sum(types.values()),
+        dict(sorted(types.items(), key=lambda item: (-item[1], item[0]))),
+        examples,
+    )
+
+
+# =============================================================================
+# ACCESO DESDE LOS COMANDOS
+# =============================================================================
+
+def collection_schema(
+    base_path: Path,
+    allowed_blogs: Set[str],
+    user_excluded_folders: Set[str],
+    known: Set[str],
+    blog_filter: Optional[str] = None,
+) -> CollectionSchema:
+    """
+    Esquema de la colección con el índice (una consulta tras ponerlo al
+    día) o, sin índice (--no-cache), recorriendo y aplanando cada
+    artículo. Los artículos van en el orden de collect_index_files.
+    """
+    opened = SchemaIndex.open(
+        base_path, allowed_blogs, user_excluded_folders, blog_filter
+    )
+    if opened is not None:
+        index, blogs = opened
+        try:
+            schema = index.schema(base_path, blogs, known)
+        finally:
+            index.close()
+        print(
+            f"🗂️  Índice de esquema: {schema.total} artículos "
+            f"({index.reindexed} reindexados)\n"
+        )
+        return schema
+
+    df_files = collect_index_files(
+        base_path, allowed_blogs, user_excluded_folders,
+        blog_name=blog_filter, verbose=False,
+    )
+    total = 0
+    types: Dict[str, Counter] = defaultdict(Counter)
+    rutas: Dict[str, List[str]] = defaultdict(list)
+    unknown = []
+    for _, row in df_files.iterrows():
+        total += 1
+        flat = flatten_yaml_types(article_yaml(row, base_path) or {})
+        ruta = row["ruta_archivo"]
+        for key, type_name in flat.items():
+            key = str(key)
+            types[key][type_name] += 1
+            rutas[key].append(ruta)
+        new = sorted(str(k) for k in flat if str(k) not in known)
+        if new:
+            unknown.append((ruta, new))
+
+    return CollectionSchema(
+        total,
+        {key: _field_stats(key, counter, sorted(rutas[key])[:_EXAMPLES])
+         for key, counter in types.items()},
+        unknown,
+    )
@@ -9,26 +9,121 @@ Comandos cubiertos:
   sync-batch        → sincroniza múltiples artículos de forma interactiva
 
 También contiene detect_new_fields para detectar campos YAML no
-declarados en ALL_FIELDS.
+declarados en ALL_FIELDS y suggest_columns (add-columns --suggest), ambos
+consultas al índice de esquema.
 
-Depende de: config, yaml_parser, field_mapper, qmd_updater, excel_writer.
+Depende de: collector, config, excel_store, metadata_table, yaml_parser,
+field_mapper, qmd_updater, excel_writer, schema_index.
 """
 
 from pathlib import Path
 from typing import Dict, List, Optional, Set
 
+import numpy as np
 import pandas as pd
 
+from .collector import get_default_jobs
 from .config import ALL_FIELDS
-from .field_mapper import extract_value, apply_row_to_yaml
-from .yaml_parser import extract_yaml_only_index, flatten_yaml_keys
+from .excel_store import read_metadata_sheet
+from .field_mapper import compile_getters
+from .metadata_table import MetadataTable
+from .yaml_parser import (
+    extract_yaml_only_index,
+    load_frontmatter_entries,
+)
 from .qmd_updater import update_single_qmd
+from .schema_index import collection_schema
 
 
 # =============================================================================
-# COMPARACIÓN DE UN ARTÍCULO
+# COMPARACIÓN (vectorizada por columnas)
 # =============================================================================
 
+# No se comparan los identificadores ni la fecha de alta en el Excel
+_SKIP_COMPARE = {"ruta_archivo", "blog_nombre", "fecha_creacion"}
+_COMPARE_FIELDS = [f for f in ALL_FIELDS if f not in _SKIP_COMPARE]
+
+
+def _index_value(value):
+    """Valor del index.qmd: los booleanos se comparan como TRUE/FALSE."""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    return value
+
+
+def _excel_value(value):
+    """Celda del Excel: vacía/NaN → None; 'true'/'false' → TRUE/FALSE."""
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    if isinstance(value, str):
+        if value.strip() == "":
+            return None
+        if value.upper() in ("TRUE", "FALSE"):
+            return value.upper()
+    return value
+
+
+def _as_text(value):
+    return None if value is None else str(value)
+
+
+# Aplicadas elemento a elemento sobre columnas enteras (arrays de objetos)
+_excel_values = np.frompyfunc(_excel_value, 1, 1)
+_texts = np.frompyfunc(_as_text, 1, 1)
+
+
+def _diff_articles(
+    rutas: List[str], yamls: List[Dict], excel: pd.DataFrame
+) -> List[Optional[Dict]]:
+    """
+    Compara en bloque N artículos contra N filas del Excel (mismo orden).
+
+    Arma una matriz artículos × campos con los valores del index.qmd y
+    otra con las columnas del Excel, normalizadas columna por columna, y
+    las compara como texto de una vez. Devuelve, por artículo, el dict de
+    compare_article si tiene alguna diferencia, o None si está sincronizado.
+    """
+    n = len(rutas)
+    getters = compile_getters(_COMPARE_FIELDS)
+    index_frame = pd.DataFrame(
+        [[_index_value(get(yaml_data)) for get in getters] for yaml_data in yamls],
+        columns=_COMPARE_FIELDS,
+        dtype=object,
+    )
+    idx_vals = index_frame.to_numpy(dtype=object)
+
+    exc_vals = np.empty((n, len(_COMPARE_FIELDS)), dtype=object)
+    # NaN != NaN levanta el flag "invalid" de numpy; aquí es justo la prueba
+    with np.errstate(invalid="ignore"):
+        for j, field in enumerate(_COMPARE_FIELDS):
+            if field in excel.columns:
+                exc_vals[:, j] = _excel_values(excel[field].to_numpy(dtype=object))
+
+    idx_text = _texts(idx_vals)
+    exc_text = _texts(exc_vals)
+    in_index = np.not_equal(idx_text, None)
+    in_excel = np.not_equal(exc_text, None)
+    differs = in_index & in_excel & np.not_equal(idx_text, exc_text)
+    only_index = in_index & ~in_excel
+    only_excel = in_excel & ~in_index
+
+    results: List[Optional[Dict]] = [None] * n
+    for i in np.flatnonzero((differs | only_index | only_excel).any(axis=1)):
+        results[i] = {
+            "ruta": rutas[i],
+            "differences": {
+                _COMPARE_FIELDS[j]: {
+                    "index_value": idx_vals[i, j],
+                    "excel_value": exc_vals[i, j],
+                }
+                for j in np.flatnonzero(differs[i])
+            },
+            "only_in_index": [_COMPARE_FIELDS[j] for j in np.flatnonzero(only_index[i])],
+            "only_in_excel": [_COMPARE_FIELDS[j] for j in np.flatnonzero(only_excel[i])],
+        }
+    return results
+
+
 def compare_article(file_path: Path, excel_row: pd.Series) -> Optional[Dict]:
     """
     Compara los metadatos de index.qmd contra los valores del Excel.
@@ -44,44 +139,15 @@ def compare_article(file_path: Path, excel_row: pd.Series) -> Optional[Dict]:
     if yaml_data is None:
         return None
 
-    differences = {}
-    only_in_index = []
-    only_in_excel = []
-
-    skip_fields = {"ruta_archivo", "blog_nombre", "fecha_creacion"}
-
-    for field in ALL_FIELDS:
-        if field in skip_fields:
-            continue
-
-        idx_val = extract_value(yaml_data, field)
-
-        exc_val = excel_row.get(field)
-        if pd.isna(exc_val) if isinstance(exc_val, float) else False:
-            exc_val = None
-        if isinstance(exc_val, str) and exc_val.strip() == "":
-            exc_val = None
-
-        # Normalizar booleanos para comparar
-        if isinstance(idx_val, bool):
-            idx_val = "TRUE" if idx_val else "FALSE"
-        if isinstance(exc_val, str) and exc_val.upper() in ("TRUE", "FALSE"):
-            exc_val = exc_val.upper()
-
-        if idx_val is not None and exc_val is not None:
-            if str(idx_val) != str(exc_val):
-                differences[field] = {"index_value": idx_val, "excel_value": exc_val}
-        elif idx_val is not None:
-            only_in_index.append(field)
-        elif exc_val is not None:
-            only_in_excel.append(field)
-
-    return {
-        "ruta": str(file_path),
-        "differences": differences,
-        "only_in_index": only_in_index,
-        "only_in_excel": only_in_excel,
-    }
+    comp = _diff_articles([str(file_path)], [yaml_data], excel_row.to_frame().T)[0]
+    if comp is None:
+        comp = {
+            "ruta": str(file_path),
+            "differences": {},
+            "only_in_index": [],
+            "only_in_excel": [],
+        }
+    return comp
 
 
 # =============================================================================
@@ -102,33 +168,43 @@ def find_differences(
     print("=" * 70)
 
     try:
-        df = pd.read_excel(excel_path, sheet_name="METADATOS")
+        df = read_metadata_sheet(excel_path)
     except Exception as e:
         print(f"❌ Error leyendo Excel: {e}")
         return []
 
+    if blog_filter or path_filter:
+        df = df.iloc[
+            MetadataTable.from_frame(df).select(blog_filter, path_filter, regex=True)
+        ]
     if blog_filter:
-        df = df[df["blog_nombre"] == blog_filter]
         print(f"🔍 Filtro: blog = '{blog_filter}'")
     if path_filter:
-        df = df[df["ruta_archivo"].str.contains(path_filter, case=False, na=False)]
         print(f"🔍 Filtro: ruta contiene '{path_filter}'")
 
     print(f"📊 Artículos a analizar: {len(df)}\n")
 
-    articles_with_diff = []
-    for _, row in df.iterrows():
-        ruta = row.get("ruta_archivo")
+    # Un solo pase (en paralelo con --jobs) para leer todos los index.qmd
+    rutas = df["ruta_archivo"].tolist() if "ruta_archivo" in df else [None] * len(df)
+    positions, items = [], []
+    for pos, ruta in enumerate(rutas):
         if pd.isna(ruta):
             continue
         file_path = base_path / ruta
-        if not file_path.exists():
-            continue
-        comp = compare_article(file_path, row)
-        if not comp:
+        try:
+            items.append((file_path, file_path.stat()))
+        except OSError:
             continue
-        if comp["differences"] or comp["only_in_index"] or comp["only_in_excel"]:
-            articles_with_diff.append(comp)
+        positions.append(pos)
+
+    entries = load_frontmatter_entries(items, jobs=get_default_jobs())
+    parsed = [k for k, entry in enumerate(entries) if entry is not None]
+    comps = _diff_articles(
+        [str(items[k][0]) for k in parsed],
+        [entries[k].data for k in parsed],
+        df.iloc[[positions[k] for k in parsed]],
+    )
+    articles_with_diff = [comp for comp in comps if comp is not None]
 
     print("=" * 70)
     print(f"\n📊 RESUMEN:")
@@ -175,18 +251,18 @@ def sync_single_interactive(
 ):
     """Sincroniza un solo artículo, preguntando la dirección al usuario."""
     try:
-        df = pd.read_excel(excel_path, sheet_name="METADATOS")
+        df = read_metadata_sheet(excel_path)
     except Exception as e:
         print(f"❌ Error leyendo Excel: {e}")
         return
 
     ruta_rel = str(file_path.relative_to(base_path))
-    matches = df[df["ruta_archivo"] == ruta_rel]
-    if matches.empty:
+    pos = MetadataTable.from_frame(df).row(ruta_rel)
+    if pos is None:
         print(f"❌ Artículo no encontrado en Excel: {ruta_rel}")
         return
 
-    row = matches.iloc[0]
+    row = df.iloc[pos]
     comp = compare_article(file_path, row)
     if not comp:
         print(f"⚠️  No se pudo analizar: {ruta_rel}")
@@ -248,7 +324,6 @@ def _sync_index_to_excel(
     Copia los valores del index.qmd a la fila correspondiente del Excel.
     """
     from openpyxl import load_workbook
-    from .config import ALL_FIELDS
 
     yaml_data = extract_yaml_only_index(file_path)
     if not yaml_data:
@@ -259,38 +334,111 @@ def _sync_index_to_excel(
     ws = wb["METADATOS"]
     ruta_rel = str(file_path.relative_to(base_path))
 
-    row_idx = None
-    for idx in range(2, ws.max_row + 1):
-        if ws.cell(idx, 1).value == ruta_rel:
-            row_idx = idx
-            break
-
+    row_idx = _excel_table(ws).row(ruta_rel)
     if not row_idx:
         print("❌ Artículo no encontrado en Excel")
         return
 
+    changes = _apply_index_to_row(ws, row_idx, yaml_data, dry_run)
+    if changes:
+        _print_row_changes(changes)
+        if not dry_run:
+            wb.save(excel_path)
+            print(f"\n✅ Excel actualizado")
+    else:
+        print("ℹ️  Sin cambios (ya estaba sincronizado)")
+
+
+def _sync_batch_to_excel(
+    file_paths: List[Path],
+    base_path: Path,
+    excel_path: str,
+    dry_run: bool,
+):
+    """
+    Versión por lotes de _sync_index_to_excel: abre el Excel una vez,
+    aplica todos los artículos en memoria y guarda una sola vez.
+    """
+    from openpyxl import load_workbook
+
+    try:
+        wb = load_workbook(excel_path)
+    except Exception as e:
+        print(f"❌ Error abriendo Excel: {e}")
+        return
+    ws = wb["METADATOS"]
+    table = _excel_table(ws)
+
+    updated = unchanged = failed = total_changes = 0
+    for fp in file_paths:
+        print(f"📄 {fp.name}")
+        yaml_data = extract_yaml_only_index(fp)
+        if not yaml_data:
+            print("❌ No se pudo extraer YAML\n")
+            failed += 1
+            continue
+        row_idx = table.row(str(fp.relative_to(base_path)))
+        if not row_idx:
+            print("❌ Artículo no encontrado en Excel\n")
+            failed += 1
+            continue
+
+        changes = _apply_index_to_row(ws, row_idx, yaml_data, dry_run)
+        if changes:
+            _print_row_changes(changes)
+            print()
+            updated += 1
+            total_changes += len(changes)
+        else:
+            print("ℹ️  Sin cambios (ya estaba sincronizado)\n")
+            unchanged += 1
+
+    print("=" * 70)
+    print(f"📊 RESUMEN:")
+    label = "Filas a actualizar:" if dry_run else "Filas actualizadas:"
+    print(f"   {label:<24}{updated} ({total_changes} campos)")
+    print(f"   {'Sin cambios:':<24}{unchanged}")
+    if failed:
+        print(f"   {'Con errores:':<24}{failed}")
+    print("=" * 70)
+
+    if updated and not dry_run:
+        wb.save(excel_path)
+        print(f"\n✅ Excel actualizado")
+
+
+def _excel_table(ws) -> MetadataTable:
+    """Índices de la hoja; las columnas son las posiciones de ALL_FIELDS."""
+    from .excel_writer import SheetValues
+
+    return MetadataTable.from_sheet(
+        SheetValues(ws=ws), ws.max_row,
+        ruta_col=ALL_FIELDS.index("ruta_archivo") + 1,
+        blog_col=ALL_FIELDS.index("blog_nombre") + 1,
+    )
+
+
+def _apply_index_to_row(ws, row_idx: int, yaml_data: Dict, dry_run: bool) -> List[str]:
+    """Copia los campos del YAML a la fila; devuelve los cambios como texto."""
     changes = []
-    for col_idx, field in enumerate(ALL_FIELDS, 1):
+    for col_idx, (field, get) in enumerate(zip(ALL_FIELDS, compile_getters(ALL_FIELDS)), 1):
         if field in ("ruta_archivo", "blog_nombre"):
             continue
-        new_val = extract_value(yaml_data, field)
+        new_val = get(yaml_data)
         old_val = ws.cell(row_idx, col_idx).value
         if new_val != old_val:
             if not dry_run:
                 ws.cell(row_idx, col_idx, new_val)
             changes.append(f"{field}: {old_val} → {new_val}")
+    return changes
 
-    if changes:
-        print(f"📝 Cambios: {len(changes)}\n")
-        for c in changes[:10]:
-            print(f"   • {c}")
-        if len(changes) > 10:
-            print(f"   ... y {len(changes) - 10} más")
-        if not dry_run:
-            wb.save(excel_path)
-            print(f"\n✅ Excel actualizado")
-    else:
-        print("ℹ️  Sin cambios (ya estaba sincronizado)")
+
+def _print_row_changes(changes: List[str]):
+    print(f"📝 Cambios: {len(changes)}\n")
+    for c in changes[:10]:
+        print(f"   • {c}")
+    if len(changes) > 10:
+        print(f"   ... y {len(changes) - 10} más")
 
 
 # =============================================================================
@@ -325,24 +473,26 @@ def sync_batch_interactive(
 
     if choice == "1":
         print(f"\n{'🔍 SIMULANDO' if dry_run else '✅ ACTUALIZANDO'} TODO → Excel\n")
-        for art in articles:
-            fp = Path(art["ruta"])
-            print(f"📄 {fp.name}")
-            _sync_index_to_excel(fp, base_path, excel_path, dry_run)
+        _sync_batch_to_excel(
+            [Path(art["ruta"]) for art in articles], base_path, excel_path, dry_run
+        )
 
     elif choice == "2":
         print(f"\n{'🔍 SIMULANDO' if dry_run else '✅ ACTUALIZANDO'} TODO → index.qmd\n")
         try:
-            df = pd.read_excel(excel_path, sheet_name="METADATOS")
+            df = read_metadata_sheet(excel_path)
         except Exception as e:
             print(f"❌ Error leyendo Excel: {e}")
             return
+        table = MetadataTable.from_frame(df)
         for art in articles:
             fp = Path(art["ruta"])
-            ruta_rel = str(fp.relative_to(base_path))
-            row = df[df["ruta_archivo"] == ruta_rel].iloc[0]
+            pos = table.row(str(fp.relative_to(base_path)))
             print(f"📄 {fp.name}")
-            update_single_qmd(fp, row, dry_run, 1, 1)
+            if pos is None:
+                print("❌ Artículo no encontrado en Excel")
+                continue
+            update_single_qmd(fp, df.iloc[pos], dry_run, 1, 1)
 
     elif choice == "3":
         for i, art in enumerate(articles, 1):
@@ -372,33 +522,25 @@ def detect_new_fields(
 ) -> dict:
     """
     Detecta campos YAML en index.qmd que NO están en ALL_FIELDS.
-    Útil para mantener la plantilla Excel actualizada.
+    Útil para mantener la plantilla Excel actualizada. Con la caché
+    activa es una consulta al índice de esquema (schema_index).
     """
-    from .collector import collect_index_files
-
     print("\n🔍 DETECCIÓN DE NUEVOS METADATOS\n")
     print("=" * 70)
 
-    df_files = collect_index_files(
-        base_path, allowed_blogs, user_excluded_folders, verbose=False
+    schema = collection_schema(
+        base_path, allowed_blogs, user_excluded_folders, set(ALL_FIELDS)
     )
 
     new_fields_by_file = {}
     all_new: Set[str] = set()
 
-    for _, row in df_files.iterrows():
-        fp = base_path / row["ruta_archivo"]
-        yaml_data = extract_yaml_only_index(fp)
-        if not yaml_data:
-            continue
-        flat = flatten_yaml_keys(yaml_data)
-        new = flat - set(ALL_FIELDS)
-        if new:
-            new_fields_by_file[row["ruta_archivo"]] = new
-            all_new.update(new)
-            if verbose:
-                print(f"\n📄 {row['ruta_archivo']}")
-                print(f"   Nuevos campos: {', '.join(sorted(new))}")
+    for ruta, new in schema.unknown_by_article:
+        new_fields_by_file[ruta] = set(new)
+        all_new.update(new)
+        if verbose:
+            print(f"\n📄 {ruta}")
+            print(f"   Nuevos campos: {', '.join(new)}")
 
     print("\n" + "=" * 70)
     print(f"📊 RESUMEN:")
@@ -406,11 +548,64 @@ def detect_new_fields(
     print(f"   Total campos nuevos únicos:    {len(all_new)}")
 
     if all_new:
-        print(f"\n💡 Campos nuevos detectados:")
-        for f in sorted(all_new):
-            print(f"   • {f}")
+        print(f"\n💡 Campos nuevos detectados (por cobertura):")
+        _print_field_stats(schema, schema.ranked(all_new))
         print(f"\n💡 Para agregar al Excel:")
         print(f"   python main.py add-columns ~/Documents excel.xlsx {' '.join(sorted(all_new))}")
 
     print("=" * 70 + "\n")
     return new_fields_by_file
+
+
+def suggest_columns(
+    base_path: Path,
+    allowed_blogs: set,
+    user_excluded_folders: set,
+    excel_path: str,
+    limit: Optional[int] = None,
+) -> List[str]:
+    """
+    Campos del YAML que aún no son columna del Excel, de mayor a menor
+    cobertura (artículos que los tienen). Solo informa: no modifica el
+    Excel. Devuelve los nombres sugeridos.
+    """
+    print("\n💡 COLUMNAS SUGERIDAS PARA EL EXCEL\n")
+    print("=" * 70)
+
+    try:
+        columns = {str(c) for c in read_metadata_sheet(excel_path).columns}
+    except Exception as e:
+        print(f"❌ Error leyendo Excel: {e}")
+        return []
+
+    schema = collection_schema(
+        base_path, allowed_blogs, user_excluded_folders, columns
+    )
+    # Las claves aplanadas conservan los guiones del YAML (citation_pdf-url,
+    # numbered-lines) y las columnas llevan guion bajo (citation_pdf_url)
+    covered = {c.replace("-", "_") for c in columns}
+    ranked = schema.ranked(
+        key for key in schema.fields if key.replace("-", "_") not in covered
+    )[:limit]
+    if not ranked:
+        print("✅ Todas las claves del YAML ya tienen columna en el Excel")
+        print("=" * 70 + "\n")
+        return []
+
+    _print_field_stats(schema, ranked)
+    names = [stats.key for stats in ranked]
+    print(f"\n💡 Para agregarlas:")
+    print(f"   python main.py add-columns {base_path} {excel_path} {' '.join(names)}")
+    print("=" * 70 + "\n")
+    return names
+
+
+def _print_field_stats(schema, ranked):
+    for stats in ranked:
+        types = ", ".join(stats.types)
+        print(
+            f"   • {stats.key:<34} {stats.count:>5} artículos "
+            f"({schema.coverage(stats.key):6.1%})  {types}"
+        )
+        if stats.examples:
+            print(f"       ej. {stats.examples[0]}")
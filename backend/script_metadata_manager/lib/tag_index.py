@@ -0,0 +1,157 @@
+"""
+lib/tag_index.py
+================
+Índice invertido persistente de tags (forma normalizada → artículos que
+la usan), guardado en un SQLite junto a la caché de frontmatter
+(.tag_index.sqlite).
+
+Sobre la tabla de artículos de article_index guarda, por artículo, sus
+tags tal como están escritos (formas crudas, en orden), cada uno con el
+id de su forma normalizada. Como el índice se pone al día de forma
+incremental (solo se releen los index.qmd cuyo stat cambió):
+  - tag-stats / audit-tags arman su DataFrame sin parsear la colección
+  - remove-tags X / replace-tags X:Y abren solo los artículos que
+    contienen X (más los que aún tienen tags sin normalizar, porque toda
+    operación de tags también normaliza)
+
+Depende de: article_index, tag_utils.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+from .article_index import ArticleIndex
+from .tag_utils import normalize_tag, normalize_tag_list, tags_from_yaml_value
+
+
+INDEX_FILENAME = ".tag_index.sqlite"
+
+
+class IndexedArticle(NamedTuple):
+    """Un artículo según el índice: lo que necesitan reportes y operaciones."""
+    ruta_archivo: str
+    blog_nombre: str
+    tipo_documento: str
+    ctime_ns: int
+    tags: List[str]          # formas crudas, en el orden del archivo
+    normalized: bool         # tags == normalize_tag_list(tags)
+
+
+# =============================================================================
+# ÍNDICE
+# =============================================================================
+
+class TagIndex(ArticleIndex):
+    """Índice tag normalizado → artículos sobre SQLite."""
+
+    FILENAME = INDEX_FILENAME
+    LABEL = "Índice de tags"
+    SCHEMA_VERSION = 2
+    TABLES = ("article_tags", "tag_names")
+    ARTICLE_TABLES = ("article_tags",)
+    DDL = (
+        "CREATE TABLE IF NOT EXISTS tag_names ("
+        " id INTEGER PRIMARY KEY, name TEXT UNIQUE);"
+        "CREATE TABLE IF NOT EXISTS article_tags ("
+        " path TEXT, position INTEGER, raw TEXT, tag_id INTEGER);"
+        "CREATE INDEX IF NOT EXISTS article_tags_path ON article_tags (path);"
+        "CREATE INDEX IF NOT EXISTS article_tags_tag ON article_tags (tag_id);"
+    )
+
+    def __init__(self, db_path: Path):
+        super().__init__(db_path)
+        self._tag_ids: Dict[str, int] = dict(
+            self._conn.execute("SELECT name, id FROM tag_names")
+        )
+
+    def _tag_id(self, name: str) -> int:
+        tag_id = self._tag_ids.get(name)
+        if tag_id is None:
+            tag_id = self._conn.execute(
+                "INSERT INTO tag_names (name) VALUES (?)", (name,)
+            ).lastrowid
+            self._tag_ids[name] = tag_id
+        return tag_id
+
+    def _store_data(self, path: str, record):
+        tags = tags_from_yaml_value(record.yaml_index.get("tags")) or []
+        self._conn.executemany(
+            "INSERT INTO article_tags VALUES (?, ?, ?, ?)",
+            [
+                (path, pos, tag, self._tag_id(normalize_tag(tag)))
+                for pos, tag in enumerate(tags)
+            ],
+        )
+
+    # -------------------------------------------------------------------------
+    # Consultas
+    # -------------------------------------------------------------------------
+
+    def articles(self, base_path: Path, blogs: List[str]) -> List[IndexedArticle]:
+        """
+        Artículos válidos de esos blogs, en el orden de collect_index_files
+        (blog, tipo de documento, fecha de creación descendente).
+        """
+        base = str(Path(base_path).resolve())
+        marks = ",".join("?" * len(blogs))
+        tags: Dict[str, List[str]] = {}
+        for path, raw in self._conn.execute(
+            "SELECT t.path, t.raw FROM article_tags t"
+            " JOIN articles a ON a.path = t.path"
+            f" WHERE a.base = ? AND a.blog IN ({marks})"
+            " ORDER BY t.path, t.position", (base, *blogs),
+        ):
+            tags.setdefault(path, []).append(raw)
+
+        articles = []
+        for path, ruta, blog, mode, ctime_ns in self._conn.execute(
+            "SELECT path, ruta, blog, mode, ctime_ns"
+            f" FROM articles WHERE base = ? AND blog IN ({marks}) AND valid"
+            " ORDER BY blog, mode, ctime_ns DESC", (base, *blogs),
+        ):
+            raw = tags.get(path, [])
+            articles.append(IndexedArticle(
+                ruta, blog, mode, ctime_ns, raw, normalize_tag_list(raw) == raw
+            ))
+        return articles
+
+    def rutas_with_tags(self, base_path: Path, names: Iterable[str]) -> Set[str]:
+        """ruta_archivo de los artículos que usan alguna de esas formas normalizadas."""
+        ids = [self._tag_ids[n] for n in set(names) if n in self._tag_ids]
+        if not ids:
+            return set()
+        return {
+            ruta for (ruta,) in self._conn.execute(
+                "SELECT DISTINCT a.ruta FROM article_tags t"
+                " JOIN articles a ON a.path = t.path"
+                f" WHERE a.base = ? AND t.tag_id IN ({','.join('?' * len(ids))})",
+                (str(Path(base_path).resolve()), *ids),
+            )
+        }
+
+
+# =============================================================================
+# ACCESO DESDE LOS COMANDOS
+# =============================================================================
+
+def open_tag_index(
+    base_path: Path,
+    allowed_blogs: Set[str],
+    user_excluded_folders: Set[str],
+    blog_filter: Optional[str] = None,
+):
+    """
+    Abre el índice de tags al día (ver ArticleIndex.open) y devuelve
+    (índice, artículos), o None si no hay índice: en ese caso el llamador
+    recorre la colección como siempre. El llamador cierra el índice.
+    """
+    opened = TagIndex.open(base_path, allowed_blogs, user_excluded_folders, blog_filter)
+    if opened is None:
+        return None
+    index, blogs = opened
+    articles = index.articles(base_path, blogs)
+    print(
+        f"🗂️  Índice de tags: {len(articles)} artículos "
+        f"({index.reindexed} reindexados)\n"
+    )
+    return index, articles
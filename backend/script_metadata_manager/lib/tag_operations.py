@@ -3,77 +3,112 @@ lib/tag_operations.py
 =====================
 Operaciones masivas de tags sobre dos destinos:
 
-  - Archivos .qmd  → localiza artículos con collector (mismas exclusiones
-    que el resto del sistema), transforma la lista con tag_utils y escribe
-    con write_yaml_to_qmd (el único escritor YAML del proyecto).
+  - Archivos .qmd  → localiza artículos con el índice de tags (tag_index:
+    solo abre los que la operación puede cambiar) o, sin índice, con
+    collector (mismas exclusiones que el resto del sistema), transforma la
+    lista con tag_utils y reescribe solo la clave tags con
+    patch_record_yaml (que cae en write_yaml_to_qmd, el único escritor
+    YAML del proyecto, si hace falta).
 
   - Excel          → transforma solo la columna 'tags' de la hoja METADATOS;
     los archivos no se tocan hasta que el usuario ejecute 'update'.
 
+Un plan (apply-tag-plan, TagPlan) encadena varias de esas operaciones y
+las aplica en una sola pasada por destino.
+
 Regla heredada del antiguo Tag Manager: los artículos SIN campo tags se
 omiten siempre (nunca se crean tags donde no existían).
 
-Depende de: config, yaml_parser, field_mapper, qmd_updater, collector, tag_utils.
+Depende de: metadata_table, qmd_updater, collector, tag_index, excel_writer,
+tag_utils, yaml_codec.
 """
 
 import re
 from pathlib import Path
-from typing import Dict, List, Optional, Set
-
-import yaml
+from typing import Dict, List, Optional, Set, Tuple, Union
 
-from .collector import collect_index_files
+from .collector import ArticleRecord, collect_index_files, load_article_record
 from .excel_writer import open_metadata_sheets
-from .field_mapper import reorder_yaml
-from .qmd_updater import write_yaml_to_qmd
+from .metadata_table import MetadataTable
+from .qmd_updater import patch_record_yaml
+from .tag_index import open_tag_index
 from .tag_utils import (
+    TagPlan,
+    TagTransform,
     tags_from_cell,
     tags_from_yaml_value,
     tags_to_cell,
-    transform_tags,
 )
+from .yaml_codec import dump_yaml, load_yaml
 
 
 # =============================================================================
-# OPERACIONES SOBRE ARCHIVOS .QMD
+# PLANES DE OPERACIONES (apply-tag-plan)
 # =============================================================================
 
-def _apply_to_single_qmd(
-    file_path: Path,
-    replacements: Optional[Dict[str, str]],
-    to_remove: Optional[List[str]],
-    to_add: Optional[List[str]],
-    dry_run: bool,
-) -> Optional[bool]:
+def load_tag_plan(plan_path: str) -> TagPlan:
     """
-    Aplica la operación de tags a un archivo.
-    Devuelve True si hubo (o se simularían) cambios, False si estaba al
-    día, None si el archivo se omitió (sin frontmatter o sin tags).
+    Lee un plan.yml (ver TagPlan.from_data). Lanza ValueError si no se
+    puede leer o no es un plan válido, para que el CLI lo reporte.
     """
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
+        with open(Path(plan_path).expanduser(), "r", encoding="utf-8") as f:
+            data = load_yaml(f)
     except Exception as e:
-        print(f"❌ No se pudo leer {file_path}: {e}")
-        return None
+        raise ValueError(f"No se pudo leer el plan {plan_path}: {e}")
+    return TagPlan.from_data(data)
 
-    match = re.match(r"^---\s*\n(.*?)\n---", content, re.DOTALL)
-    if not match:
-        return None
 
-    try:
-        yaml_data = yaml.safe_load(match.group(1)) or {}
-    except yaml.YAMLError as e:
-        print(f"⚠️  YAML inválido en {file_path}: {e}")
-        return None
+def save_tag_plan(plan_path: str, replacements: List[Tuple[str, str]]):
+    """
+    Escribe un plan.yml con las consolidaciones de audit-tags: normalizar
+    y luego los reemplazos {viejo: nuevo}, para revisar y aplicar con
+    apply-tag-plan.
+    """
+    operations: List[dict] = [{"normalize": True}]
+    if replacements:
+        operations.append({"replace": dict(replacements)})
+    with open(Path(plan_path).expanduser(), "w", encoding="utf-8") as f:
+        f.write(
+            "# Plan de tags generado por audit-tags. Revisar (quitar o agregar\n"
+            "# operaciones: normalize, replace, remove, add) y aplicar con:\n"
+            "#   python main.py apply-tag-plan <destino> <plan.yml> --dry-run\n"
+        )
+        dump_yaml(
+            {"operations": operations}, f,
+            allow_unicode=True, default_flow_style=False, sort_keys=False,
+        )
+    print(f"📝 Plan guardado: {plan_path}")
+
+
+def _print_plan(plan: TagPlan):
+    print(f"📋 Plan de {len(plan.operations)} operaciones (una sola pasada):")
+    for n, line in enumerate(plan.describe(), 1):
+        print(f"   {n}. {line}")
+    print("=" * 70)
+
+
+# =============================================================================
+# OPERACIONES SOBRE ARCHIVOS .QMD
+# =============================================================================
+
+def _apply_to_single_qmd(
+    record, transform: Union[TagTransform, TagPlan], dry_run: bool
+) -> Optional[bool]:
+    """
+    Aplica la operación de tags a un artículo (ArticleRecord de collector,
+    con el YAML ya parseado).
+    Devuelve True si hubo (o se simularían) cambios, False si estaba al
+    día, None si el archivo se omitió (sin tags).
+    """
+    file_path = record.file_path
+    yaml_data = record.yaml_index
 
     current_tags = tags_from_yaml_value(yaml_data.get("tags"))
     if current_tags is None or not current_tags:
         return None
 
-    new_tags, changes = transform_tags(
-        current_tags, replacements, to_remove, to_add
-    )
+    new_tags, changes = transform.apply(current_tags)
 
     if new_tags == current_tags:
         return False
@@ -95,9 +130,69 @@ def _apply_to_single_qmd(
         # se elimina el campo, igual que hace update con celdas vacías
         del yaml_data["tags"]
 
-    yaml_data = reorder_yaml(yaml_data)
-    write_yaml_to_qmd(file_path, yaml_data, content, match.end())
-    return True
+    return patch_record_yaml(record, yaml_data, ("tags",))
+
+
+def _select_articles(
+    base_path: Path,
+    allowed_blogs: Set[str],
+    user_excluded_folders: Set[str],
+    transform: Union[TagTransform, TagPlan],
+    blog_filter: Optional[str],
+    path_filter: Optional[str],
+) -> Optional[Tuple[List[Tuple[str, Optional[ArticleRecord]]], int, int]]:
+    """
+    Artículos que hay que abrir para aplicar `transform`:
+    ([(ruta_archivo, ArticleRecord o None si hay que cargarlo)],
+    sin_cambios, omitidos), o None si no hay artículos.
+
+    Con el índice de tags solo se abren los que usan algún tag que la
+    operación reemplaza o elimina, o que todavía no están normalizados;
+    el resto ya se sabe sin cambios (o sin tags) sin leerlo. Sin índice
+    se recorre y se abre toda la colección.
+    """
+    opened = open_tag_index(base_path, allowed_blogs, user_excluded_folders, blog_filter)
+    if opened is None:
+        df_files = collect_index_files(
+            base_path, allowed_blogs, user_excluded_folders,
+            blog_name=blog_filter, verbose=False,
+        )
+        if df_files.empty:
+            return None
+        if path_filter:
+            df_files = df_files[
+                df_files["ruta_archivo"].str.contains(path_filter, case=False, na=False)
+            ]
+            print(f"🔍 Filtro por ruta '{path_filter}': {len(df_files)} artículos")
+        return [
+            (row["ruta_archivo"], row.get("articulo"))
+            for _, row in df_files.iterrows()
+        ], 0, 0
+
+    index, articles = opened
+    targets = transform.targets()
+    try:
+        with_targets = index.rutas_with_tags(base_path, targets) if targets else set()
+    finally:
+        index.close()
+    if not articles:
+        return None
+    if path_filter:
+        pattern = re.compile(path_filter, re.IGNORECASE)
+        articles = [a for a in articles if pattern.search(a.ruta_archivo)]
+        print(f"🔍 Filtro por ruta '{path_filter}': {len(articles)} artículos")
+
+    to_open: List[Tuple[str, Optional[ArticleRecord]]] = []
+    unchanged = skipped = 0
+    for article in articles:
+        if not article.tags:
+            skipped += 1
+        elif (targets is None or not article.normalized
+              or article.ruta_archivo in with_targets):
+            to_open.append((article.ruta_archivo, None))
+        else:
+            unchanged += 1
+    return to_open, unchanged, skipped
 
 
 def apply_tag_ops_to_files(
@@ -110,40 +205,39 @@ def apply_tag_ops_to_files(
     blog_filter: Optional[str] = None,
     path_filter: Optional[str] = None,
     dry_run: bool = False,
+    plan: Optional[TagPlan] = None,
 ):
     """
     Aplica una operación de tags a todos los artículos de la colección.
     Sin replacements/to_remove/to_add equivale a normalizar (la
     normalización + dedup es parte de todo pipeline de transform_tags).
+    La operación se prepara una vez (TagTransform) para toda la colección.
+    Con `plan` se aplican todas sus operaciones en una sola pasada: cada
+    archivo se escribe como mucho una vez.
     """
     print(f"\n{'🔍 SIMULACIÓN' if dry_run else '🏷️  OPERACIÓN DE TAGS'} SOBRE ARCHIVOS\n")
     print("=" * 70)
 
-    df_files = collect_index_files(
-        base_path, allowed_blogs, user_excluded_folders,
-        blog_name=blog_filter, verbose=False,
+    if plan is not None:
+        _print_plan(plan)
+    transform = plan if plan is not None else TagTransform(replacements, to_remove, to_add)
+    selected = _select_articles(
+        base_path, allowed_blogs, user_excluded_folders, transform,
+        blog_filter, path_filter,
     )
-
-    if df_files.empty:
+    if selected is None:
         print("⚠️  No se encontraron artículos")
         return
+    to_open, total_unchanged, total_skipped = selected
+    total_changed = 0
 
-    if path_filter:
-        df_files = df_files[
-            df_files["ruta_archivo"].str.contains(path_filter, case=False, na=False)
-        ]
-        print(f"🔍 Filtro por ruta '{path_filter}': {len(df_files)} artículos")
-
-    total_changed = total_unchanged = total_skipped = 0
-
-    for _, row in df_files.iterrows():
-        file_path = base_path / row["ruta_archivo"]
-        if not file_path.exists():
+    for ruta, record in to_open:
+        if record is None:
+            record = load_article_record(base_path / ruta, base_path)
+        if record is None:
             total_skipped += 1
             continue
-        result = _apply_to_single_qmd(
-            file_path, replacements, to_remove, to_add, dry_run
-        )
+        result = _apply_to_single_qmd(record, transform, dry_run)
         if result is None:
             total_skipped += 1
         elif result:
@@ -174,14 +268,18 @@ def apply_tag_ops_to_excel(
     blog_filter: Optional[str] = None,
     path_filter: Optional[str] = None,
     dry_run: bool = False,
+    plan: Optional[TagPlan] = None,
 ):
     """
     Aplica una operación de tags SOLO a la columna 'tags' de la hoja
     METADATOS. Los archivos .qmd no se modifican: eso queda para el
     comando 'update', manteniendo el Excel como fuente de verdad.
+    Con `plan`, todas sus operaciones en una sola pasada.
     """
     print(f"\n{'🔍 SIMULACIÓN' if dry_run else '🏷️  OPERACIÓN DE TAGS'} SOBRE EXCEL\n")
     print("=" * 70)
+    if plan is not None:
+        _print_plan(plan)
 
     try:
         wb, ws, ws_values = open_metadata_sheets(excel_path)
@@ -198,28 +296,24 @@ def apply_tag_ops_to_excel(
             return
 
     tags_col = headers["tags"]
-    ruta_col = headers["ruta_archivo"]
-    blog_col = headers["blog_nombre"]
+    table = MetadataTable.from_sheet(
+        ws_values, ws.max_row, headers["ruta_archivo"], headers["blog_nombre"]
+    )
 
+    transform = plan if plan is not None else TagTransform(replacements, to_remove, to_add)
     total_changed = total_unchanged = total_empty = 0
 
-    for row_idx in range(2, ws.max_row + 1):
-        ruta = ws_values.cell(row_idx, ruta_col).value
+    for row_idx in table.select(blog_filter, path_filter):
+        ruta = table.ruta(row_idx)
         if not ruta:
             continue
-        if blog_filter and ws_values.cell(row_idx, blog_col).value != blog_filter:
-            continue
-        if path_filter and path_filter.lower() not in str(ruta).lower():
-            continue
 
-        current_tags = tags_from_cell(ws_values.cell(row_idx, tags_col).value)
+        current_tags = tags_from_cell(ws_values.value(row_idx, tags_col))
         if not current_tags:
             total_empty += 1
             continue
 
-        new_tags, changes = transform_tags(
-            current_tags, replacements, to_remove, to_add
-        )
+        new_tags, changes = transform.apply(current_tags)
 
         if new_tags == current_tags:
             total_unchanged += 1
@@ -234,7 +328,8 @@ def apply_tag_ops_to_excel(
             print(f"   • {change}")
 
         if not dry_run:
-            ws.cell(row_idx, tags_col, tags_to_cell(new_tags))
+            # .value y no ws.cell(fila, col, valor): con None no vaciaría la celda
+            ws.cell(row_idx, tags_col).value = tags_to_cell(new_tags)
 
     print(f"\n{'=' * 70}")
     print(f"{'🔍 RESUMEN DE SIMULACIÓN' if dry_run else '✅ RESUMEN'}")
@@ -4,32 +4,39 @@ lib/tag_reports.py
 Estadísticas y auditoría de la taxonomía de tags.
 
 Comandos cubiertos:
-  tag-stats   → frecuencias, top N, huérfanos, distribución por blog/año
+  tag-stats   → frecuencias, top N, huérfanos, coocurrencias, distribución
+                por blog/año (texto, JSON o CSV), calculadas sobre una tabla
+                larga artículo × tag con groupby/crosstab
   audit-tags  → variantes, typos probables, singular/plural, problemas de
                 formato, con comandos replace-tags listos para ejecutar
 
 Ambos aceptan como fuente los archivos .qmd (vía collector, la verdad en
 disco) o un Excel (columna tags de METADATOS).
 
-Depende de: collector, yaml_parser, tag_utils.
+Depende de: collector, excel_store, tag_index, yaml_parser, tag_utils.
 """
 
+import json
 import re
+import sys
 from collections import Counter, defaultdict
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Tuple
 
+import numpy as np
 import pandas as pd
 
-from .collector import collect_index_files
+from .collector import article_yaml, collect_index_files
+from .excel_store import read_metadata_sheet
+from .tag_index import open_tag_index
 from .tag_utils import (
-    find_similar_pairs,
+    TagPairScores,
+    TagVocabulary,
+    cluster_tags,
     is_plural_pair,
-    normalize_tag,
     tags_from_cell,
     tags_from_yaml_value,
 )
-from .yaml_parser import extract_yaml_only_index
 
 
 # =============================================================================
@@ -45,7 +52,21 @@ def collect_tag_data_from_files(
     """
     Recorre la colección y devuelve un DataFrame con una fila por artículo:
     ruta_archivo, blog_nombre, tags (lista, posiblemente vacía).
+    Con el índice de tags no se relee ningún archivo que no haya cambiado.
     """
+    opened = open_tag_index(base_path, allowed_blogs, user_excluded_folders, blog_filter)
+    if opened is not None:
+        index, articles = opened
+        index.close()
+        return pd.DataFrame([
+            {
+                "ruta_archivo": a.ruta_archivo,
+                "blog_nombre":  a.blog_nombre,
+                "tags":         a.tags,
+            }
+            for a in articles
+        ])
+
     df_files = collect_index_files(
         base_path, allowed_blogs, user_excluded_folders,
         blog_name=blog_filter, verbose=False,
@@ -53,8 +74,7 @@ def collect_tag_data_from_files(
 
     rows = []
     for _, row in df_files.iterrows():
-        file_path = base_path / row["ruta_archivo"]
-        yaml_data = extract_yaml_only_index(file_path) or {}
+        yaml_data = article_yaml(row, base_path) or {}
         tags = tags_from_yaml_value(yaml_data.get("tags")) or []
         rows.append({
             "ruta_archivo": row["ruta_archivo"],
@@ -68,7 +88,7 @@ def collect_tag_data_from_excel(
     excel_path: str, blog_filter: Optional[str] = None
 ) -> pd.DataFrame:
     """Lee METADATOS y devuelve el mismo formato que la versión de archivos."""
-    df = pd.read_excel(excel_path, sheet_name="METADATOS")
+    df = read_metadata_sheet(excel_path)
     if blog_filter:
         df = df[df["blog_nombre"] == blog_filter]
 
@@ -86,16 +106,160 @@ def collect_tag_data_from_excel(
     return pd.DataFrame(rows)
 
 
-def _year_from_path(ruta: str) -> Optional[str]:
-    """Extrae el año de la carpeta con fecha (…/YYYY-MM-DD-titulo/index.qmd)."""
-    match = re.search(r"(\d{4})-\d{2}-\d{2}", str(ruta))
-    return match.group(1) if match else None
-
-
 # =============================================================================
 # ESTADÍSTICAS (tag-stats)
 # =============================================================================
 
+STATS_FORMATS = ("text", "json", "csv")
+
+
+def tag_long_table(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Formato largo de la colección: una fila por (artículo, tag) con las
+    columnas articulo (posición en df), blog_nombre, anio y tag. Los
+    artículos sin tags no aportan filas.
+    """
+    articles = df.reset_index(drop=True)
+    long = pd.DataFrame({
+        "articulo":    articles.index,
+        "blog_nombre": articles["blog_nombre"],
+        "anio":        _years(articles),
+        "tag":         articles["tags"],
+    }).explode("tag")
+    return long.dropna(subset=["tag"]).reset_index(drop=True)
+
+
+def _years(df: pd.DataFrame) -> pd.Series:
+    """Año de la carpeta con fecha (…/YYYY-MM-DD-titulo/index.qmd) o NaN."""
+    return df["ruta_archivo"].astype(str).str.extract(
+        r"(\d{4})-\d{2}-\d{2}", expand=False
+    )
+
+
+def compute_tag_stats(df: pd.DataFrame) -> Dict:
+    """
+    Todas las estadísticas de tag-stats desde la tabla larga, con
+    groupby (sin recorrer artículos en Python):
+      generales     → totales y promedio de tags por artículo
+      frecuencias   → Series tag → usos, de más a menos usado (a igual
+                      cantidad, en orden de aparición)
+      huerfanos     → tags usados una sola vez, ordenados
+      por_blog      → DataFrame blog → articulos, tags_unicos
+      por_anio      → Series año → artículos
+      coocurrencias → DataFrame tag_a, tag_b, articulos (pares que
+                      aparecen juntos en un artículo), de más a menos
+      por_blog_tag  → tabla tag × blog (usos) con columna total
+    """
+    if df.empty:
+        df = pd.DataFrame(columns=["ruta_archivo", "blog_nombre", "tags"])
+    long = tag_long_table(df)
+    with_tags = int(df["tags"].apply(bool).sum())
+
+    frequencies = (
+        long.groupby("tag", sort=False).size()
+        .sort_values(ascending=False, kind="stable")
+    )
+
+    by_blog = pd.DataFrame({
+        "articulos": df.groupby("blog_nombre").size(),
+        "tags_unicos": long.groupby("blog_nombre")["tag"].nunique(),
+    }).fillna(0).astype(int)
+
+    by_year = _years(df).dropna().value_counts().sort_index()
+
+    by_blog_tag = long.groupby(["tag", "blog_nombre"]).size().unstack(fill_value=0)
+    by_blog_tag.insert(0, "total", by_blog_tag.sum(axis=1))
+    by_blog_tag = by_blog_tag.sort_values("total", ascending=False, kind="stable")
+
+    return {
+        "generales": {
+            "total_articulos": len(df),
+            "con_tags": with_tags,
+            "sin_tags": len(df) - with_tags,
+            "total_tags": len(long),
+            "tags_unicos": len(frequencies),
+            "promedio_por_articulo": (
+                round(len(long) / with_tags, 2) if with_tags else None
+            ),
+        },
+        "frecuencias": frequencies,
+        "huerfanos": sorted(frequencies.index[frequencies == 1]),
+        "por_blog": by_blog,
+        "por_anio": by_year,
+        "coocurrencias": _cooccurrence(long),
+        "por_blog_tag": by_blog_tag,
+    }
+
+
+def _cooccurrence(long: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pares de tags distintos que aparecen en un mismo artículo, con cuántos
+    artículos los comparten: autocruce de la tabla larga por artículo
+    sobre códigos enteros (factorize ordenado, así tag_a < tag_b).
+    """
+    unique = long[["articulo", "tag"]].drop_duplicates()
+    codes, names = pd.factorize(unique["tag"], sort=True)
+    frame = pd.DataFrame({"articulo": unique["articulo"].to_numpy(), "tag": codes})
+    pairs = frame.merge(frame, on="articulo")
+    pairs = pairs[pairs["tag_x"] < pairs["tag_y"]]
+
+    n = max(len(names), 1)
+    keys, counts = np.unique(
+        pairs["tag_x"].to_numpy(np.int64) * n + pairs["tag_y"].to_numpy(np.int64),
+        return_counts=True,
+    )
+    order = np.argsort(-counts, kind="stable")
+    return pd.DataFrame({
+        "tag_a": np.asarray(names)[keys[order] // n],
+        "tag_b": np.asarray(names)[keys[order] % n],
+        "articulos": counts[order],
+    })
+
+
+def tag_stats_json(stats: Dict) -> str:
+    """Las estadísticas de compute_tag_stats como documento JSON (compacto)."""
+    frequencies = stats["frecuencias"]
+    return json.dumps(
+        {
+            "generales": stats["generales"],
+            "frecuencias": (
+                frequencies.rename("usos").rename_axis("tag")
+                .reset_index().to_dict("records")
+            ),
+            "huerfanos": list(stats["huerfanos"]),
+            "por_blog": (
+                stats["por_blog"].rename_axis("blog_nombre")
+                .reset_index().to_dict("records")
+            ),
+            "por_anio": (
+                stats["por_anio"].rename("articulos").rename_axis("anio")
+                .reset_index().to_dict("records")
+            ),
+            "coocurrencias": stats["coocurrencias"].to_dict("records"),
+        },
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+def write_tag_stats(df: pd.DataFrame, fmt: str = "text", top: int = 20):
+    """
+    tag-stats en el formato pedido, por stdout:
+      text → reporte legible (print_tag_stats)
+      json → generales, frecuencias, huérfanos, por blog, por año y
+             coocurrencias (completos, sin recortar a --top)
+      csv  → una fila por tag: total de usos y usos por blog
+    """
+    if fmt == "text":
+        print_tag_stats(df, top=top)
+        return
+    stats = compute_tag_stats(df)
+    if fmt == "json":
+        print(tag_stats_json(stats))
+    else:
+        stats["por_blog_tag"].to_csv(sys.stdout, index_label="tag")
+
+
 def print_tag_stats(df: pd.DataFrame, top: int = 20):
     """Imprime el reporte de estadísticas de tags de la colección."""
     print("\n📊 ESTADÍSTICAS DE TAGS")
@@ -105,51 +269,48 @@ def print_tag_stats(df: pd.DataFrame, top: int = 20):
         print("⚠️  No hay artículos para analizar")
         return
 
-    all_tags: List[str] = [t for tags in df["tags"] for t in tags]
-    counter = Counter(all_tags)
-    with_tags = df[df["tags"].apply(bool)]
+    stats = compute_tag_stats(df)
+    general = stats["generales"]
+    frequencies = stats["frecuencias"]
 
     print(f"\n📈 GENERALES")
-    print(f"   Total artículos:            {len(df)}")
-    print(f"   Artículos con tags:         {len(with_tags)}")
-    print(f"   Artículos sin tags:         {len(df) - len(with_tags)}")
-    print(f"   Total de tags (con repet.): {len(all_tags)}")
-    print(f"   Tags únicos:                {len(counter)}")
-    if len(with_tags) > 0:
-        avg = len(all_tags) / len(with_tags)
+    print(f"   Total artículos:            {general['total_articulos']}")
+    print(f"   Artículos con tags:         {general['con_tags']}")
+    print(f"   Artículos sin tags:         {general['sin_tags']}")
+    print(f"   Total de tags (con repet.): {general['total_tags']}")
+    print(f"   Tags únicos:                {general['tags_unicos']}")
+    if general["con_tags"] > 0:
+        avg = general["total_tags"] / general["con_tags"]
         print(f"   Promedio tags/artículo:     {avg:.2f}")
 
-    if counter:
-        print(f"\n🏆 TOP {min(top, len(counter))} TAGS MÁS USADOS")
-        width = max(len(t) for t, _ in counter.most_common(top))
-        for tag, count in counter.most_common(top):
+    if len(frequencies):
+        top_tags = frequencies.head(top)
+        print(f"\n🏆 TOP {len(top_tags)} TAGS MÁS USADOS")
+        width = max(len(t) for t in top_tags.index)
+        for tag, count in top_tags.items():
             bar = "█" * min(count, 40)
             print(f"   {tag:<{width}}  {count:>4}  {bar}")
 
-        orphans = sorted(t for t, c in counter.items() if c == 1)
+        orphans = stats["huerfanos"]
         print(f"\n🥀 TAGS HUÉRFANOS (usados 1 sola vez): {len(orphans)}")
         for i in range(0, min(len(orphans), 30), 6):
             print(f"   {', '.join(orphans[i:i + 6])}")
         if len(orphans) > 30:
             print(f"   ... y {len(orphans) - 30} más")
 
+        pairs = stats["coocurrencias"].head(top)
+        print(f"\n🔗 TAGS QUE APARECEN JUNTOS (top {len(pairs)} pares)")
+        for a, b, count in pairs.itertuples(index=False):
+            print(f"   {a + ' + ' + b:<48} {count:>4} artículos")
+
     print(f"\n📚 DISTRIBUCIÓN POR BLOG")
-    by_blog = df.groupby("blog_nombre")["tags"].agg(
-        articulos="count",
-        tags_unicos=lambda s: len({t for tags in s for t in tags}),
-    )
-    for blog, row in by_blog.iterrows():
+    for blog, row in stats["por_blog"].iterrows():
         print(f"   {blog:<32} {row['articulos']:>4} artículos, "
               f"{row['tags_unicos']:>4} tags únicos")
 
     print(f"\n📅 DISTRIBUCIÓN POR AÑO")
-    year_counter: Dict[str, int] = defaultdict(int)
-    for ruta in df["ruta_archivo"]:
-        year = _year_from_path(ruta)
-        if year:
-            year_counter[year] += 1
-    for year in sorted(year_counter):
-        print(f"   {year}: {year_counter[year]:>4} artículos")
+    for year, count in stats["por_anio"].items():
+        print(f"   {year}: {count:>4} artículos")
 
     print("\n" + "=" * 70 + "\n")
 
@@ -158,15 +319,20 @@ def print_tag_stats(df: pd.DataFrame, top: int = 20):
 # AUDITORÍA (audit-tags)
 # =============================================================================
 
-def _find_normalization_variants(counter: Counter) -> Dict[str, List[str]]:
+def _find_normalization_variants(
+    counter: Counter, vocab: TagVocabulary
+) -> Dict[str, List[str]]:
     """
     Agrupa tags crudos que colapsan a la misma forma normalizada
     (mayúsculas, tildes, espacios, guiones): son inconsistencias seguras.
     """
-    groups: Dict[str, List[str]] = defaultdict(list)
+    groups: Dict[int, List[str]] = defaultdict(list)
     for tag in counter:
-        groups[normalize_tag(tag)].append(tag)
-    return {k: sorted(v) for k, v in groups.items() if len(v) > 1}
+        groups[vocab.id(tag)].append(tag)
+    return {
+        vocab.name(tag_id): sorted(forms)
+        for tag_id, forms in groups.items() if len(forms) > 1
+    }
 
 
 def _find_format_issues(counter: Counter) -> Dict[str, List[str]]:
@@ -186,27 +352,39 @@ def _find_format_issues(counter: Counter) -> Dict[str, List[str]]:
     return issues
 
 
-def print_tag_audit(df: pd.DataFrame, threshold: float = 0.8):
+def print_tag_audit(
+    df: pd.DataFrame, threshold: float = 0.8
+) -> List[Tuple[str, str]]:
     """
     Audita la taxonomía: variantes, formato, singular/plural y typos
     probables. Emite recomendaciones como comandos listos para ejecutar.
+    Devuelve las consolidaciones que normalizar no resuelve [(viejo, nuevo)]
+    (las de replace-tags), para guardarlas como plan.
     """
     print("\n🔬 AUDITORÍA DE TAXONOMÍA DE TAGS")
     print("=" * 70)
 
     if df.empty:
         print("⚠️  No hay artículos para analizar")
-        return
+        return []
 
     counter = Counter(t for tags in df["tags"] for t in tags)
     if not counter:
         print("⚠️  No hay tags en la colección")
-        return
+        return []
 
     recommendations: List[Tuple[str, str]] = []  # (viejo, nuevo)
 
+    # Cada tag crudo se normaliza una vez; tabla de frecuencias por forma
+    # normalizada, calculada una sola vez para todas las secciones
+    vocab = TagVocabulary(counter)
+    freq_by_id: Counter = Counter()
+    for tag, count in counter.items():
+        freq_by_id[vocab.id(tag)] += count
+    freq: Dict[str, int] = {vocab.name(i): n for i, n in freq_by_id.items()}
+
     # --- 1. Variantes que colapsan al normalizar --------------------------------
-    variants = _find_normalization_variants(counter)
+    variants = _find_normalization_variants(counter, vocab)
     print(f"\n1️⃣  VARIANTES DE ESCRITURA (colapsan al normalizar): {len(variants)}")
     for normalized, forms in sorted(variants.items()):
         print(f"   {' | '.join(forms)}  →  {normalized}")
@@ -223,53 +401,61 @@ def print_tag_audit(df: pd.DataFrame, threshold: float = 0.8):
             extra = f" ... (+{len(tags) - 8})" if len(tags) > 8 else ""
             print(f"   • {kind} ({len(tags)}): {shown}{extra}")
             recommendations.extend(
-                (t, normalize_tag(t)) for t in tags if normalize_tag(t) != t
+                (t, vocab.normalized(t)) for t in tags if vocab.normalized(t) != t
             )
     else:
         print("   ✅ Todos los tags siguen el formato snake_case")
 
     # --- 3. Singular / plural ----------------------------------------------------
-    normalized_unique = sorted({normalize_tag(t) for t in counter})
-    plural_pairs = [
-        (a, b) for a, b, _ in find_similar_pairs(normalized_unique, 0.75)
-        if is_plural_pair(a, b)
-    ]
-    print(f"\n3️⃣  POSIBLES PARES SINGULAR/PLURAL: {len(plural_pairs)}")
-    for a, b in plural_pairs:
-        # Recomendar consolidar en la forma más frecuente
-        freq_a = sum(c for t, c in counter.items() if normalize_tag(t) == a)
-        freq_b = sum(c for t, c in counter.items() if normalize_tag(t) == b)
-        keep, drop = (a, b) if freq_a >= freq_b else (b, a)
-        print(f"   {a} ({freq_a}) / {b} ({freq_b})  →  sugerido: {keep}")
-        recommendations.append((drop, keep))
+    normalized_unique = sorted(freq)
+    # Una sola pasada de similitud para los dos umbrales (0.75 y el del usuario)
+    scores = TagPairScores(normalized_unique, min(0.75, threshold))
+    # Los pares se unen en clusters: dato/datos/data es UN grupo con UN
+    # canónico, no dos reemplazos que pueden encadenarse o contradecirse
+    plural_clusters = cluster_tags(
+        ((a, b) for a, b, _ in scores.pairs(0.75) if is_plural_pair(a, b)), freq
+    )
+    print(f"\n3️⃣  POSIBLES GRUPOS SINGULAR/PLURAL: {len(plural_clusters)}")
+    for canonical, group in plural_clusters:
+        forms = " / ".join(f"{t} ({freq[t]})" for t in group)
+        print(f"   {forms}  →  sugerido: {canonical}")
+        recommendations.extend((t, canonical) for t in group if t != canonical)
 
     # --- 4. Tags casi iguales (typos probables) ---------------------------------
     similar = [
-        (a, b, r) for a, b, r in find_similar_pairs(normalized_unique, threshold)
+        (a, b) for a, b, _ in scores.pairs(threshold)
         if not is_plural_pair(a, b)
     ]
-    print(f"\n4️⃣  TAGS CASI IGUALES (similitud ≥ {threshold:.0%}): {len(similar)}")
-    for a, b, ratio in similar[:25]:
-        print(f"   {a}  ~  {b}  ({ratio:.0%})")
-    if len(similar) > 25:
-        print(f"   ... y {len(similar) - 25} pares más")
-    if similar:
+    similar_clusters = cluster_tags(similar, freq)
+    print(
+        f"\n4️⃣  TAGS CASI IGUALES (similitud ≥ {threshold:.0%}): "
+        f"{len(similar_clusters)} grupos ({len(similar)} pares)"
+    )
+    for canonical, group in similar_clusters[:25]:
+        forms = "  ~  ".join(f"{t} ({freq[t]})" for t in group)
+        print(f"   {forms}  →  más usado: {canonical}")
+    if len(similar_clusters) > 25:
+        print(f"   ... y {len(similar_clusters) - 25} grupos más")
+    if similar_clusters:
         print("   💡 Revisar manualmente: pueden ser typos o conceptos distintos")
 
     # --- Recomendaciones ejecutables ---------------------------------------------
     unique_recs = sorted(set(recommendations))
+    pending = [(o, n) for o, n in unique_recs if vocab.normalized(o) != n]
     print(f"\n{'=' * 70}")
     print(f"💡 RECOMENDACIONES ({len(unique_recs)} correcciones automáticas)")
     if unique_recs:
         print("\n   La mayoría se resuelve normalizando toda la colección:")
         print("      python main.py normalize-tags <destino> --dry-run")
-        pending = [(o, n) for o, n in unique_recs if normalize_tag(o) != n]
         if pending:
             print("\n   Consolidaciones que requieren replace-tags:")
             args = " ".join(f'"{o}:{n}"' for o, n in pending[:10])
             print(f"      python main.py replace-tags <destino> {args} --dry-run")
             if len(pending) > 10:
                 print(f"      ... y {len(pending) - 10} reemplazos más")
+        print("\n   Todo en una sola pasada: guardar el plan con --save-plan y")
+        print("      python main.py apply-tag-plan <destino> plan.yml --dry-run")
     else:
         print("   ✅ Taxonomía consistente: sin correcciones automáticas pendientes")
     print("=" * 70 + "\n")
+    return pending
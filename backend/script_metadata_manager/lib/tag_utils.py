@@ -6,14 +6,26 @@ deduplicación, reemplazos, altas/bajas y similitud de cadenas.
 
 Absorbe la lógica de normalización del antiguo script_tag_manager
 (QMDTagManager.normalize_tag) para que exista UNA sola implementación.
+La normalización está memorizada, y TagVocabulary/TagTransform permiten
+operar sobre toda la colección con ids enteros en vez de cadenas.
+TagPairScores busca pares parecidos sin comparar todos contra todos:
+descarta con cotas exactas (numpy) antes de llamar a difflib.
 
 No abre archivos ni toca Excel; trabaja únicamente con strings y listas.
 """
 
 import re
 import unicodedata
+from collections import defaultdict
 from difflib import SequenceMatcher
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+_SPECIAL_CHARS_RE = re.compile(r"[^\w\s-]")
+_SEPARATORS_RE    = re.compile(r"[\s-]+")
+_UNDERSCORES_RE   = re.compile(r"_+")
 
 
 # =============================================================================
@@ -30,18 +42,26 @@ def normalize_tag(tag: str) -> str:
       - sin guiones bajos múltiples ni en los extremos
 
     Ejemplo: "Gestión Empresarial" → "gestion_empresarial"
+
+    Memorizado: una colección repite los mismos pocos cientos de tags en
+    miles de artículos, y cada operación los normaliza varias veces.
     """
-    tag = str(tag).lower().strip()
+    return _normalize_tag_cached(str(tag))
+
+
+@lru_cache(maxsize=16384)
+def _normalize_tag_cached(tag: str) -> str:
+    tag = tag.lower().strip()
 
     tag = "".join(
         c for c in unicodedata.normalize("NFD", tag)
         if unicodedata.category(c) != "Mn"
     )
 
-    tag = re.sub(r"[^\w\s-]", "", tag)
-    tag = re.sub(r"[\s-]+", "_", tag)
+    tag = _SPECIAL_CHARS_RE.sub("", tag)
+    tag = _SEPARATORS_RE.sub("_", tag)
     tag = tag.strip("_")
-    tag = re.sub(r"_+", "_", tag)
+    tag = _UNDERSCORES_RE.sub("_", tag)
 
     return tag
 
@@ -148,30 +168,251 @@ def transform_tags(
     Toda operación normaliza la lista completa: es el comportamiento
     heredado que garantiza la deduplicación case/tilde-insensitive.
 
-    Devuelve (tags_finales, descripciones_de_cambios).
+    Devuelve (tags_finales, descripciones_de_cambios). Para aplicar la
+    misma operación a muchos artículos, usar TagTransform.
+    """
+    return TagTransform(replacements, to_remove, to_add).apply(tags)
+
+
+# =============================================================================
+# VOCABULARIO E IDS (operaciones sobre toda la colección)
+# =============================================================================
+
+class TagVocabulary:
+    """
+    Vocabulario de tags de la colección: cada tag crudo se normaliza UNA
+    vez y recibe el id entero de su forma normalizada, así "Economía",
+    "economia" y "ECONOMIA" comparten id y comparar/agrupar tags es
+    comparar enteros.
     """
-    changes: List[str] = []
 
-    result = normalize_tag_list(tags)
-    if result != list(tags):
-        changes.append(f"normalizados: {len(tags)} → {len(result)} tags")
+    def __init__(self, tags: Iterable[str] = ()):
+        self._names: List[str] = []      # id → forma normalizada
+        self._ids: Dict[str, int] = {}   # forma normalizada → id
+        self._raw: Dict[str, int] = {}   # tag crudo → id
+        for tag in tags:
+            self.id(tag)
 
-    if replacements:
-        result, replaced = apply_replacements(result, replacements)
-        changes.extend(f"reemplazo {c}" for c in replaced)
+    def __len__(self) -> int:
+        return len(self._names)
 
-    if to_remove:
-        result, removed = remove_tags(result, to_remove)
-        if removed:
-            changes.append(f"eliminados: {', '.join(removed)}")
+    def id(self, tag: str) -> int:
+        """Id de la forma normalizada de `tag` (lo agrega si es nuevo)."""
+        tag_id = self._raw.get(tag)
+        if tag_id is None:
+            normalized = normalize_tag(tag)
+            tag_id = self._ids.get(normalized)
+            if tag_id is None:
+                tag_id = len(self._names)
+                self._names.append(normalized)
+                self._ids[normalized] = tag_id
+            self._raw[tag] = tag_id
+        return tag_id
 
-    if to_add:
-        result, added = add_tags(result, to_add)
-        if added:
-            changes.append(f"agregados: {', '.join(added)}")
+    def ids(self, tags: Iterable[str]) -> List[int]:
+        return [self.id(t) for t in tags]
+
+    def name(self, tag_id: int) -> str:
+        """Forma normalizada de un id."""
+        return self._names[tag_id]
+
+    def names(self, ids: Iterable[int]) -> List[str]:
+        return [self._names[i] for i in ids]
+
+    def normalized(self, tag: str) -> str:
+        """normalize_tag(tag) a través del vocabulario."""
+        return self._names[self.id(tag)]
 
-    result = dedupe_tags(result)
-    return result, changes
+
+def _dedupe_ids(ids: List[int]) -> List[int]:
+    return list(dict.fromkeys(ids))
+
+
+class TagTransform:
+    """
+    Una operación de tags (la de transform_tags) preparada una sola vez:
+    los argumentos se normalizan al construirla y cada artículo se
+    transforma sobre ids de un TagVocabulary compartido, sin volver a
+    normalizar cadenas. apply() devuelve lo mismo que transform_tags.
+    """
+
+    def __init__(
+        self,
+        replacements: Optional[Dict[str, str]] = None,
+        to_remove: Optional[List[str]] = None,
+        to_add: Optional[List[str]] = None,
+        vocab: Optional[TagVocabulary] = None,
+    ):
+        self.vocab = vocab if vocab is not None else TagVocabulary()
+        v = self.vocab
+        self._empty = v.id("")
+        self._replace: Dict[int, int] = {
+            v.id(old): v.id(new) for old, new in (replacements or {}).items()
+        }
+        self._remove = {v.id(t) for t in (to_remove or [])}
+        self._add = [i for i in v.ids(to_add or []) if i != self._empty]
+
+    def apply(self, tags: List[str]) -> Tuple[List[str], List[str]]:
+        v = self.vocab
+        changes: List[str] = []
+
+        ids = _dedupe_ids([i for i in v.ids(tags) if i != self._empty])
+        if v.names(ids) != list(tags):
+            changes.append(f"normalizados: {len(tags)} → {len(ids)} tags")
+
+        if self._replace:
+            replaced = []
+            for pos, tag_id in enumerate(ids):
+                new_id = self._replace.get(tag_id)
+                if new_id is not None and new_id != tag_id:
+                    replaced.append(f"'{v.name(tag_id)}' → '{v.name(new_id)}'")
+                    ids[pos] = new_id
+            changes.extend(f"reemplazo {c}" for c in replaced)
+
+        if self._remove:
+            removed = [i for i in ids if i in self._remove]
+            if removed:
+                ids = [i for i in ids if i not in self._remove]
+                changes.append(f"eliminados: {', '.join(v.names(removed))}")
+
+        if self._add:
+            existing = set(ids)
+            added = []
+            for tag_id in self._add:
+                if tag_id not in existing:
+                    ids.append(tag_id)
+                    existing.add(tag_id)
+                    added.append(tag_id)
+            if added:
+                changes.append(f"agregados: {', '.join(v.names(added))}")
+
+        return v.names(_dedupe_ids(ids)), changes
+
+    def targets(self) -> Optional[Set[str]]:
+        """
+        Formas normalizadas que la operación reemplaza o elimina: una lista
+        ya normalizada que no use ninguna sale igual de apply(). None si la
+        operación agrega tags (puede cambiar cualquier lista).
+        """
+        if self._add:
+            return None
+        return set(self.vocab.names(set(self._replace) | self._remove))
+
+
+# =============================================================================
+# PLANES (varias operaciones en una sola pasada)
+# =============================================================================
+
+PLAN_OPERATIONS = ("normalize", "replace", "remove", "add")
+
+
+class TagPlan:
+    """
+    Una lista ordenada de operaciones de tags (p.ej. las recomendaciones
+    de audit-tags) compuesta en una sola transformación por artículo.
+    apply() devuelve lo mismo que ejecutar normalize-tags / replace-tags /
+    remove-tags / add-tags uno tras otro, incluido que un artículo que se
+    queda sin tags no recibe las operaciones siguientes (esos comandos
+    omiten los artículos sin tags). Mismo interfaz que TagTransform.
+    """
+
+    def __init__(self, operations: List[Tuple[str, object]]):
+        self.operations = operations
+        self.vocab = TagVocabulary()
+        self._steps = [
+            TagTransform(
+                replacements=arg if kind == "replace" else None,
+                to_remove=arg if kind == "remove" else None,
+                to_add=arg if kind == "add" else None,
+                vocab=self.vocab,
+            )
+            for kind, arg in operations
+        ]
+
+    @classmethod
+    def from_data(cls, data) -> "TagPlan":
+        """
+        Construye el plan desde lo cargado de un plan.yml: una lista de
+        operaciones (o {operations: [...]}), cada una con una sola clave:
+            - normalize: true
+            - replace: {viejo: nuevo}        (o ["viejo:nuevo", ...])
+            - remove: [tag, ...]
+            - add: [tag, ...]
+        Lanza ValueError ante un plan inválido para que el CLI lo reporte.
+        """
+        if isinstance(data, dict) and "operations" in data:
+            data = data["operations"]
+        if not isinstance(data, list) or not data:
+            raise ValueError("El plan debe tener una lista 'operations' no vacía")
+
+        operations: List[Tuple[str, object]] = []
+        for n, item in enumerate(data, 1):
+            if not isinstance(item, dict) or len(item) != 1:
+                raise ValueError(
+                    f"Operación {n}: se espera una sola clave "
+                    f"({', '.join(PLAN_OPERATIONS)})"
+                )
+            (kind, arg), = item.items()
+            if kind == "normalize":
+                operations.append((kind, None))
+            elif kind == "replace":
+                operations.append((kind, _plan_replacements(n, arg)))
+            elif kind in ("remove", "add"):
+                tags = [arg] if isinstance(arg, str) else arg
+                if not isinstance(tags, list) or not tags or None in tags:
+                    raise ValueError(f"Operación {n}: '{kind}' espera una lista de tags")
+                operations.append((kind, [str(t) for t in tags]))
+            else:
+                raise ValueError(f"Operación {n}: tipo desconocido '{kind}'")
+        return cls(operations)
+
+    def describe(self) -> List[str]:
+        """Una línea legible por operación, en orden."""
+        lines = []
+        for kind, arg in self.operations:
+            if kind == "replace":
+                detail = ", ".join(f"{o} → {n}" for o, n in arg.items())
+            elif kind in ("remove", "add"):
+                detail = ", ".join(arg)
+            else:
+                detail = "minúsculas, sin tildes, snake_case, sin duplicados"
+            lines.append(f"{kind}: {detail}")
+        return lines
+
+    def apply(self, tags: List[str]) -> Tuple[List[str], List[str]]:
+        changes: List[str] = []
+        for step in self._steps:
+            tags, step_changes = step.apply(tags)
+            changes.extend(step_changes)
+            if not tags:
+                break
+        return tags, changes
+
+    def targets(self) -> Optional[Set[str]]:
+        """Unión de los targets() de cada operación (None si alguna agrega)."""
+        targets: Set[str] = set()
+        for step in self._steps:
+            step_targets = step.targets()
+            if step_targets is None:
+                return None
+            targets |= step_targets
+        return targets
+
+
+def _plan_replacements(n: int, arg) -> Dict[str, str]:
+    """Reemplazos de una operación replace del plan (dict o lista "a:b")."""
+    if isinstance(arg, list):
+        return parse_replacement_args([str(a) for a in arg])
+    if not isinstance(arg, dict) or not arg:
+        raise ValueError(f"Operación {n}: 'replace' espera {{viejo: nuevo}}")
+    replacements = {}
+    for old, new in arg.items():
+        old = "" if old is None else str(old).strip()
+        new = "" if new is None else str(new).strip()
+        if not old or not new:
+            raise ValueError(f"Operación {n}: reemplazo con lado vacío: '{old}: {new}'")
+        replacements[old] = new
+    return replacements
 
 
 # =============================================================================
@@ -242,6 +483,203 @@ def is_plural_pair(a: str, b: str) -> bool:
     return longer in (f"{shorter}s", f"{shorter}es")
 
 
+def _length_pruned(a: str, b: str, threshold: float) -> bool:
+    """
+    Poda por longitud histórica de find_similar_pairs: si difieren mucho
+    en longitud el par no se considera. Es parte del resultado (no solo
+    una optimización), por eso se conserva tal cual.
+    """
+    return abs(len(a) - len(b)) > max(len(a), len(b)) * (1 - threshold)
+
+
+def _char_tokens(tag: str) -> List[Tuple[str, int]]:
+    """Caracteres como conjunto: ('a', 1), ('a', 2)... por repetición."""
+    seen: Dict[str, int] = defaultdict(int)
+    tokens = []
+    for ch in tag:
+        seen[ch] += 1
+        tokens.append((ch, seen[ch]))
+    return tokens
+
+
+def _lcs_length(a: str, b: str) -> int:
+    """
+    Largo de la subsecuencia común más larga (bit-paralelo, Allison-Dix):
+    V tiene un bit por carácter de b; los ceros que quedan son la LCS.
+    """
+    masks: Dict[str, int] = defaultdict(int)
+    for pos, ch in enumerate(b):
+        masks[ch] |= 1 << pos
+    full = (1 << len(b)) - 1
+    v = full
+    for ch in a:
+        u = v & masks.get(ch, 0)
+        v = ((v + u) | (v - u)) & full
+    return len(b) - bin(v).count("1")
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    """Bits en 1 de cada uint64 (np.bitwise_count existe desde numpy 2.0)."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values).astype(np.int64)
+    v = values - ((values >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    v = (v & np.uint64(0x3333333333333333)) + ((v >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    v = (v + (v >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return ((v * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.int64)
+
+
+def _lcs_lengths(tags: List[str], first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """
+    _lcs_length(tags[i], tags[j]) para muchos pares a la vez, con un
+    uint64 por par (el segundo tag debe tener como mucho 64 caracteres).
+    """
+    alphabet: Dict[str, int] = {}
+    for tag in tags:
+        for ch in tag:
+            alphabet.setdefault(ch, len(alphabet) + 1)   # 0 = relleno
+    width = max(len(t) for t in tags)
+    codes = np.zeros((len(tags), width), dtype=np.int64)
+    masks = np.zeros((len(tags), len(alphabet) + 1), dtype=np.uint64)
+    full = np.zeros(len(tags), dtype=np.uint64)
+    for row, tag in enumerate(tags):
+        codes[row, :len(tag)] = [alphabet[ch] for ch in tag]
+        if len(tag) <= 64:
+            for pos, ch in enumerate(tag):
+                masks[row, alphabet[ch]] |= np.uint64(1 << pos)
+            full[row] = (1 << len(tag)) - 1
+
+    pair_full = full[second]
+    v = pair_full.copy()
+    for k in range(int(max(len(tags[i]) for i in np.unique(first)))):
+        u = v & masks[second, codes[first, k]]
+        v = ((v + u) | (v - u)) & pair_full
+    lengths = np.array([len(t) for t in tags], dtype=np.int64)
+    return lengths[second] - _popcount(v)
+
+
+# Celdas de la matriz de caracteres en común que se calculan de una vez,
+# y pares por lote en la cota de subsecuencia común
+_OVERLAP_BLOCK_CELLS = 4_000_000
+_LCS_BATCH = 500_000
+
+
+class TagPairScores:
+    """
+    Una sola pasada de similitud sobre un conjunto de tags, válida para
+    cualquier umbral >= min_threshold (audit-tags la usa para el umbral de
+    singular/plural y para el de typos).
+
+    ratio() de difflib es 2·M / (|a|+|b|), donde M son los caracteres de
+    los bloques emparejados. Antes de llamar a difflib cada par pasa por
+    dos cotas superiores de M, ambas exactas (ningún par que llega al
+    umbral se descarta):
+
+      1. caracteres en común contando repeticiones: todos los pares a la
+         vez, como producto de la matriz de incidencia carácter × tag
+         (un índice invertido denso) con numpy
+      2. subsecuencia común más larga: los bloques de difflib son una
+         subsecuencia común, así que M nunca la supera
+
+    difflib solo se ejecuta sobre lo que sobrevive, agrupado por el
+    segundo tag para indexarlo una sola vez.
+    """
+
+    def __init__(self, tags: List[str], min_threshold: float):
+        self.min_threshold = min_threshold
+        self._tags = sorted(set(tags))
+        self._scored: List[Tuple[int, int, float]] = []  # (i, j, ratio)
+        self._score(self._candidates(min_threshold), min_threshold)
+
+    def _candidates(self, threshold: float) -> List[Tuple[int, int]]:
+        """Pares (i, j), i < j, que pasan la poda por longitud y la cota 1."""
+        tags = self._tags
+        n = len(tags)
+        if n < 2:
+            return []
+        if threshold <= 0:
+            # Con umbral 0 hasta los pares sin nada en común califican
+            return [(i, j) for i in range(n) for j in range(i + 1, n)]
+
+        columns: Dict[Tuple[str, int], int] = {}
+        rows, cols = [], []
+        for i, tag in enumerate(tags):
+            for tok in _char_tokens(tag):
+                rows.append(i)
+                cols.append(columns.setdefault(tok, len(columns)))
+        incidence = np.zeros((n, max(1, len(columns))), dtype=np.float32)
+        incidence[rows, cols] = 1
+        lengths = np.array([len(t) for t in tags], dtype=np.float64)
+
+        pairs: List[Tuple[int, int]] = []
+        block = max(1, _OVERLAP_BLOCK_CELLS // n)
+        for r0 in range(0, n - 1, block):
+            r1 = min(n - 1, r0 + block)
+            common = incidence[r0:r1] @ incidence[r0:].T
+            la = lengths[r0:r1, None]
+            lb = lengths[None, r0:]
+            # Márgenes hacia "conservar": la decisión exacta es de pairs()
+            keep = (
+                (np.abs(la - lb) <= np.maximum(la, lb) * (1 - threshold) + 1e-9)
+                & (2 * common >= threshold * (la + lb) - 1e-9)
+            )
+            keep &= np.arange(r0, n)[None, :] > np.arange(r0, r1)[:, None]
+            ii, jj = np.nonzero(keep)
+            pairs.extend(zip((ii + r0).tolist(), (jj + r0).tolist()))
+        return pairs
+
+    def _lcs_survivors(
+        self, candidates: List[Tuple[int, int]], threshold: float
+    ) -> List[Tuple[int, int]]:
+        """Candidatos que pasan la cota 2 (subsecuencia común más larga)."""
+        tags = self._tags
+        survivors: List[Tuple[int, int]] = []
+        wide = [(i, j) for i, j in candidates if len(tags[j]) > 64]
+        survivors.extend(
+            (i, j) for i, j in wide
+            if 2 * _lcs_length(tags[i], tags[j])
+            >= threshold * (len(tags[i]) + len(tags[j])) - 1e-9
+        )
+        narrow = np.array(
+            [(i, j) for i, j in candidates if len(tags[j]) <= 64], dtype=np.int64
+        ).reshape(-1, 2)
+        lengths = np.array([len(t) for t in tags], dtype=np.float64)
+        for start in range(0, len(narrow), _LCS_BATCH):
+            first, second = narrow[start:start + _LCS_BATCH].T
+            lcs = _lcs_lengths(tags, first, second)
+            keep = 2 * lcs >= threshold * (lengths[first] + lengths[second]) - 1e-9
+            survivors.extend(zip(first[keep].tolist(), second[keep].tolist()))
+        return survivors
+
+    def _score(self, candidates: List[Tuple[int, int]], threshold: float):
+        tags = self._tags
+        matcher = SequenceMatcher(None)
+        current = None
+        # Agrupados por el segundo tag: SequenceMatcher indexa seq2 una vez
+        for j, i in sorted((j, i) for i, j in self._lcs_survivors(candidates, threshold)):
+            if j != current:
+                matcher.set_seq2(tags[j])
+                current = j
+            matcher.set_seq1(tags[i])
+            ratio = matcher.ratio()
+            if ratio >= threshold:
+                self._scored.append((i, j, ratio))
+        self._scored.sort()
+
+    def pairs(self, threshold: float) -> List[Tuple[str, str, float]]:
+        """Lo mismo que find_similar_pairs(tags, threshold)."""
+        if threshold < self.min_threshold:
+            raise ValueError(
+                f"Umbral {threshold} menor que el de la pasada ({self.min_threshold})"
+            )
+        tags = self._tags
+        pairs = [
+            (tags[i], tags[j], ratio)
+            for i, j, ratio in self._scored
+            if ratio >= threshold and not _length_pruned(tags[i], tags[j], threshold)
+        ]
+        return sorted(pairs, key=lambda p: -p[2])
+
+
 def find_similar_pairs(
     tags: List[str], threshold: float = 0.8
 ) -> List[Tuple[str, str, float]]:
@@ -249,16 +687,51 @@ def find_similar_pairs(
     Encuentra pares de tags distintos con similitud >= threshold
     (candidatos a typos, variantes o singular/plural).
     Devuelve [(tag_a, tag_b, ratio)] ordenado por ratio descendente.
+    Para varios umbrales sobre los mismos tags, usar TagPairScores.
     """
-    pairs = []
-    sorted_tags = sorted(set(tags))
-    for i, a in enumerate(sorted_tags):
-        for b in sorted_tags[i + 1:]:
-            # Poda barata: si difieren mucho en longitud no pueden superar
-            # el umbral y el ratio de difflib es costoso en O(n²) pares
-            if abs(len(a) - len(b)) > max(len(a), len(b)) * (1 - threshold):
-                continue
-            ratio = tag_similarity(a, b)
-            if ratio >= threshold:
-                pairs.append((a, b, ratio))
-    return sorted(pairs, key=lambda p: -p[2])
+    return TagPairScores(tags, threshold).pairs(threshold)
+
+
+def cluster_tags(
+    pairs: Iterable[Tuple[str, str]], freq: Dict[str, int]
+) -> List[Tuple[str, List[str]]]:
+    """
+    Agrupa en clusters (componentes conexas, con union-find) los tags
+    unidos por `pairs` y elige un canónico por cluster: el más frecuente
+    según `freq` y, a igual frecuencia, el primero alfabéticamente.
+    Devuelve [(canónico, miembros ordenados)], los clusters con más
+    apariciones primero. Recorre cada par una sola vez.
+    """
+    parent: Dict[str, str] = {}
+    size: Dict[str, int] = {}
+
+    def find(tag: str) -> str:
+        while parent[tag] != tag:
+            parent[tag] = parent[parent[tag]]   # compresión por mitades
+            tag = parent[tag]
+        return tag
+
+    for a, b in pairs:
+        for tag in (a, b):
+            if tag not in parent:
+                parent[tag] = tag
+                size[tag] = 1
+        root_a, root_b = find(a), find(b)
+        if root_a == root_b:
+            continue
+        if size[root_a] < size[root_b]:
+            root_a, root_b = root_b, root_a
+        parent[root_b] = root_a
+        size[root_a] += size[root_b]
+
+    members: Dict[str, List[str]] = defaultdict(list)
+    for tag in parent:
+        members[find(tag)].append(tag)
+
+    clusters = []
+    for group in members.values():
+        group.sort()
+        canonical = min(group, key=lambda t: (-freq.get(t, 0), t))
+        clusters.append((canonical, group))
+    clusters.sort(key=lambda c: (-sum(freq.get(t, 0) for t in c[1]), c[0]))
+    return clusters
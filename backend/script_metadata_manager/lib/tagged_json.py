@@ -0,0 +1,80 @@
+"""
+lib/tagged_json.py
+==================
+JSON con etiquetas para los tipos que JSON no tiene, usado por las
+cachés en SQLite (frontmatter_cache, excel_store) en lugar de pickle:
+leer un archivo de caché manipulado o sincronizado desde otra máquina
+nunca ejecuta código, como mucho falla al decodificar.
+
+Tipos admitidos: None, bool, int, float (incluidos NaN e inf), str,
+listas, dicts, y con etiqueta {"$t": tipo, "v": valor}:
+
+  date, datetime, time       → isoformat
+  pd.Timestamp, pd.NaT       → isoformat (nanosegundos incluidos)
+  tuple                      → lista
+  dict con claves no str (o con una clave "$t") → lista de pares
+
+Cualquier otro tipo lanza TypeError en dumps: el llamador decide qué
+hacer (no cachear ese valor).
+
+Nada en este archivo depende de otros módulos del proyecto.
+"""
+
+import json
+from datetime import date, datetime, time
+
+import pandas as pd
+
+_TAG = "$t"
+
+
+def _encode(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, list):
+        return [_encode(v) for v in value]
+    if isinstance(value, dict):
+        if _TAG in value or not all(isinstance(k, str) for k in value):
+            return {_TAG: "map", "v": [[_encode(k), _encode(v)] for k, v in value.items()]}
+        return {k: _encode(v) for k, v in value.items()}
+    if value is pd.NaT:
+        return {_TAG: "nat"}
+    if isinstance(value, pd.Timestamp):
+        return {_TAG: "timestamp", "v": value.isoformat()}
+    if isinstance(value, datetime):
+        return {_TAG: "datetime", "v": value.isoformat()}
+    if isinstance(value, date):
+        return {_TAG: "date", "v": value.isoformat()}
+    if isinstance(value, time):
+        return {_TAG: "time", "v": value.isoformat()}
+    if isinstance(value, tuple):
+        return {_TAG: "tuple", "v": [_encode(v) for v in value]}
+    raise TypeError(f"tipo no serializable: {type(value).__name__}")
+
+
+_DECODERS = {
+    "nat": lambda v: pd.NaT,
+    "timestamp": pd.Timestamp,
+    "datetime": datetime.fromisoformat,
+    "date": date.fromisoformat,
+    "time": time.fromisoformat,
+    "tuple": tuple,
+    "map": lambda pairs: {k: v for k, v in pairs},
+}
+
+
+def _decode(obj: dict):
+    tag = obj.get(_TAG)
+    if tag is None:
+        return obj
+    return _DECODERS[tag](obj.get("v"))
+
+
+def dumps(value) -> str:
+    """Texto JSON de `value`; TypeError si contiene un tipo no admitido."""
+    return json.dumps(_encode(value), ensure_ascii=False, separators=(",", ":"))
+
+
+def loads(text: str):
+    """Inverso de dumps."""
+    return json.loads(text, object_hook=_decode)
@@ -0,0 +1,137 @@
+"""
+lib/template_manifest.py
+========================
+Manifiesto del modo incremental de create-template, guardado junto al
+Excel como archivo oculto (.quarto_metadata.xlsx.manifest.json).
+
+Registra lo que vio la última ejecución que escribió el Excel:
+  - por artículo (ruta_archivo): mtime_ns, size y hash del frontmatter
+  - por carpeta: mtime_ns y su listado (subcarpetas, si tiene index.qmd)
+  - el stat del propio Excel después de guardarlo
+
+Con eso una ejecución incremental solo lista las carpetas cuyo mtime se
+movió, solo lee los index.qmd cuyo stat cambió y solo abre el Excel si
+hay filas que agregar o refrescar.
+
+El manifiesto es desechable: si falta, está corrupto o se generó para
+otra ruta base, la ejecución incremental compara contra las rutas del
+Excel (como antes) y lo vuelve a escribir.
+
+Nada en este archivo depende de otros módulos del proyecto.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+MANIFEST_SUFFIX = ".manifest.json"
+
+# Subir este número invalida los manifiestos existentes (cambio de formato)
+_MANIFEST_VERSION = 1
+
+# ruta_archivo → (mtime_ns, size, hash del frontmatter)
+ArticleState = Tuple[int, int, str]
+# carpeta relativa → (mtime_ns, subcarpetas, tiene index.qmd)
+DirListing = Tuple[int, List[str], bool]
+
+
+def manifest_path(excel_path: Path) -> Path:
+    """Ruta del manifiesto de un Excel: oculto y en la misma carpeta."""
+    excel_path = Path(excel_path)
+    return excel_path.parent / f".{excel_path.name}{MANIFEST_SUFFIX}"
+
+
+def frontmatter_hash(raw_yaml: str) -> str:
+    """Hash del YAML crudo: el cuerpo del documento no afecta a la fila."""
+    return hashlib.sha1(raw_yaml.encode("utf-8")).hexdigest()
+
+
+def _stat_signature(path: Path) -> Optional[List[int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+class TemplateManifest:
+    """Estado de artículos y carpetas de la última escritura del Excel."""
+
+    def __init__(
+        self,
+        base_path: Path,
+        articles: Optional[Dict[str, ArticleState]] = None,
+        dirs: Optional[Dict[str, DirListing]] = None,
+        excel_stat: Optional[List[int]] = None,
+    ):
+        self.base_path = Path(base_path)
+        self.articles: Dict[str, ArticleState] = articles or {}
+        self.dirs: Dict[str, DirListing] = dirs or {}
+        self.excel_stat = excel_stat
+
+    @classmethod
+    def load(cls, excel_path: Path, base_path: Path) -> Optional["TemplateManifest"]:
+        """
+        Lee el manifiesto del Excel. None si no existe, no se puede leer,
+        es de otra versión o se generó para otra ruta base.
+        """
+        path = manifest_path(excel_path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != _MANIFEST_VERSION
+            or data.get("base_path") != str(Path(base_path).resolve())
+        ):
+            return None
+        return cls(
+            base_path,
+            articles={k: tuple(v) for k, v in data.get("articles", {}).items()},
+            dirs={k: tuple(v) for k, v in data.get("dirs", {}).items()},
+            excel_stat=data.get("excel"),
+        )
+
+    def excel_unchanged(self, excel_path: Path) -> bool:
+        """True si el Excel no se tocó desde que se escribió este manifiesto."""
+        return (
+            self.excel_stat is not None
+            and _stat_signature(Path(excel_path)) == self.excel_stat
+        )
+
+    def save(self, excel_path: Path):
+        """
+        Escribe el manifiesto junto al Excel, registrando el stat actual
+        del Excel. Se escribe a un temporal que reemplaza al anterior; si
+        la carpeta no admite escritura solo se avisa.
+        """
+        excel_path = Path(excel_path)
+        self.excel_stat = _stat_signature(excel_path)
+        data = {
+            "version": _MANIFEST_VERSION,
+            "base_path": str(self.base_path.resolve()),
+            "excel": self.excel_stat,
+            "articles": self.articles,
+            "dirs": self.dirs,
+        }
+        path = manifest_path(excel_path)
+        try:
+            fd, tmp_path = tempfile.mkstemp(
+                prefix=f"{path.name}.", suffix=".tmp", dir=path.parent
+            )
+        except OSError as e:
+            print(f"⚠️  No se pudo guardar el manifiesto incremental: {e}")
+            return
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
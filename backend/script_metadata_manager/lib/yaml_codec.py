@@ -0,0 +1,38 @@
+"""
+lib/yaml_codec.py
+=================
+Punto único de lectura y escritura de YAML del proyecto.
+
+Lectura: usa CSafeLoader (libyaml) cuando PyYAML se instaló con los
+bindings de C, y cae a SafeLoader (Python puro) si no están. Ambos
+construyen exactamente los mismos objetos; el de C es ~7 veces más
+rápido, que es lo que domina en los comandos que recorren toda la
+colección.
+
+Escritura: siempre con el Dumper de Python puro. El emisor de libyaml
+NO produce los mismos bytes: con default_style='"' escribe `! "false"`
+en vez de `!!bool "false"`, escapa los caracteres fuera del BMP (emojis)
+y parte de otra forma las cadenas largas entre comillas. Cambiar de
+emisor reescribiría archivos que no cambiaron.
+
+Nada en este archivo depende de otros módulos del proyecto.
+"""
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as _SafeLoader
+    LIBYAML = True
+except ImportError:  # PyYAML sin libyaml
+    from yaml import SafeLoader as _SafeLoader
+    LIBYAML = False
+
+
+def load_yaml(stream):
+    """Equivalente a yaml.safe_load (str, bytes o archivo abierto)."""
+    return yaml.load(stream, Loader=_SafeLoader)
+
+
+def dump_yaml(data, stream=None, **kwargs):
+    """Equivalente a yaml.dump (mismo Dumper, mismos bytes)."""
+    return yaml.dump(data, stream, Dumper=yaml.Dumper, **kwargs)
@@ -0,0 +1,431 @@
+"""
+lib/yaml_emitter.py
+===================
+Serializador del frontmatter de los index.qmd.
+
+Históricamente write_yaml_to_qmd llamaba a yaml.dump con estos parámetros:
+
+    allow_unicode=True, default_flow_style=False, sort_keys=False,
+    indent=2, width=80, default_style='"' si algún valor de primer nivel
+    es una cadena con saltos de línea
+
+y después limpiaba abstract/description con expresiones regulares. Los
+archivos de la colección ya tienen ese formato, así que cualquier salida
+distinta reescribiría artículos que no cambiaron (ver el salto de
+escrituras idénticas en qmd_updater).
+
+Este módulo produce EXACTAMENTE los mismos bytes en una sola pasada, sin
+pasar por el representer, el serializer ni los eventos de PyYAML. Cubre
+las formas que tiene nuestro esquema (config.YAML_FIELD_ORDER):
+
+  - escalares:  str, int, float, bool, null, fechas
+  - mapeos:     format, citation, los de cada autor/afiliación
+  - secuencias: tags, categories, keywords, author, affiliations
+
+Las reglas de estilo (plano, comillas simples o dobles, tags como !!bool
+en el modo de comillas dobles) y el corte de líneas a 80 columnas son las
+del Emitter de PyYAML, copiadas método a método; el análisis de cada
+cadena se hace con el propio analizador y resolver de PyYAML y se
+memoriza. Ante lo que el esquema no usa (tipos no nativos, claves que no
+son cadenas o no caben como clave simple, objetos compartidos que
+llevarían anclas) se delega en dump_yaml.
+
+Depende de: yaml_codec.
+"""
+
+import datetime
+import re
+from functools import lru_cache
+from typing import List, Optional
+
+from yaml.emitter import Emitter
+from yaml.nodes import ScalarNode
+from yaml.resolver import Resolver
+
+from .yaml_codec import dump_yaml
+
+_WIDTH = 80
+_INDENT = 2
+
+_TAG_PREFIX = "tag:yaml.org,2002:"
+_STR_TAG = _TAG_PREFIX + "str"
+
+# Caracteres que el estilo de comillas dobles escribe como escape
+# (mismo criterio que Emitter.write_double_quoted con allow_unicode)
+_DOUBLE_QUOTED_ESCAPE = re.compile(
+    r'["\\\x85\u2028\u2029\ufeff]|[^\x20-\x7e\xa0-\ud7ff\ue000-\ufffd]'
+)
+_LINE_BREAKS = "\n\x85\u2028\u2029"
+
+# Campos de texto largo a los que se les recortan los espacios finales
+# cuando quedan entre comillas simples (comportamiento heredado)
+_LONG_TEXT_CLEANUP = [
+    (field, re.compile(rf"{field}: '([^']+)'\s+"))
+    for field in ("abstract", "description")
+]
+
+_resolver = Resolver()
+
+
+class _Unsupported(Exception):
+    """La estructura tiene algo que solo yaml.dump sabe escribir igual."""
+
+
+class _Analyzer:
+    """Lo mínimo que Emitter.analyze_scalar necesita de un emisor."""
+    allow_unicode = True
+
+
+_analyzer = _Analyzer()
+
+
+# =============================================================================
+# ESCALARES
+# =============================================================================
+
+def _represent(value):
+    """(tag, texto) que daría el representer de yaml.Dumper."""
+    kind = type(value)
+    if kind is str:
+        return _STR_TAG, value
+    if value is None:
+        return _TAG_PREFIX + "null", "null"
+    if kind is bool:
+        return _TAG_PREFIX + "bool", "true" if value else "false"
+    if kind is int:
+        return _TAG_PREFIX + "int", str(value)
+    if kind is float:
+        return _TAG_PREFIX + "float", _float_text(value)
+    if kind is datetime.date:
+        return _TAG_PREFIX + "timestamp", value.isoformat()
+    if kind is datetime.datetime:
+        return _TAG_PREFIX + "timestamp", value.isoformat(" ")
+    raise _Unsupported
+
+
+def _float_text(value: float) -> str:
+    """Igual que SafeRepresenter.represent_float."""
+    if value != value:
+        return ".nan"
+    if value == float("inf"):
+        return ".inf"
+    if value == float("-inf"):
+        return "-.inf"
+    text = repr(value).lower()
+    if "." not in text and "e" in text:
+        text = text.replace("e", ".0e", 1)
+    return text
+
+
+@lru_cache(maxsize=8192)
+def _analyze(text: str, tag: str):
+    """
+    (vacía, multilínea, admite plano, admite comillas simples, implícito)
+    de un escalar, según Emitter.analyze_scalar y el resolver.
+    """
+    analysis = Emitter.analyze_scalar(_analyzer, text)
+    implicit = _resolver.resolve(ScalarNode, text, (True, False)) == tag
+    return (
+        analysis.empty,
+        analysis.multiline,
+        analysis.allow_block_plain,
+        analysis.allow_single_quoted,
+        implicit,
+    )
+
+
+# =============================================================================
+# EMISOR
+# =============================================================================
+
+class _Emitter:
+    """
+    Estado y métodos de yaml.Emitter reducidos a lo que usa el frontmatter:
+    colecciones en bloque, colecciones vacías en flujo y escalares.
+    """
+
+    def __init__(self, double_quoted: bool):
+        self.double_quoted = double_quoted
+        self.out: List[str] = []
+        self.column = 0
+        self.whitespace = True
+        self.indention = True
+        self.indent: Optional[int] = None
+        self._seen = set()
+
+    # ---- escritura de bajo nivel (Emitter.write_*) ----
+
+    def _write(self, data: str):
+        self.column += len(data)
+        self.out.append(data)
+
+    def _indicator(self, indicator: str, need_whitespace: bool,
+                   whitespace: bool = False, indention: bool = False):
+        if self.whitespace or not need_whitespace:
+            data = indicator
+        else:
+            data = " " + indicator
+        self.whitespace = whitespace
+        self.indention = self.indention and indention
+        self._write(data)
+
+    def _line_break(self, data: str = "\n"):
+        self.whitespace = True
+        self.indention = True
+        self.column = 0
+        self.out.append(data)
+
+    def _write_indent(self):
+        indent = self.indent or 0
+        if (not self.indention or self.column > indent
+                or (self.column == indent and not self.whitespace)):
+            self._line_break()
+        if self.column < indent:
+            self.whitespace = True
+            self._write(" " * (indent - self.column))
+
+    def _increase_indent(self, flow: bool = False, indentless: bool = False):
+        previous = self.indent
+        if self.indent is None:
+            self.indent = _INDENT if flow else 0
+        elif not indentless:
+            self.indent += _INDENT
+        return previous
+
+    # ---- nodos ----
+
+    def node(self, value, mapping_context: bool = False, simple_key: bool = False):
+        kind = type(value)
+        if kind is dict or kind is list:
+            if simple_key:
+                raise _Unsupported
+            # Un mismo dict/list en dos sitios saldría con anclas (&id001)
+            if id(value) in self._seen:
+                raise _Unsupported
+            self._seen.add(id(value))
+            if not value:
+                self._indicator("{" if kind is dict else "[", True, whitespace=True)
+                self._indicator("}" if kind is dict else "]", False)
+            elif kind is dict:
+                self._block_mapping(value)
+            else:
+                self._block_sequence(value, mapping_context)
+        else:
+            self._scalar(value, simple_key)
+
+    def _block_mapping(self, data: dict):
+        previous = self._increase_indent()
+        for key, value in data.items():
+            self._write_indent()
+            if type(key) is not str:
+                raise _Unsupported
+            self.node(key, simple_key=True)
+            self._indicator(":", False)
+            self.node(value, mapping_context=True)
+        self.indent = previous
+
+    def _block_sequence(self, data: list, mapping_context: bool):
+        indentless = mapping_context and not self.indention
+        previous = self._increase_indent(indentless=indentless)
+        for item in data:
+            self._write_indent()
+            self._indicator("-", True, indention=True)
+            self.node(item)
+        self.indent = previous
+
+    def _scalar(self, value, simple_key: bool):
+        tag, text = _represent(value)
+        empty, multiline, allow_plain, allow_single, implicit = _analyze(text, tag)
+
+        if simple_key and (empty or multiline or len(text) + 5 >= 128):
+            # Emitter.check_simple_key: sería una clave compleja ('? ')
+            raise _Unsupported
+
+        if self.double_quoted:
+            style = '"'
+        elif implicit and allow_plain and not (simple_key and (empty or multiline)):
+            style = ""
+        elif allow_single and not (simple_key and multiline):
+            style = "'"
+        else:
+            style = '"'
+
+        # Emitter.process_tag
+        if not ((style == "" and implicit) or (style != "" and tag == _STR_TAG)):
+            if not tag.startswith(_TAG_PREFIX):
+                raise _Unsupported
+            self._indicator("!!" + tag[len(_TAG_PREFIX):], True)
+
+        previous = self._increase_indent(flow=True)
+        split = not simple_key
+        if style == '"':
+            self._double_quoted(text, split)
+        elif style == "'":
+            self._single_quoted(text, split)
+        else:
+            self._plain(text, split)
+        self.indent = previous
+
+    # ---- estilos de escalar (Emitter.write_plain / _single / _double) ----
+
+    def _plain(self, text: str, split: bool):
+        if not text:
+            return
+        if not self.whitespace:
+            self._write(" ")
+        self.whitespace = False
+        self.indention = False
+        if self.column + len(text) <= _WIDTH:
+            # Cabe entero: ningún espacio puede provocar un corte
+            self._write(text)
+            return
+        spaces = False
+        start = end = 0
+        while end <= len(text):
+            ch = text[end] if end < len(text) else None
+            if spaces:
+                if ch != " ":
+                    if start + 1 == end and self.column > _WIDTH and split:
+                        self._write_indent()
+                        self.whitespace = False
+                        self.indention = False
+                    else:
+                        self._write(text[start:end])
+                    start = end
+            elif ch is None or ch == " ":
+                self._write(text[start:end])
+                start = end
+            if ch is not None:
+                spaces = ch == " "
+            end += 1
+
+    def _single_quoted(self, text: str, split: bool):
+        self._indicator("'", True)
+        if not any(ch in _LINE_BREAKS for ch in text):
+            quoted = text.replace("'", "''")
+            if self.column + len(quoted) <= _WIDTH:
+                self._write(quoted)
+                self._indicator("'", False)
+                return
+        spaces = False
+        breaks = False
+        start = end = 0
+        while end <= len(text):
+            ch = text[end] if end < len(text) else None
+            if spaces:
+                if ch is None or ch != " ":
+                    if (start + 1 == end and self.column > _WIDTH and split
+                            and start != 0 and end != len(text)):
+                        self._write_indent()
+                    else:
+                        self._write(text[start:end])
+                    start = end
+            elif breaks:
+                if ch is None or ch not in _LINE_BREAKS:
+                    if text[start] == "\n":
+                        self._line_break()
+                    for br in text[start:end]:
+                        self._line_break(br)
+                    self._write_indent()
+                    start = end
+            elif ch is None or ch in " '" or ch in _LINE_BREAKS:
+                if start < end:
+                    self._write(text[start:end])
+                    start = end
+            if ch == "'":
+                self._write("''")
+                start = end + 1
+            if ch is not None:
+                spaces = ch == " "
+                breaks = ch in _LINE_BREAKS
+            end += 1
+        self._indicator("'", False)
+
+    def _double_quoted(self, text: str, split: bool):
+        self._indicator('"', True)
+        if (not _DOUBLE_QUOTED_ESCAPE.search(text)
+                and self.column + len(text) <= _WIDTH):
+            self._write(text)
+            self._indicator('"', False)
+            return
+        start = end = 0
+        while end <= len(text):
+            ch = text[end] if end < len(text) else None
+            if ch is None or _DOUBLE_QUOTED_ESCAPE.match(ch):
+                if start < end:
+                    self._write(text[start:end])
+                    start = end
+                if ch is not None:
+                    if ch in Emitter.ESCAPE_REPLACEMENTS:
+                        data = "\\" + Emitter.ESCAPE_REPLACEMENTS[ch]
+                    elif ch <= "\xff":
+                        data = "\\x%02X" % ord(ch)
+                    elif ch <= "\uffff":
+                        data = "\\u%04X" % ord(ch)
+                    else:
+                        data = "\\U%08X" % ord(ch)
+                    self._write(data)
+                    start = end + 1
+            if (0 < end < len(text) - 1 and (ch == " " or start >= end)
+                    and self.column + (end - start) > _WIDTH and split):
+                data = text[start:end] + "\\"
+                if start < end:
+                    start = end
+                self._write(data)
+                self._write_indent()
+                self.whitespace = False
+                self.indention = False
+                if text[start] == " ":
+                    self._write("\\")
+            end += 1
+        self._indicator('"', False)
+
+
+def emit_frontmatter(data: dict, double_quoted: bool = False) -> Optional[str]:
+    """
+    YAML de `data` idéntico al de yaml.dump con los parámetros de
+    serialize_frontmatter (`double_quoted` equivale a default_style='"'),
+    o None si hay que delegar en yaml.dump.
+    """
+    if type(data) is not dict or not data:
+        return None
+    emitter = _Emitter(double_quoted)
+    try:
+        emitter.node(data)
+    except _Unsupported:
+        return None
+    # Fin de documento: Emitter.expect_document_end cierra la última línea
+    emitter._write_indent()
+    return "".join(emitter.out)
+
+
+# =============================================================================
+# PUNTO DE ENTRADA
+# =============================================================================
+
+def serialize_frontmatter(data: dict) -> str:
+    """
+    Texto YAML del frontmatter (sin los '---'), con el formato que tienen
+    los archivos de la colección. Usa emit_frontmatter y cae a yaml.dump
+    cuando no puede garantizar los mismos bytes.
+    """
+    multiline = any(isinstance(v, str) and "\n" in v for v in data.values())
+    text = emit_frontmatter(data, double_quoted=multiline)
+    if text is None:
+        text = dump_yaml(
+            data,
+            allow_unicode=True,
+            default_flow_style=False,
+            sort_keys=False,
+            indent=2,
+            width=80,
+            default_style='"' if multiline else None,
+        )
+
+    # Limpiar saltos de línea extras en campos de texto largo
+    for field, pattern in _LONG_TEXT_CLEANUP:
+        if f"{field}: '" in text:
+            text = pattern.sub(
+                lambda m, f=field: f"{f}: '{m.group(1).strip()}'\n", text
+            )
+    return text
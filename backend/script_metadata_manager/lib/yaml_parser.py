@@ -7,13 +7,28 @@ _metadata.yml.  También detecta el tipo de documento (stu/man/jou/doc).
 No toca Excel ni el sistema de archivos más allá de leer ficheros .qmd/.yml.
 """
 
+import copy
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
 from pathlib import Path
-from typing import Dict, Optional, Set
-
-import yaml
+from typing import Dict, List, Optional, Set, Tuple
 
 from .config import SECTION_DIRS
+from .frontmatter_cache import FrontmatterEntry, get_active_cache
+from .yaml_codec import load_yaml
+
+# El \r? del cierre deja fuera el \r de un archivo CRLF: el YAML crudo
+# termina igual que con LF y el cuerpo empieza justo tras el ---
+_FRONTMATTER_BYTES_RE = re.compile(rb"^---\s*\n(.*?)\r?\n---", re.DOTALL)
+
+# Primer bloque que se lee de cada .qmd; se duplica hasta hallar el cierre
+_HEAD_CHUNK_SIZE = 4096
+
+# Por debajo de este número de archivos a parsear, crear el pool de
+# procesos cuesta más que parsear en serie
+_MIN_PARALLEL_FILES = 32
 
 
 # =============================================================================
@@ -27,31 +42,59 @@ def read_yaml_from_file(file_path: Path) -> Optional[Dict]:
     """
     try:
         with open(file_path, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f) or {}
+            return load_yaml(f) or {}
     except Exception as e:
         print(f"⚠️  Error leyendo {file_path.name}: {e}")
         return None
 
 
-def extract_frontmatter(file_path: Path) -> Optional[str]:
+def read_frontmatter(file_path: Path) -> Optional[Tuple[str, int]]:
     """
-    Extrae el bloque YAML (entre --- y ---) de un archivo .qmd.
-    Devuelve el string crudo del YAML, o None si no hay frontmatter.
+    Extrae el bloque YAML (entre --- y ---) de un archivo .qmd leyendo
+    SOLO la cabecera: lee en bloques crecientes hasta encontrar el ---
+    de cierre, así el cuerpo del documento (salidas de código, tablas
+    enormes…) nunca se carga en memoria.
+
+    Devuelve (yaml_crudo, offset_del_cuerpo), donde el offset es la
+    posición en BYTES justo después del --- de cierre (los escritores
+    copian el cuerpo desde ahí); None si no hay frontmatter.
     """
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-        match = re.match(r"^---\s*\n(.*?)\n---", content, re.DOTALL)
-        return match.group(1) if match else None
+        with open(file_path, "rb") as f:
+            chunk_size = _HEAD_CHUNK_SIZE
+            head = f.read(chunk_size)
+            if not head.startswith(b"---"):
+                return None
+            match = _FRONTMATTER_BYTES_RE.match(head)
+            while match is None:
+                chunk_size *= 2
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return None
+                head += chunk
+                match = _FRONTMATTER_BYTES_RE.match(head)
+        # Mismos saltos de línea que una lectura en modo texto
+        raw = match.group(1).decode("utf-8")
+        raw = raw.replace("\r\n", "\n").replace("\r", "\n")
+        return raw, match.end()
     except Exception as e:
         print(f"⚠️  Error leyendo {file_path.name}: {e}")
         return None
 
 
+def extract_frontmatter(file_path: Path) -> Optional[str]:
+    """
+    Extrae el bloque YAML (entre --- y ---) de un archivo .qmd.
+    Devuelve el string crudo del YAML, o None si no hay frontmatter.
+    """
+    found = read_frontmatter(file_path)
+    return found[0] if found is not None else None
+
+
 def parse_frontmatter(raw: str) -> Optional[Dict]:
     """Parsea un string de YAML en un dict. Devuelve None si falla."""
     try:
-        return yaml.safe_load(raw) or {}
+        return load_yaml(raw) or {}
     except Exception as e:
         print(f"⚠️  Error parseando YAML: {e}")
         return None
@@ -61,13 +104,92 @@ def parse_frontmatter(raw: str) -> Optional[Dict]:
 # EXTRACCIÓN CON / SIN FUSIÓN
 # =============================================================================
 
+def parse_frontmatter_file(file_path: Path) -> Optional[FrontmatterEntry]:
+    """
+    Lee y parsea el frontmatter de un index.qmd SIN pasar por la caché.
+    Es la unidad de trabajo que se reparte entre procesos (--jobs), por
+    eso vive a nivel de módulo y solo recibe/devuelve datos serializables.
+    """
+    found = read_frontmatter(Path(file_path))
+    if found is None:
+        return None
+    raw, body_offset = found
+    data = parse_frontmatter(raw)
+    if data is None:
+        return None
+    return FrontmatterEntry(raw, body_offset, data, document_mode_from_yaml(data))
+
+
+def load_frontmatter_entry(
+    file_path: Path, st: Optional[os.stat_result] = None
+) -> Optional[FrontmatterEntry]:
+    """
+    Devuelve (raw, offset_del_cuerpo, dict, modo) del index.qmd con UNA
+    sola lectura y UN solo parseo, pasando por la caché persistente si hay
+    una activa: solo se lee el archivo cuando su stat (mtime_ns, size) no
+    coincide con lo guardado. `st` evita repetir el stat si el llamador
+    ya lo tiene.
+    None si el archivo no tiene frontmatter o el YAML es inválido (los
+    fallos no se cachean, así el aviso se repite hasta corregirlos).
+    """
+    cache = get_active_cache()
+    if cache is not None and st is None:
+        try:
+            st = file_path.stat()
+        except OSError:
+            st = None
+    if cache is not None and st is not None:
+        entry = cache.get(file_path, st)
+        if entry is not None:
+            return entry
+
+    entry = parse_frontmatter_file(file_path)
+    if entry is not None and cache is not None and st is not None:
+        cache.put(file_path, st, entry)
+    return entry
+
+
+def load_frontmatter_entries(
+    items: List[Tuple[Path, os.stat_result]], jobs: int = 1
+) -> List[Optional[FrontmatterEntry]]:
+    """
+    Versión en lote de load_frontmatter_entry para (file_path, stat).
+    Los aciertos de caché se resuelven en este proceso; el resto se
+    lee y parsea en un ProcessPoolExecutor de `jobs` procesos, por
+    bloques. El resultado conserva el orden de `items`.
+    """
+    cache = get_active_cache()
+    results: List[Optional[FrontmatterEntry]] = [None] * len(items)
+    pending: List[int] = []
+    for i, (file_path, st) in enumerate(items):
+        entry = cache.get(file_path, st) if cache is not None else None
+        if entry is not None:
+            results[i] = entry
+        else:
+            pending.append(i)
+
+    paths = [items[i][0] for i in pending]
+    if jobs > 1 and len(paths) >= _MIN_PARALLEL_FILES:
+        chunksize = max(1, len(paths) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            parsed = list(pool.map(parse_frontmatter_file, paths, chunksize=chunksize))
+    else:
+        parsed = [parse_frontmatter_file(path) for path in paths]
+
+    for i, entry in zip(pending, parsed):
+        results[i] = entry
+        if entry is not None and cache is not None:
+            cache.put(items[i][0], items[i][1], entry)
+    return results
+
+
 def extract_yaml_only_index(file_path: Path) -> Optional[Dict]:
     """
     Extrae SÓLO el YAML del propio index.qmd (sin considerar _metadata.yml).
     Ideal para saber qué está explícitamente escrito en el artículo.
     """
-    raw = extract_frontmatter(file_path)
-    return parse_frontmatter(raw) if raw is not None else None
+    entry = load_frontmatter_entry(file_path)
+    return entry.data if entry is not None else None
 
 
 def extract_yaml_merged(
@@ -81,13 +203,24 @@ def extract_yaml_merged(
     index_yaml = extract_yaml_only_index(file_path)
     if index_yaml is None:
         return None
+    return merge_with_metadata_yml(index_yaml, file_path, base_path)
+
 
+def merge_with_metadata_yml(
+    index_yaml: Dict, file_path: Path, base_path: Path
+) -> Dict:
+    """
+    Fusiona un YAML de index.qmd ya parseado con el _metadata.yml más
+    cercano (los valores no nulos del index.qmd tienen prioridad).
+    El _metadata.yml se copia en profundidad: la versión memorizada por
+    MetadataResolver la comparten todos los artículos de la carpeta.
+    """
     metadata_path = find_metadata_yml(file_path, base_path)
     if metadata_path is None:
         return index_yaml
 
-    base_yaml = read_yaml_from_file(metadata_path) or {}
-    result = base_yaml.copy()
+    base_yaml = _metadata_resolver.load(metadata_path) or {}
+    result = copy.deepcopy(base_yaml)
     for key, value in index_yaml.items():
         if value is not None:
             result[key] = value
@@ -98,18 +231,66 @@ def extract_yaml_merged(
 # BÚSQUEDA DE _metadata.yml
 # =============================================================================
 
+class MetadataResolver:
+    """
+    Resuelve y lee los _metadata.yml memorizando por directorio.
+
+    - nearest(): el _metadata.yml más cercano de cada carpeta se calcula
+      una vez por proceso; los hermanos (300 posts bajo posts/) comparten
+      el resultado de su carpeta padre en vez de subir nivel a nivel.
+    - load(): el contenido parseado se guarda por archivo y solo se
+      vuelve a leer si cambió su mtime (un stat por consulta).
+    """
+
+    def __init__(self):
+        self._nearest: Dict[Tuple[Path, Path], Optional[Path]] = {}
+        self._parsed: Dict[Path, Tuple[int, Optional[Dict]]] = {}
+
+    def nearest(self, directory: Path, base_path: Path) -> Optional[Path]:
+        """_metadata.yml más cercano subiendo desde `directory` hasta base_path."""
+        key = (directory, base_path)
+        if key in self._nearest:
+            return self._nearest[key]
+
+        if not directory >= base_path:
+            found = None
+        elif (directory / "_metadata.yml").exists():
+            found = directory / "_metadata.yml"
+        elif directory.parent == directory:
+            found = None
+        else:
+            found = self.nearest(directory.parent, base_path)
+
+        self._nearest[key] = found
+        return found
+
+    def load(self, metadata_path: Path) -> Optional[Dict]:
+        """Contenido parseado del _metadata.yml (None si no se pudo leer)."""
+        try:
+            mtime_ns = metadata_path.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = -1
+        cached = self._parsed.get(metadata_path)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+        data = read_yaml_from_file(metadata_path)
+        self._parsed[metadata_path] = (mtime_ns, data)
+        return data
+
+    def clear(self):
+        self._nearest.clear()
+        self._parsed.clear()
+
+
+_metadata_resolver = MetadataResolver()
+
+
 def find_metadata_yml(qmd_path: Path, base_path: Path) -> Optional[Path]:
     """
     Sube recursivamente desde la carpeta del index.qmd buscando
     el _metadata.yml más cercano, sin pasar de base_path.
     """
-    current = qmd_path.parent
-    while current >= base_path:
-        candidate = current / "_metadata.yml"
-        if candidate.exists():
-            return candidate
-        current = current.parent
-    return None
+    return _metadata_resolver.nearest(qmd_path.parent, base_path)
 
 
 # =============================================================================
@@ -120,20 +301,27 @@ def detect_document_mode(file_path: Path, default: str = "jou") -> str:
     """
     Detecta el tipo de documento (stu/man/jou/doc) leyendo SÓLO el
     index.qmd (no mezcla con _metadata.yml).
+    Ver document_mode_from_yaml para el orden de prioridad; devuelve
+    `default` si no hay indicios.
+    """
+    entry = load_frontmatter_entry(file_path)
+    if entry is None:
+        return default
+    return entry.mode or default
+
+
+def document_mode_from_yaml(yaml_data: Dict) -> Optional[str]:
+    """
+    Tipo de documento a partir del dict YAML del index.qmd, o None si no
+    hay indicios.
 
     Orden de prioridad:
     1. Campo 'documentmode' directo
     2. format.apaquarto-pdf.documentmode
     3. Inferir por campos presentes (course → stu, journal+volume → jou)
-    4. Valor `default` si no hay indicios
     """
-    raw = extract_frontmatter(file_path)
-    if not raw:
-        return default
-
-    yaml_data = parse_frontmatter(raw)
     if not yaml_data:
-        return default
+        return None
 
     valid_modes = {"stu", "man", "jou", "doc"}
 
@@ -159,7 +347,7 @@ def detect_document_mode(file_path: Path, default: str = "jou") -> str:
     if "meta-analysis" in yaml_data or "meta_analysis" in yaml_data:
         return "man"
 
-    return default
+    return None
 
 
 # =============================================================================
@@ -197,17 +385,33 @@ def flatten_yaml_keys(yaml_data: Dict, prefix: str = "") -> Set[str]:
       {'author': [{'name': 'X', 'affiliations': [{'name': 'Y'}]}]}
       → {'author_1_name', 'author_1_affiliations_1_name'}
     """
-    fields: Set[str] = set()
+    return set(flatten_yaml_types(yaml_data, prefix))
+
+
+def flatten_yaml_types(yaml_data: Dict, prefix: str = "") -> Dict[str, str]:
+    """
+    Como flatten_yaml_keys, pero con el tipo YAML de cada valor hoja
+    (str, int, float, bool, date, list, null…). Lo usa schema_index.
+    """
+    fields: Dict[str, str] = {}
     for key, value in yaml_data.items():
         full_key = f"{prefix}_{key}" if prefix else key
 
         if isinstance(value, list) and value and isinstance(value[0], dict):
             for i, item in enumerate(value, 1):
                 if isinstance(item, dict):
-                    fields.update(flatten_yaml_keys(item, f"{full_key}_{i}"))
+                    fields.update(flatten_yaml_types(item, f"{full_key}_{i}"))
         elif isinstance(value, dict):
-            fields.update(flatten_yaml_keys(value, full_key))
+            fields.update(flatten_yaml_types(value, full_key))
         else:
-            fields.add(full_key)
+            fields[full_key] = _yaml_type_name(value)
 
     return fields
+
+
+def _yaml_type_name(value) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, (date, datetime)):
+        return "date"
+    return type(value).__name__
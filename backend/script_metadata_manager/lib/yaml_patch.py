@@ -0,0 +1,112 @@
+"""
+lib/yaml_patch.py
+=================
+Parcheo quirúrgico del frontmatter: en vez de volver a serializar todo
+el YAML, reemplaza solo las líneas de las claves de primer nivel que
+cambiaron y deja intacto el resto del texto (orden, comentarios, bloques
+`|`, comillas...). Lo usan los comandos que tocan una o dos claves:
+sync-dates (date), sync-pdf-urls (citation) y las operaciones de tags
+sobre archivos (tags).
+
+Cada clave de primer nivel ocupa un tramo de líneas: la suya y las
+siguientes hasta la próxima clave en la columna 0 (sin contar líneas en
+blanco ni comentarios de columna 0 al final del tramo). El tramo se
+reemplaza por la salida de serialize_frontmatter para esa sola clave.
+
+El parche se descarta (None → el llamador hace la serialización completa)
+cuando:
+  - algún renglón de columna 0 no se entiende como clave, '- ' o comentario
+  - hay claves repetidas
+  - cambió el conjunto de claves (se agregó o quitó alguna): eso es un
+    cambio estructural
+  - el texto parcheado no vuelve a cargarse exactamente como el YAML
+    actualizado
+
+Depende de: yaml_codec, yaml_emitter.
+"""
+
+import re
+from typing import Dict, Iterable, Optional, Tuple
+
+from .yaml_codec import load_yaml
+from .yaml_emitter import serialize_frontmatter
+
+# Clave de primer nivel: "entre comillas dobles", 'simples' o plana
+_KEY_LINE_RE = re.compile(
+    r"""^(?P<key>"(?:[^"\\]|\\.)*"|'(?:[^']|'')*'"""
+    r"""|[^\s#'"\-?:,\[\]{}&*!|>%@`][^:#]*?)[ \t]*:(?:[ \t]|$)"""
+)
+
+
+def _key_name(token: str) -> Optional[str]:
+    """Nombre de la clave tal como la carga YAML, o None si no es str."""
+    if token[0] in "\"'":
+        try:
+            name = load_yaml(token)
+        except Exception:
+            return None
+        return name if isinstance(name, str) else None
+    return token.strip()
+
+
+def top_level_spans(raw: str) -> Optional[Dict[str, Tuple[int, int]]]:
+    """
+    {clave: (primera_línea, fin)} de cada clave de primer nivel de `raw`
+    (índices de raw.split("\\n"), fin exclusivo), o None si el texto tiene
+    algo en la columna 0 que no es clave, elemento '- ' ni comentario.
+    """
+    lines = raw.split("\n")
+    starts = []
+    for i, line in enumerate(lines):
+        if not line or line[0] in " \t#":
+            continue
+        if line == "-" or line.startswith("- "):
+            continue
+        match = _KEY_LINE_RE.match(line)
+        if match is None:
+            return None
+        name = _key_name(match.group("key"))
+        if name is None:
+            return None
+        starts.append((name, i))
+
+    spans: Dict[str, Tuple[int, int]] = {}
+    for n, (name, start) in enumerate(starts):
+        if name in spans:
+            return None
+        end = starts[n + 1][1] if n + 1 < len(starts) else len(lines)
+        while end - 1 > start and (
+            not lines[end - 1].strip() or lines[end - 1].startswith("#")
+        ):
+            end -= 1
+        spans[name] = (start, end)
+    return spans
+
+
+def patch_frontmatter(
+    raw: str, updated_yaml: dict, changed_keys: Iterable[str]
+) -> Optional[str]:
+    """
+    Texto de `raw` con las claves `changed_keys` reescritas con sus
+    valores de `updated_yaml`, o None si el cambio no se puede aplicar
+    como parche (ver el docstring del módulo).
+    """
+    changed_keys = set(changed_keys)
+    spans = top_level_spans(raw)
+    if (spans is None or set(spans) != set(updated_yaml)
+            or not changed_keys <= set(spans)):
+        return None
+
+    lines = raw.split("\n")
+    for key in sorted(changed_keys, key=lambda k: spans[k][0], reverse=True):
+        start, end = spans[key]
+        fragment = serialize_frontmatter({key: updated_yaml[key]})
+        lines[start:end] = fragment.rstrip("\n").split("\n")
+    patched = "\n".join(lines)
+
+    try:
+        if load_yaml(patched) != updated_yaml:
+            return None
+    except Exception:
+        return None
+    return patched
@@ -25,15 +25,18 @@ Comandos de tags (destino: un Excel .xlsx O un directorio de blogs):
     add-tags           Agrega tags (sin duplicados, respeta el orden)
     tag-stats          Estadísticas de tags de la colección
     audit-tags         Auditoría de taxonomía con recomendaciones
+    apply-tag-plan     Aplica un plan.yml de operaciones en una sola pasada
 
 Comandos de sincronización desde la ruta (mismo doble destino):
     sync-dates         date desde la carpeta YYYY-MM-DD-titulo
     sync-pdf-urls      citation.pdf-url desde la ruta + URL base del blog
+    sync-derived       Varios campos derivados (reglas) en una sola pasada
 """
 
 import os
 import sys
 import argparse
+import contextlib
 from pathlib import Path
 from openpyxl import Workbook
 
@@ -41,33 +44,48 @@ from openpyxl import Workbook
 sys.path.insert(0, str(Path(__file__).parent))
 
 from lib.config import load_config, create_default_config, VERSION, AUTHOR, EMAIL
-from lib.collector import collect_index_files
+from lib.collector import collect_index_files, set_default_jobs
+from lib.frontmatter_cache import activate_cache, deactivate_cache
+from lib.excel_store import set_store_enabled
 from lib.excel_writer import (
     build_metadata_sheet,
     build_instructions_sheet,
-    append_new_articles,
     add_columns_to_excel,
+    update_template_incremental,
+    write_template_manifest,
 )
-from lib.qmd_updater import update_from_excel
+from lib.qmd_updater import fsync_batches, update_from_excel
 from lib.sync import (
     find_differences,
     sync_single_interactive,
     sync_batch_interactive,
     detect_new_fields,
+    suggest_columns,
 )
 from lib.tag_utils import parse_replacement_args
-from lib.tag_operations import apply_tag_ops_to_files, apply_tag_ops_to_excel
+from lib.tag_operations import (
+    apply_tag_ops_to_files,
+    apply_tag_ops_to_excel,
+    load_tag_plan,
+    save_tag_plan,
+)
 from lib.tag_reports import (
     collect_tag_data_from_files,
     collect_tag_data_from_excel,
-    print_tag_stats,
+    write_tag_stats,
     print_tag_audit,
+    STATS_FORMATS,
 )
 from lib.path_sync import (
     sync_dates_files,
     sync_dates_excel,
     sync_pdf_urls_files,
     sync_pdf_urls_excel,
+    sync_derived_files,
+    sync_derived_excel,
+    load_derived_rules,
+    select_rules,
+    print_rules,
 )
 
 
@@ -75,6 +93,10 @@ from lib.path_sync import (
 # HELPERS
 # =============================================================================
 
+# Opciones de ejecución comunes a todos los comandos (se rellenan en main)
+_RUNTIME = {}
+
+
 def _make_manager_config(base_path: str, config_file: str = None):
     """
     Construye el conjunto de parámetros de configuración que todos
@@ -86,6 +108,7 @@ def _make_manager_config(base_path: str, config_file: str = None):
         sys.exit(1)
 
     cfg = load_config(config_file)
+    _activate_frontmatter_cache(config_file)
     allowed_blogs     = set(cfg.get("allowed_blogs", []))
     user_excluded     = set(cfg.get("excluded_folders", []))
     excel_output_dir  = Path(
@@ -96,6 +119,20 @@ def _make_manager_config(base_path: str, config_file: str = None):
     return bp, allowed_blogs, user_excluded, excel_output_dir
 
 
+def _activate_frontmatter_cache(config_file: str = None):
+    """
+    Activa la caché persistente de frontmatter junto a metadata_config.yml
+    (o junto a main.py si no se pasó --config). --no-cache la desactiva.
+    """
+    if _RUNTIME.get("no_cache"):
+        return
+    directory = (
+        Path(config_file).expanduser().resolve().parent
+        if config_file else Path(__file__).resolve().parent
+    )
+    activate_cache(directory)
+
+
 def _resolve_tag_target(target: str):
     """
     Determina el destino de un comando de tags:
@@ -115,10 +152,13 @@ def _resolve_tag_target(target: str):
     sys.exit(2)
 
 
-def _run_tag_operation(args, replacements=None, to_remove=None, to_add=None):
+def _run_tag_operation(
+    args, replacements=None, to_remove=None, to_add=None, plan=None
+):
     """
-    Despacha una operación de tags al backend correcto (Excel o archivos).
-    Toda la lógica vive en lib/tag_operations; aquí solo se enruta.
+    Despacha una operación de tags (o un plan) al backend correcto (Excel
+    o archivos). Toda la lógica vive en lib/tag_operations; aquí solo se
+    enruta.
     """
     mode, target = _resolve_tag_target(args.target)
 
@@ -131,6 +171,7 @@ def _run_tag_operation(args, replacements=None, to_remove=None, to_add=None):
             blog_filter=getattr(args, "blog", None),
             path_filter=getattr(args, "filter_path", None),
             dry_run=args.dry_run,
+            plan=plan,
         )
     else:
         bp, allowed, excluded, _ = _make_manager_config(
@@ -144,6 +185,7 @@ def _run_tag_operation(args, replacements=None, to_remove=None, to_add=None):
             blog_filter=getattr(args, "blog", None),
             path_filter=getattr(args, "filter_path", None),
             dry_run=args.dry_run,
+            plan=plan,
         )
 
 
@@ -186,6 +228,15 @@ def cmd_create_template(args):
 
     output_path = out_dir / output_filename
 
+    # MODO INCREMENTAL: guiado por el manifiesto, sin recorrido completo
+    if args.incremental and output_path.exists():
+        print("\n🔄 MODO INCREMENTAL: Preservando datos existentes")
+        print("   Se agregan artículos nuevos y se refrescan los modificados\n")
+        update_template_incremental(
+            output_path, bp, allowed, excluded, blog_name=args.blog
+        )
+        return
+
     print("🔍 Recolectando archivos index.qmd...")
     print("   (Solo se incluirán artículos con fecha en su carpeta)\n")
 
@@ -197,27 +248,12 @@ def cmd_create_template(args):
         print("⚠️  No se encontraron artículos válidos")
         return
 
-    # MODO INCREMENTAL
-    if args.incremental and output_path.exists():
-        print("\n🔄 MODO INCREMENTAL: Preservando datos existentes")
-        print("   Solo se agregarán artículos nuevos\n")
-        success = append_new_articles(output_path, df_files, bp)
-        if not success:
-            # Falló o no había nada nuevo; continuar con creación normal
-            return
-        print(
-            f"\n💡 Tip: Usa '--incremental' para agregar solo artículos nuevos:\n"
-            f"   python main.py create-template {args.base_path} "
-            f"--config {getattr(args,'config','metadata_config.yml')} --incremental\n"
-        )
-        return
-
-    # MODO NORMAL: desde cero
-    wb = Workbook()
-    wb.remove(wb.active)
+    # MODO NORMAL: desde cero (hojas write-only, escritas en streaming)
+    wb = Workbook(write_only=True)
     build_metadata_sheet(wb, df_files, bp)
     build_instructions_sheet(wb)
     wb.save(output_path)
+    write_template_manifest(output_path, bp, df_files)
 
     print(f"✅ Plantilla Excel creada: {output_path}")
     print(f"📊 Total de artículos: {len(df_files)}")
@@ -229,7 +265,7 @@ def cmd_create_template(args):
     print(f"   4. Actualizar: python main.py update \\")
     print(f"      {bp} {output_path}")
     print(
-        f"\n💡 Tip: Usa '--incremental' para agregar solo artículos nuevos:\n"
+        f"\n💡 Tip: Usa '--incremental' para agregar nuevos y refrescar modificados:\n"
         f"   python main.py create-template {args.base_path} "
         f"--config {getattr(args,'config','metadata_config.yml')} --incremental\n"
     )
@@ -268,9 +304,17 @@ def cmd_detect_new_fields(args):
 # =============================================================================
 
 def cmd_add_columns(args):
-    bp, *_ = _make_manager_config(
+    if args.suggest is None and not args.fields:
+        print("❌ Indica los campos a agregar, o usa --suggest para ver sugerencias")
+        sys.exit(2)
+    bp, allowed, excluded, _ = _make_manager_config(
         args.base_path, getattr(args, "config", None)
     )
+    if args.suggest is not None:
+        suggest_columns(
+            bp, allowed, excluded, args.excel_file, limit=args.suggest or None
+        )
+        return
     add_columns_to_excel(
         args.excel_file,
         args.fields,
@@ -354,13 +398,29 @@ def cmd_add_tags(args):
 
 
 def cmd_tag_stats(args):
-    df = _collect_tag_data(args)
-    print_tag_stats(df, top=args.top)
+    if args.format == "text":
+        df = _collect_tag_data(args)
+    else:
+        # JSON/CSV: por stdout solo el resultado; el progreso va a stderr
+        with contextlib.redirect_stdout(sys.stderr):
+            df = _collect_tag_data(args)
+    write_tag_stats(df, args.format, top=args.top)
 
 
 def cmd_audit_tags(args):
     df = _collect_tag_data(args)
-    print_tag_audit(df, threshold=args.threshold)
+    pending = print_tag_audit(df, threshold=args.threshold)
+    if args.save_plan:
+        save_tag_plan(args.save_plan, pending)
+
+
+def cmd_apply_tag_plan(args):
+    try:
+        plan = load_tag_plan(args.plan)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+    _run_tag_operation(args, plan=plan)
 
 
 # =============================================================================
@@ -416,6 +476,42 @@ def cmd_sync_pdf_urls(args):
         )
 
 
+def cmd_sync_derived(args):
+    # Reglas incorporadas (date, pdf-url) + derived_fields del config
+    cfg = load_config(getattr(args, "config", None))
+    try:
+        registry = load_derived_rules(cfg)
+        if args.list_rules:
+            print_rules(registry)
+            return
+        rules = select_rules(registry, args.rules)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+    configured_urls = cfg.get("blog_base_urls", {})
+
+    mode, target = _resolve_tag_target(args.target)
+    if mode == "excel":
+        sync_derived_excel(
+            str(target), rules,
+            configured_urls=configured_urls,
+            blog_filter=getattr(args, "blog", None),
+            path_filter=getattr(args, "filter_path", None),
+            dry_run=args.dry_run,
+        )
+    else:
+        bp, allowed, excluded, _ = _make_manager_config(
+            str(target), getattr(args, "config", None)
+        )
+        sync_derived_files(
+            bp, allowed, excluded, rules,
+            configured_urls=configured_urls,
+            blog_filter=getattr(args, "blog", None),
+            path_filter=getattr(args, "filter_path", None),
+            dry_run=args.dry_run,
+        )
+
+
 # =============================================================================
 # CLI PARSER
 # =============================================================================
@@ -433,6 +529,9 @@ Ejemplos:
   # Crear plantilla Excel con todos los blogs
   python main.py create-template ~/Documents --config metadata_config.yml
 
+  # Limitar el parseo paralelo de YAML a 4 procesos (por defecto: nº de CPUs)
+  python main.py create-template ~/Documents --config metadata_config.yml --jobs 4
+
   # Agregar solo artículos nuevos (modo incremental)
   python main.py create-template ~/Documents --config metadata_config.yml --incremental
 
@@ -453,6 +552,7 @@ Ejemplos:
 
   # Agregar columnas nuevas al Excel
   python main.py add-columns ~/Documents excel.xlsx campo1 campo2
+  python main.py add-columns ~/Documents excel.xlsx --suggest 10 --config metadata_config.yml
 
   # Ver diferencias entre Excel y archivos
   python main.py find-differences ~/Documents excel.xlsx --blog pub_axiomata
@@ -481,8 +581,13 @@ Ejemplos:
 
   # Estadísticas y auditoría de taxonomía
   python main.py tag-stats ~/Documents --top 30
+  python main.py tag-stats excel.xlsx --format json > tag_stats.json
   python main.py audit-tags excel.xlsx --threshold 0.85
 
+  # Varias operaciones en una sola pasada (plan.yml, p.ej. desde audit-tags)
+  python main.py audit-tags ~/Documents --save-plan plan.yml
+  python main.py apply-tag-plan ~/Documents plan.yml --dry-run
+
   # --- SINCRONIZACIÓN DESDE LA RUTA ---
 
   # Fechas: date = carpeta YYYY-MM-DD-titulo (formato MM/DD/YYYY)
@@ -493,6 +598,12 @@ Ejemplos:
   python main.py sync-pdf-urls ~/Documents --config metadata_config.yml --dry-run
   python main.py sync-pdf-urls excel.xlsx --blog chaska
 
+  # Todas las reglas derivadas (date, pdf-url y derived_fields del config)
+  # en un solo recorrido, escribiendo cada archivo una vez
+  python main.py sync-derived ~/Documents --config metadata_config.yml --dry-run
+  python main.py sync-derived excel.xlsx --rules date pdf-url
+  python main.py sync-derived ~/Documents --config metadata_config.yml --list-rules
+
 Versión: {VERSION}
 Autor:   {AUTHOR}
 Email:   {EMAIL}
@@ -501,6 +612,21 @@ Email:   {EMAIL}
 
     sub = parser.add_subparsers(dest="command", help="Comando a ejecutar")
 
+    def _add_runtime_args(sp):
+        sp.add_argument(
+            "--no-cache", action="store_true",
+            help="No usar la caché de frontmatter, el índice de tags ni la copia de "
+                 "trabajo del Excel",
+        )
+        sp.add_argument(
+            "-j", "--jobs", type=int, metavar="N",
+            help="Procesos para leer/parsear YAML en paralelo (por defecto: nº de CPUs)",
+        )
+        sp.add_argument(
+            "--fsync", action="store_true",
+            help="Forzar a disco (fsync, por lotes) los archivos .qmd reescritos",
+        )
+
     # create-config
     p = sub.add_parser("create-config", help="Crear metadata_config.yml")
     p.add_argument("base_path", help="Ruta raíz de los blogs")
@@ -514,8 +640,10 @@ Email:   {EMAIL}
     p.add_argument("-c", "--config", help="Archivo de configuración")
     p.add_argument(
         "--incremental", action="store_true",
-        help="Solo agregar artículos nuevos (preserva fórmulas existentes)"
+        help="Agregar artículos nuevos y refrescar los modificados "
+             "(preserva fórmulas existentes)"
     )
+    _add_runtime_args(p)
 
     # update
     p = sub.add_parser("update", help="Actualizar archivos desde Excel")
@@ -525,19 +653,26 @@ Email:   {EMAIL}
     p.add_argument("-p", "--filter-path", help="Filtrar por substring en ruta")
     p.add_argument("-c", "--config")
     p.add_argument("--dry-run", action="store_true", help="Simular sin aplicar")
+    _add_runtime_args(p)
 
     # detect-new-fields
     p = sub.add_parser("detect-new-fields", help="Detectar campos YAML no declarados")
     p.add_argument("base_path")
     p.add_argument("-c", "--config")
+    _add_runtime_args(p)
 
     # add-columns
     p = sub.add_parser("add-columns", help="Agregar columnas nuevas al Excel")
     p.add_argument("base_path")
     p.add_argument("excel_file")
-    p.add_argument("fields", nargs="+", help="Nombres de columnas a agregar")
+    p.add_argument("fields", nargs="*", help="Nombres de columnas a agregar")
     p.add_argument("-c", "--config")
     p.add_argument("--dry-run", action="store_true")
+    p.add_argument(
+        "--suggest", nargs="?", type=int, const=0, metavar="N",
+        help="Sugerir campos del YAML sin columna, por cobertura (top N; no modifica el Excel)",
+    )
+    _add_runtime_args(p)
 
     # find-differences
     p = sub.add_parser("find-differences", help="Ver diferencias Excel vs archivos")
@@ -547,6 +682,7 @@ Email:   {EMAIL}
     p.add_argument("-p", "--filter-path")
     p.add_argument("-c", "--config")
     p.add_argument("--max-show", type=int, default=10)
+    _add_runtime_args(p)
 
     # sync-article
     p = sub.add_parser("sync-article", help="Sincronizar un artículo (interactivo)")
@@ -555,6 +691,7 @@ Email:   {EMAIL}
     p.add_argument("article_path", help="Ruta relativa del index.qmd")
     p.add_argument("-c", "--config")
     p.add_argument("--dry-run", action="store_true")
+    _add_runtime_args(p)
 
     # sync-batch
     p = sub.add_parser("sync-batch", help="Sincronización masiva interactiva")
@@ -564,6 +701,7 @@ Email:   {EMAIL}
     p.add_argument("-p", "--filter-path")
     p.add_argument("-c", "--config")
     p.add_argument("--dry-run", action="store_true")
+    _add_runtime_args(p)
 
     # --- Comandos de tags ----------------------------------------------------
     # Todos aceptan como destino un Excel (.xlsx → modifica solo el Excel)
@@ -577,6 +715,7 @@ Email:   {EMAIL}
         sp.add_argument("-b", "--blog", help="Filtrar por blog")
         sp.add_argument("-p", "--filter-path", help="Filtrar por substring en ruta")
         sp.add_argument("-c", "--config", help="Archivo de configuración (modo archivos)")
+        _add_runtime_args(sp)
 
     p = sub.add_parser(
         "normalize-tags",
@@ -614,6 +753,11 @@ Email:   {EMAIL}
     p = sub.add_parser("tag-stats", help="Estadísticas de tags de la colección")
     _add_tag_common_args(p)
     p.add_argument("--top", type=int, default=20, help="Cuántos tags mostrar en el top")
+    p.add_argument(
+        "--format", choices=STATS_FORMATS, default="text",
+        help="text (reporte), json (todas las estadísticas) o csv (tag × blog); "
+             "con json/csv solo el resultado va a stdout",
+    )
 
     p = sub.add_parser(
         "audit-tags", help="Auditoría de taxonomía (variantes, typos, formato)"
@@ -623,6 +767,21 @@ Email:   {EMAIL}
         "--threshold", type=float, default=0.8,
         help="Umbral de similitud para detectar tags casi iguales (0-1)",
     )
+    p.add_argument(
+        "--save-plan", metavar="PLAN_YML",
+        help="Guardar las correcciones recomendadas como plan para apply-tag-plan",
+    )
+
+    p = sub.add_parser(
+        "apply-tag-plan",
+        help="Aplicar un plan.yml de operaciones de tags en una sola pasada",
+    )
+    _add_tag_common_args(p)
+    p.add_argument(
+        "plan",
+        help="plan.yml: lista 'operations' de normalize/replace/remove/add, en orden",
+    )
+    p.add_argument("--dry-run", action="store_true", help="Simular sin aplicar")
 
     # --- Sincronización desde la ruta (mismo doble destino que tags) --------
     p = sub.add_parser(
@@ -639,6 +798,22 @@ Email:   {EMAIL}
     _add_tag_common_args(p)
     p.add_argument("--dry-run", action="store_true", help="Simular sin aplicar")
 
+    p = sub.add_parser(
+        "sync-derived",
+        help="Sincronizar varios campos derivados de la ruta en una sola pasada",
+    )
+    _add_tag_common_args(p)
+    p.add_argument(
+        "--rules", nargs="+", metavar="REGLA",
+        help="Reglas a aplicar (por defecto todas: date, pdf-url y las de "
+             "derived_fields en el config)",
+    )
+    p.add_argument(
+        "--list-rules", action="store_true",
+        help="Mostrar las reglas disponibles y salir",
+    )
+    p.add_argument("--dry-run", action="store_true", help="Simular sin aplicar")
+
     return parser
 
 
@@ -663,9 +838,11 @@ COMMAND_MAP = {
     "add-tags":           cmd_add_tags,
     "tag-stats":          cmd_tag_stats,
     "audit-tags":         cmd_audit_tags,
+    "apply-tag-plan":     cmd_apply_tag_plan,
     # Sincronización desde la ruta (absorbe los scripts legacy 1_ y 3_)
     "sync-dates":         cmd_sync_dates,
     "sync-pdf-urls":      cmd_sync_pdf_urls,
+    "sync-derived":       cmd_sync_derived,
 }
 
 
@@ -682,8 +859,13 @@ def main():
         print(f"❌ Comando desconocido: {args.command}")
         return 1
 
+    _RUNTIME["no_cache"] = getattr(args, "no_cache", False)
+    set_store_enabled(not _RUNTIME["no_cache"])
+    set_default_jobs(getattr(args, "jobs", None))
+
     try:
-        handler(args)
+        with fsync_batches(enabled=getattr(args, "fsync", False)):
+            handler(args)
         return 0
     except KeyboardInterrupt:
         print("\n\n⏭️  Operación cancelada por el usuario")
@@ -693,6 +875,8 @@ def main():
         import traceback
         traceback.print_exc()
         return 1
+    finally:
+        deactivate_cache()
 
 
 if __name__ == "__main__":
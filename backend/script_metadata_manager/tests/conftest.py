@@ -0,0 +1,9 @@
+"""
+Configuración común de pytest: igual que main.py, pone la carpeta del
+script en sys.path para importar el paquete lib.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,79 @@
+"""
+Las cachés en SQLite guardan JSON con etiquetas (tagged_json), no
+pickle: los valores vuelven idénticos y un contenido manipulado nunca
+se ejecuta, solo cuenta como fallo de caché.
+"""
+
+import math
+import pickle
+import sqlite3
+from datetime import date, datetime, timezone
+
+import pandas as pd
+
+from lib import tagged_json
+from lib.excel_store import read_metadata_sheet, store_path
+from lib.frontmatter_cache import FrontmatterCache, FrontmatterEntry
+
+
+class _Boom:
+    def __reduce__(self):
+        return (exec, ("raise SystemExit('pickle ejecutado')",))
+
+
+def test_tagged_json_round_trip():
+    value = {
+        "title": "Ñandú «ü»",
+        "date": date(2024, 2, 29),
+        "updated": datetime(2024, 3, 1, 12, 30, tzinfo=timezone.utc),
+        "draft": False,
+        "n": 3,
+        "tags": ["a", "b"],
+        "pair": ("x", 1),
+        1: "clave entera",
+        "nested": {"$t": "no es una etiqueta"},
+        "ts": pd.Timestamp("2024-01-02 03:04:05.000000006"),
+    }
+    back = tagged_json.loads(tagged_json.dumps(value))
+    assert back == value
+    assert type(back["date"]) is date and type(back["pair"]) is tuple
+    assert tagged_json.loads(tagged_json.dumps([pd.NaT]))[0] is pd.NaT
+    assert math.isnan(tagged_json.loads(tagged_json.dumps(float("nan"))))
+
+
+def test_frontmatter_cache_ignores_pickled_data(tmp_path):
+    target = tmp_path / "index.qmd"
+    target.write_text("---\ntitle: x\n---\n", encoding="utf-8")
+    st = target.stat()
+
+    cache = FrontmatterCache(tmp_path / "cache.sqlite")
+    cache.put(target, st, FrontmatterEntry("title: x", 16, {"title": "x"}, None))
+    assert cache.get(target, st).data == {"title": "x"}
+
+    cache._conn.execute(
+        "UPDATE frontmatter SET data = ?", (pickle.dumps(_Boom()),)
+    )
+    assert cache.get(target, st) is None
+    assert cache.misses == 1
+    cache.close()
+
+
+def test_excel_store_round_trip_and_ignores_pickled_rows(tmp_path):
+    excel = tmp_path / "metadata.xlsx"
+    pd.DataFrame({
+        "ruta_archivo": ["blog/a/index.qmd", "blog/b/index.qmd"],
+        "blog_nombre": ["blog", "blog"],
+        "title": ["Ñandú", None],
+        "date": [pd.Timestamp("2024-02-29"), pd.NaT],
+        "n": [1, 2],
+        "x": [1.5, float("nan")],
+        "draft": [True, False],
+    }).to_excel(excel, sheet_name="METADATOS", index=False)
+    expected = pd.read_excel(excel, sheet_name="METADATOS")
+
+    pd.testing.assert_frame_equal(read_metadata_sheet(excel), expected)
+    pd.testing.assert_frame_equal(read_metadata_sheet(excel), expected)
+
+    with sqlite3.connect(store_path(excel)) as conn:
+        conn.execute("UPDATE articles SET row = ?", (pickle.dumps(_Boom()),))
+    pd.testing.assert_frame_equal(read_metadata_sheet(excel), expected)
@@ -0,0 +1,90 @@
+"""
+Archivos index.qmd con saltos de línea CRLF: la lectura devuelve el mismo
+YAML crudo que con LF y las escrituras conservan CRLF en todo el archivo.
+"""
+
+from lib import qmd_updater
+from lib.collector import load_article_record
+from lib.qmd_updater import patch_record_yaml, write_yaml_to_qmd
+from lib.yaml_parser import parse_frontmatter, read_frontmatter
+
+CRLF_QMD = (
+    b"---\r\n"
+    b"title: CRLF\r\n"
+    b"tags:\r\n"
+    b"  - a\r\n"
+    b"---\r\n"
+    b"\r\n"
+    b"Cuerpo del documento.\r\n"
+)
+
+
+def _write(tmp_path, content: bytes):
+    path = tmp_path / "index.qmd"
+    path.write_bytes(content)
+    return path
+
+
+def test_read_frontmatter_crlf_matches_lf(tmp_path):
+    crlf = _write(tmp_path, CRLF_QMD)
+    raw, body_offset = read_frontmatter(crlf)
+
+    assert raw == "title: CRLF\ntags:\n  - a"
+    assert CRLF_QMD[body_offset:] == b"\r\n\r\nCuerpo del documento.\r\n"
+
+    lf = tmp_path / "lf.qmd"
+    lf.write_bytes(CRLF_QMD.replace(b"\r\n", b"\n"))
+    assert read_frontmatter(lf)[0] == raw
+
+
+def test_write_keeps_crlf(tmp_path):
+    path = _write(tmp_path, CRLF_QMD)
+    raw, body_offset = read_frontmatter(path)
+    data = parse_frontmatter(raw)
+    data["title"] = "Otro"
+
+    assert write_yaml_to_qmd(path, data, body_offset)
+    content = path.read_bytes()
+    assert content.startswith(b"---\r\ntitle: Otro\r\n")
+    assert b"\n" not in content.replace(b"\r\n", b"")
+    assert content.endswith(b"---\r\n\r\nCuerpo del documento.\r\n")
+
+
+def test_patch_keeps_crlf_without_blank_line(tmp_path):
+    path = _write(tmp_path, CRLF_QMD)
+    expected = CRLF_QMD.replace(b"  - a\r\n", b"- b\r\n")
+
+    for _ in range(3):
+        record = load_article_record(path, tmp_path, "blog")
+        updated = dict(record.yaml_index, tags=["b"])
+        patch_record_yaml(record, updated, ["tags"])
+        assert path.read_bytes() == expected
+
+    record = load_article_record(path, tmp_path, "blog")
+    assert not patch_record_yaml(record, dict(record.yaml_index), ["tags"])
+
+
+def test_identical_crlf_header_is_not_rewritten(tmp_path):
+    path = _write(tmp_path, CRLF_QMD)
+    raw, body_offset = read_frontmatter(path)
+    data = parse_frontmatter(raw)
+    assert write_yaml_to_qmd(path, data, body_offset)
+
+    content = path.read_bytes()
+    mtime_ns = path.stat().st_mtime_ns
+    raw, body_offset = read_frontmatter(path)
+    assert not write_yaml_to_qmd(path, parse_frontmatter(raw), body_offset)
+    assert path.read_bytes() == content
+    assert path.stat().st_mtime_ns == mtime_ns
+
+
+def test_fsync_batches_skips_directories_on_windows(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(qmd_updater, "_fsync_path", synced.append)
+    monkeypatch.setattr(qmd_updater.os, "name", "nt")
+    path = _write(tmp_path, CRLF_QMD)
+    raw, body_offset = read_frontmatter(path)
+
+    with qmd_updater.fsync_batches():
+        write_yaml_to_qmd(path, dict(parse_frontmatter(raw), title="Otro"), body_offset)
+    assert synced == [path]
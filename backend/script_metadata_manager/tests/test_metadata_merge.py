@@ -0,0 +1,36 @@
+"""
+merge_with_metadata_yml: los registros fusionados no comparten objetos
+anidados con el _metadata.yml memorizado ni entre sí.
+"""
+
+from lib.yaml_parser import merge_with_metadata_yml
+
+METADATA_YML = """\
+citation:
+  type: article-journal
+author:
+  - name: Autor
+"""
+
+
+def _article(base, folder):
+    path = base / "pub_a" / "posts" / folder / "index.qmd"
+    path.parent.mkdir(parents=True)
+    path.write_text("---\ntitle: Artículo\n---\n", encoding="utf-8")
+    return path
+
+
+def test_merged_records_do_not_share_nested_values(tmp_path):
+    base = tmp_path / "docs"
+    first = _article(base, "uno")
+    second = _article(base, "dos")
+    (base / "pub_a" / "posts" / "_metadata.yml").write_text(METADATA_YML, encoding="utf-8")
+
+    merged = merge_with_metadata_yml({"title": "Uno"}, first, base)
+    merged["citation"]["pdf-url"] = "https://example.org/uno.pdf"
+    merged["author"].append({"name": "Otro"})
+
+    sibling = merge_with_metadata_yml({"title": "Dos"}, second, base)
+    assert sibling["citation"] == {"type": "article-journal"}
+    assert sibling["author"] == [{"name": "Autor"}]
+    assert sibling["title"] == "Dos"
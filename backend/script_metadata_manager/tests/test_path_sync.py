@@ -0,0 +1,66 @@
+"""
+sync-pdf-urls sobre archivos y sobre el Excel: ambos modos pasan por el
+motor de sync-derived y ninguno crea el bloque citation en un artículo
+que no lo tiene.
+"""
+
+from openpyxl import Workbook, load_workbook
+
+from lib.collector import collect_index_files
+from lib.excel_writer import build_metadata_sheet
+from lib.path_sync import sync_pdf_urls_excel, sync_pdf_urls_files
+from lib.yaml_parser import parse_frontmatter, read_frontmatter
+
+BASE_URLS = {"pub_a": "https://example.org/a"}
+
+
+def _article(base, folder, citation):
+    path = base / "pub_a" / "posts" / folder / "index.qmd"
+    path.parent.mkdir(parents=True)
+    header = "title: Artículo\n"
+    if citation:
+        header += "citation:\n  type: article-journal\n  pdf-url: https://old.example/x.pdf\n"
+    path.write_text(f"---\n{header}---\n\nCuerpo.\n", encoding="utf-8")
+    return path
+
+
+def _collection(tmp_path):
+    base = tmp_path / "docs"
+    with_citation = _article(base, "2024-01-01-con", citation=True)
+    without = _article(base, "2024-01-02-sin", citation=False)
+    return base, with_citation, without
+
+
+def _yaml(path):
+    return parse_frontmatter(read_frontmatter(path)[0])
+
+
+def test_files_mode_skips_articles_without_citation(tmp_path):
+    base, with_citation, without = _collection(tmp_path)
+    sync_pdf_urls_files(base, set(), set(), configured_urls=BASE_URLS)
+
+    assert _yaml(with_citation)["citation"]["pdf-url"] == \
+        "https://example.org/a/posts/2024-01-01-con/index.pdf"
+    assert "citation" not in _yaml(without)
+
+
+def test_excel_mode_matches_files_mode(tmp_path):
+    base, _, _ = _collection(tmp_path)
+    output = tmp_path / "metadata.xlsx"
+    wb = Workbook(write_only=True)
+    build_metadata_sheet(wb, collect_index_files(base, set(), set(), verbose=False), base)
+    wb.save(output)
+
+    sync_pdf_urls_excel(str(output), configured_urls=BASE_URLS)
+
+    ws = load_workbook(output)["METADATOS"]
+    headers = [cell.value for cell in ws[1]]
+    rows = {
+        row[headers.index("ruta_archivo")]: row[headers.index("citation_pdf_url")]
+        for row in ws.iter_rows(min_row=2, values_only=True)
+    }
+    assert rows == {
+        "pub_a/posts/2024-01-01-con/index.qmd":
+            "https://example.org/a/posts/2024-01-01-con/index.pdf",
+        "pub_a/posts/2024-01-02-sin/index.qmd": None,
+    }
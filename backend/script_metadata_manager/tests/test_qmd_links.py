@@ -0,0 +1,62 @@
+"""
+Reescritura de index.qmd enlazados: un enlace simbólico sigue siendo
+enlace (cambia su destino) y los enlaces duros siguen compartiendo el
+mismo archivo.
+"""
+
+import os
+
+import pytest
+
+from lib.qmd_updater import write_yaml_to_qmd
+from lib.yaml_parser import parse_frontmatter, read_frontmatter
+
+QMD = b"---\ntitle: Original\n---\n\nCuerpo.\n"
+
+
+def _retitle(path):
+    _, body_offset = read_frontmatter(path)
+    assert write_yaml_to_qmd(path, {"title": "Nuevo"}, body_offset)
+
+
+def _title(path):
+    return parse_frontmatter(read_frontmatter(path)[0])["title"]
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink") or os.name == "nt",
+                    reason="enlaces simbólicos no disponibles")
+def test_symlink_is_kept(tmp_path):
+    real = tmp_path / "real.qmd"
+    real.write_bytes(QMD)
+    link = tmp_path / "index.qmd"
+    link.symlink_to(real)
+
+    _retitle(link)
+
+    assert link.is_symlink()
+    assert _title(real) == "Nuevo"
+    assert real.read_bytes().endswith(b"\n\nCuerpo.\n")
+
+
+def test_hard_links_stay_shared(tmp_path):
+    original = tmp_path / "index.qmd"
+    original.write_bytes(QMD)
+    other = tmp_path / "copia.qmd"
+    os.link(original, other)
+
+    _retitle(original)
+
+    assert os.path.samefile(original, other)
+    assert other.read_bytes() == original.read_bytes()
+    assert _title(other) == "Nuevo"
+
+
+def test_single_link_keeps_mode(tmp_path):
+    path = tmp_path / "index.qmd"
+    path.write_bytes(QMD)
+    os.chmod(path, 0o640)
+
+    _retitle(path)
+
+    assert os.stat(path).st_mode & 0o777 == 0o640
+    assert _title(path) == "Nuevo"
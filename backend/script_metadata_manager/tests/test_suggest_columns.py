@@ -0,0 +1,32 @@
+"""
+add-columns --suggest: las claves del YAML que ya tienen columna en el
+Excel no se sugieren, aunque el YAML use guion y la columna guion bajo
+(citation.pdf-url ↔ citation_pdf_url).
+"""
+
+import pandas as pd
+
+from lib.config import ALL_FIELDS
+from lib.sync import suggest_columns
+
+QMD = """---
+title: Artículo
+citation:
+  type: article-journal
+  pdf-url: https://example.org/a.pdf
+numbered-lines: true
+extra_field: 1
+---
+
+Cuerpo.
+"""
+
+
+def test_suggest_columns_matches_dashed_keys(tmp_path):
+    article = tmp_path / "blog" / "posts" / "2024-01-01-articulo" / "index.qmd"
+    article.parent.mkdir(parents=True)
+    article.write_text(QMD, encoding="utf-8")
+    excel = tmp_path / "metadata.xlsx"
+    pd.DataFrame(columns=ALL_FIELDS).to_excel(excel, sheet_name="METADATOS", index=False)
+
+    assert suggest_columns(tmp_path, {"blog"}, set(), str(excel)) == ["extra_field"]
@@ -0,0 +1,83 @@
+"""
+create-template --incremental guiado por el manifiesto: una ejecución con
+menos blogs (o más carpetas excluidas) no debe olvidar los artículos que
+quedaron fuera, ni informarlos como borrados, ni duplicarlos después.
+"""
+
+from openpyxl import Workbook, load_workbook
+
+from lib.collector import collect_index_files
+from lib.excel_writer import (
+    build_metadata_sheet,
+    update_template_incremental,
+    write_template_manifest,
+)
+
+
+def _article(base, blog, folder, title):
+    path = base / blog / "posts" / folder / "index.qmd"
+    path.parent.mkdir(parents=True)
+    path.write_text(f"---\ntitle: {title}\n---\n\nCuerpo.\n", encoding="utf-8")
+    return path
+
+
+def _create(base, output):
+    df_files = collect_index_files(base, set(), set(), verbose=False)
+    wb = Workbook(write_only=True)
+    build_metadata_sheet(wb, df_files, base)
+    wb.save(output)
+    write_template_manifest(output, base, df_files)
+
+
+def _rutas(output):
+    ws = load_workbook(output)["METADATOS"]
+    return [row[0] for row in ws.iter_rows(min_row=2, max_col=1, values_only=True)]
+
+
+def _collection(tmp_path):
+    base = tmp_path / "docs"
+    _article(base, "pub_a", "2024-01-01-uno", "Uno")
+    _article(base, "pub_a", "2024-01-02-dos", "Dos")
+    _article(base, "pub_b", "2024-01-03-tres", "Tres")
+    output = tmp_path / "metadata.xlsx"
+    _create(base, output)
+    return base, output
+
+
+def test_narrower_blog_scope_keeps_other_rows(tmp_path, capsys):
+    base, output = _collection(tmp_path)
+    rutas = _rutas(output)
+    assert len(rutas) == 3
+
+    _article(base, "pub_a", "2024-02-01-nuevo", "Nuevo")
+    assert update_template_incremental(output, base, {"pub_a"}, set())
+    assert "Ya no existen" not in capsys.readouterr().out
+
+    update_template_incremental(output, base, set(), set())
+    final = _rutas(output)
+    assert len(final) == len(set(final)) == 4
+    assert set(rutas) < set(final)
+
+
+def test_excluded_folder_is_not_reported_or_duplicated(tmp_path, capsys):
+    base, output = _collection(tmp_path)
+
+    update_template_incremental(output, base, set(), {"2024-01-02-dos"})
+    assert "Ya no existen" not in capsys.readouterr().out
+
+    _article(base, "pub_b", "2024-02-01-nuevo", "Nuevo")
+    update_template_incremental(output, base, set(), set())
+    final = _rutas(output)
+    assert len(final) == len(set(final)) == 4
+
+
+def test_deleted_article_is_reported_and_row_kept(tmp_path, capsys):
+    base, output = _collection(tmp_path)
+    gone = base / "pub_b" / "posts" / "2024-01-03-tres" / "index.qmd"
+    gone.unlink()
+    gone.parent.rmdir()
+
+    update_template_incremental(output, base, set(), set())
+    out = capsys.readouterr().out
+    assert "Ya no existen (sus filas se conservan): 1" in out
+    assert "pub_b/posts/2024-01-03-tres/index.qmd" in _rutas(output)
@@ -0,0 +1,45 @@
+"""
+load_yaml usa CSafeLoader cuando hay libyaml: debe construir exactamente
+los mismos objetos que SafeLoader (Python puro), tipos incluidos.
+"""
+
+import pytest
+import yaml
+
+from lib.yaml_codec import LIBYAML, load_yaml
+
+DOCUMENTS = [
+    # fechas y marcas de tiempo
+    "date: 2024-02-29\nupdated: 2024-03-01 12:30:00\n"
+    "tz: 2024-03-01T12:30:00+02:00\nquoted: '2024-02-29'\n",
+    # booleanos, nulos y números
+    "a: true\nb: false\nc: yes\nd: no\ne: ~\nf: null\n"
+    "g: 1e3\nh: .inf\ni: 0x1A\nj: 010\nk: '1'\n",
+    # unicode y escapes
+    "title: \"Ñandú ü 漢字 \\u00e9\"\nemoji: \"😀 \\U0001F600\"\n"
+    "tab: \"a\\tb\"\nplain: Situación crítica\n",
+    # escalares multilínea
+    "lit: |\n  línea 1\n  línea 2\nfold: >\n  texto\n  plegado\n\n  párrafo\n"
+    "keep: |+\n  fin\n\nstrip: >-\n  sin salto\nplain: uno\n  dos\n",
+    # estructuras anidadas y anclas
+    "author:\n  - name: A\n    affiliations: [x, y]\n  - {name: B}\n"
+    "base: &b {k: v}\ncopy: *b\n",
+]
+
+
+@pytest.mark.skipif(not LIBYAML, reason="PyYAML sin libyaml")
+@pytest.mark.parametrize("text", DOCUMENTS)
+def test_c_loader_matches_pure_python(text):
+    expected = yaml.load(text, Loader=yaml.SafeLoader)
+    loaded = load_yaml(text)
+
+    assert loaded == expected
+    assert _types(loaded) == _types(expected)
+
+
+def _types(value):
+    if isinstance(value, dict):
+        return {k: _types(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_types(v) for v in value]
+    return type(value), value
@@ -0,0 +1,85 @@
+"""
+serialize_frontmatter sobre un corpus sintético con los campos de
+config.YAML_FIELD_ORDER: el texto emitido vuelve a cargarse (load_yaml)
+como el mismo dict, y emit_frontmatter da los mismos bytes que yaml.dump.
+"""
+
+import datetime
+import random
+
+import pytest
+
+from lib.config import YAML_FIELD_ORDER
+from lib.yaml_codec import dump_yaml, load_yaml
+from lib.yaml_emitter import emit_frontmatter, serialize_frontmatter
+
+WORDS = [
+    "análisis", "economía", "it's", "x:", "#", '"', "\\", "🎉", "漢字",
+    "yes", "null", "123", "1.5", "2024-01-02", "- a", "{b}", "[c]",
+    "@at", "%p", "&ref", "*star", "!tag", "|", ">", "?", "tab\tb",
+    "palabra" * 6, " ",
+]
+# NEL es salto de línea en YAML 1.1: ni yaml.dump lo conserva al recargar,
+# así que solo entra en la comparación de bytes con yaml.dump
+WORDS_NEL = WORDS + ["\x85"]
+
+
+class _Corpus:
+    def __init__(self, words, seed: int = 20240229):
+        self.words = words
+        self.rnd = random.Random(seed)
+
+    def text(self, multiline: bool = False) -> str:
+        seps = [" ", " ", "  "] + (["\n", "\n\n"] if multiline else [])
+        words = [self.rnd.choice(self.words) for _ in range(self.rnd.randint(1, 30))]
+        return "".join(w + self.rnd.choice(seps) for w in words[:-1]) + words[-1]
+
+    def scalar(self):
+        return self.rnd.choice([
+            self.text(), self.rnd.randint(-5, 10 ** 6),
+            self.rnd.choice([0.5, 1e17, 3.0]), True, False, None,
+            datetime.date(2024, 2, 29), datetime.datetime(2024, 3, 1, 12, 30),
+        ])
+
+    def value(self, field: str):
+        if field in ("tags", "categories", "keywords"):
+            return [self.text() for _ in range(self.rnd.randint(0, 4))]
+        if field == "author":
+            return [
+                {
+                    "name": self.text(),
+                    "email": "a@b.org",
+                    "corresponding": self.rnd.choice([True, False]),
+                    "affiliations": [{"name": self.text(), "city": self.text()}],
+                }
+                for _ in range(self.rnd.randint(1, 3))
+            ]
+        if field == "citation":
+            return {"type": "article-journal", "pdf-url": self.text(), "volume": 3}
+        if field in ("abstract", "description"):
+            # serialize_frontmatter les recorta los espacios de los extremos
+            return self.text(multiline=self.rnd.random() < 0.3).strip()
+        if field == "note":
+            return self.text(multiline=self.rnd.random() < 0.3)
+        return self.scalar()
+
+    def documents(self, size: int):
+        for _ in range(size):
+            fields = self.rnd.sample(
+                YAML_FIELD_ORDER, self.rnd.randint(1, len(YAML_FIELD_ORDER))
+            )
+            yield {field: self.value(field) for field in fields}
+
+
+@pytest.mark.parametrize("data", list(_Corpus(WORDS).documents(300)))
+def test_emit_round_trip(data):
+    assert load_yaml(serialize_frontmatter(data)) == data
+
+
+@pytest.mark.parametrize("data", list(_Corpus(WORDS_NEL).documents(300)))
+def test_emit_matches_yaml_dump(data):
+    multiline = any(isinstance(v, str) and "\n" in v for v in data.values())
+    assert emit_frontmatter(data, double_quoted=multiline) == dump_yaml(
+        data, allow_unicode=True, default_flow_style=False, sort_keys=False,
+        indent=2, width=80, default_style='"' if multiline else None,
+    )